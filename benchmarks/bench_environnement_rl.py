@@ -0,0 +1,126 @@
+"""
+Benchmarks des environnements RL (steps d'environnement par seconde)
+
+Mesure, avec des actions au hasard :
+    - EnvironnementShooter (une partie autour d'un GameEngine)
+    - EnvironnementsVectorises pour chaque nombre de parties demandé
+
+Un step d'environnement est une frame d'une partie : N parties vectorisées
+avancées d'un step comptent pour N. Les remises à zéro automatiques
+(parties perdues ou frames_max atteint) font partie de la mesure.
+
+Usage :
+    python benchmarks/bench_environnement_rl.py --nb 64 1024 4096 --sortie resultats.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+DOSSIER_JEU = Path(__file__).resolve().parent.parent / "game"
+sys.path.insert(0, str(DOSSIER_JEU))
+
+from commun import version_git
+from environnement_rl import ACTIONS, NUMPY_AVAILABLE, EnvironnementShooter, EnvironnementsVectorises
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+
+def mesurer_simple(nb_steps: int, graine: int) -> dict:
+    """Steps/s d'une partie GameEngine"""
+    env = EnvironnementShooter()
+    env.reset(seed=graine)
+    actions = np.random.default_rng(graine).integers(0, len(ACTIONS), nb_steps)
+    parties = 0
+    
+    debut = time.perf_counter()
+    for action in actions.tolist():
+        _, _, termine = env.step(action)
+        if termine:
+            parties += 1
+            env.reset()
+    duree = time.perf_counter() - debut
+    
+    return {
+        "environnement": "EnvironnementShooter",
+        "parties_paralleles": 1,
+        "steps": nb_steps,
+        "parties_terminees": parties,
+        "duree_s": round(duree, 3),
+        "steps_par_s": round(nb_steps / duree, 1),
+    }
+
+
+def mesurer_vectorise(nb: int, nb_steps: int, graine: int) -> dict:
+    """Steps/s (toutes parties confondues) de N parties vectorisées"""
+    env = EnvironnementsVectorises(nb, graine=graine)
+    env.reset()
+    actions = np.random.default_rng(graine).integers(0, len(ACTIONS), (nb_steps, nb))
+    parties = 0
+    
+    debut = time.perf_counter()
+    for actions_step in actions:
+        _, _, termines = env.step(actions_step)
+        parties += int(termines.sum())
+    duree = time.perf_counter() - debut
+    
+    return {
+        "environnement": "EnvironnementsVectorises",
+        "parties_paralleles": nb,
+        "steps": nb * nb_steps,
+        "parties_terminees": parties,
+        "duree_s": round(duree, 3),
+        "steps_par_s": round(nb * nb_steps / duree, 1),
+    }
+
+
+def afficher(resultat: dict):
+    """Affiche une mesure sur une ligne"""
+    print(f"  {resultat['environnement']:<26} x{resultat['parties_paralleles']:<6} "
+          f"{resultat['steps_par_s']:>12,.0f} steps/s   ({resultat['steps']:,} steps, "
+          f"{resultat['parties_terminees']:,} parties terminées, {resultat['duree_s']}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks des environnements RL")
+    parser.add_argument("--nb", type=int, nargs="+", default=[1, 64, 256, 1024, 4096],
+                        help="nombres de parties vectorisées (défaut : 1 64 256 1024 4096)")
+    parser.add_argument("--steps", type=int, default=2000,
+                        help="steps par mesure (défaut : 2000)")
+    parser.add_argument("--graine", type=int, default=0, help="graine du hasard (défaut : 0)")
+    parser.add_argument("--sortie", type=Path, help="fichier JSON des résultats")
+    args = parser.parse_args()
+    
+    if not NUMPY_AVAILABLE:
+        print("❌ NumPy est nécessaire : pip install numpy")
+        return 1
+    
+    rapport = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": version_git(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plateforme": platform.platform(),
+        "resultats": [],
+    }
+    print(f"📊 Steps d'environnement par seconde ({args.steps:,} steps par mesure)")
+    mesures = [lambda: mesurer_simple(args.steps, args.graine)]
+    mesures += [lambda nb=nb: mesurer_vectorise(nb, args.steps, args.graine) for nb in args.nb]
+    for mesure in mesures:
+        resultat = mesure()
+        rapport["resultats"].append(resultat)
+        afficher(resultat)
+    
+    if args.sortie:
+        args.sortie.write_text(json.dumps(rapport, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Résultats écrits dans {args.sortie}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
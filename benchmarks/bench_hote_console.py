@@ -0,0 +1,273 @@
+"""
+Test de charge de l'hôte console (sessions telnet simultanées tenues par un cœur)
+
+Lance game/hote_console.py dans un processus séparé (épinglé sur le
+premier cœur quand la plateforme le permet), puis, pour chaque palier,
+ouvre le nombre de sessions demandé depuis des processus clients (sur les
+autres cœurs). Chaque client annonce la taille de son terminal (NAWS),
+compte les images reçues, appuie sur des touches de temps en temps et
+relance une partie quand le bilan s'affiche.
+
+Pendant la fenêtre de mesure, chaque session doit recevoir
+FPS_CIBLE / FRAMES_PAR_IMAGE images par seconde : le taux est le rapport
+entre les images reçues et ce nombre. Un palier est tenu si le taux moyen
+atteint le seuil (0,95 par défaut) ; la montée s'arrête au premier palier
+qui ne l'est pas. La mémoire par session est l'augmentation de la mémoire
+résidente de l'hôte depuis son démarrage, divisée par le nombre de
+sessions (Linux seulement).
+
+Usage :
+    python benchmarks/bench_hote_console.py --sessions 50 100 200 400 --sortie resultats.json
+    python benchmarks/bench_hote_console.py --sessions 100 --terminal 120 40
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+DOSSIER_JEU = Path(__file__).resolve().parent.parent / "game"
+sys.path.insert(0, str(DOSSIER_JEU))
+
+from commun import (centile, coeurs_disponibles, epingler,
+                    relever_limite_fichiers, temps_cpu, version_git)
+from hote_console import FRAMES_PAR_IMAGE, IAC, INVITE_FIN, NAWS, SB, SE, WILL
+from shooter_console import ConfigDifficulte
+from spectateurs import DEBUT_IMAGE
+
+MARQUEUR = DEBUT_IMAGE.encode("ascii")
+INVITE = INVITE_FIN.split("[X]")[0].strip().encode("utf-8")
+TOUCHES = [b"q", b"d", b"z", b"s", b" ", b"\x1b[D", b"\x1b[C"]
+CHANCE_TOUCHE = 0.2            # probabilité d'appuyer sur une touche à chaque réception
+DELAI_DEMARRAGE = 10           # secondes d'attente de l'ouverture du port
+
+
+def memoire_residente(pid: int):
+    """Mémoire résidente d'un processus en octets (None hors Linux)"""
+    try:
+        for ligne in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if ligne.startswith("VmRSS:"):
+                return int(ligne.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+# ==============================================================================
+# PROCESSUS CLIENT
+# ==============================================================================
+
+async def jouer(port: int, terminal: tuple, debut: float, fin: float, mesures: list):
+    """Une session : annonce sa taille, compte les images de la fenêtre, joue et rejoue"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    colonnes, lignes = terminal
+    writer.write(bytes([IAC, WILL, NAWS, IAC, SB, NAWS, colonnes >> 8, colonnes & 0xff,
+                        lignes >> 8, lignes & 0xff, IAC, SE]))
+    aleatoire = random.Random()
+    mesure = {"images": 0, "octets": 0, "parties": 1}
+    mesures.append(mesure)
+    reste = b""
+    try:
+        while True:
+            bloc = await reader.read(65536)
+            if not bloc:
+                return
+            maintenant = time.time()
+            if maintenant >= fin:
+                return
+            bloc = reste + bloc
+            if maintenant >= debut:
+                mesure["images"] += bloc.count(MARQUEUR)
+                mesure["octets"] += len(bloc) - len(reste)
+            # Un marqueur coupé entre deux lectures sera compté avec la suivante
+            reste = bloc[-(len(MARQUEUR) - 1):] if not bloc.endswith(MARQUEUR) else b""
+            
+            if INVITE in bloc:
+                writer.write(b"r")
+                mesure["parties"] += 1
+            elif aleatoire.random() < CHANCE_TOUCHE:
+                writer.write(aleatoire.choice(TOUCHES))
+    finally:
+        writer.close()
+
+
+async def lancer_clients(nb: int, port: int, terminal: tuple, debut: float, fin: float) -> dict:
+    """Ouvre nb sessions et les fait jouer jusqu'à la fin de la fenêtre"""
+    mesures = []
+    taches = []
+    for _ in range(nb):
+        taches.append(asyncio.create_task(jouer(port, terminal, debut, fin, mesures)))
+        # Ne pas saturer la file d'attente d'acceptation de l'hôte
+        await asyncio.sleep(0)
+    pret = time.time()
+    _, en_attente = await asyncio.wait(taches, timeout=max(0.0, fin - time.time()) + 2)
+    for tache in en_attente:
+        tache.cancel()
+    return {"mesures": mesures, "pret_avant_debut": pret <= debut}
+
+
+# ==============================================================================
+# PROCESSUS PRINCIPAL
+# ==============================================================================
+
+def demarrer_hote(coeur: list) -> tuple:
+    """Lance l'hôte sur un port libre, retourne (processus, port)"""
+    environnement = dict(os.environ, PYTHONIOENCODING="utf-8")
+    hote = subprocess.Popen(
+        [sys.executable, str(DOSSIER_JEU / "hote_console.py"), "--port", "0", "--silencieux"],
+        cwd=str(DOSSIER_JEU), stdout=subprocess.PIPE, text=True, encoding="utf-8", env=environnement,
+    )
+    epingler(hote.pid, coeur)
+    debut = time.perf_counter()
+    ligne = hote.stdout.readline()
+    correspondance = re.search(r":(\d+) ", ligne)
+    if correspondance is None or time.perf_counter() - debut > DELAI_DEMARRAGE:
+        hote.kill()
+        raise RuntimeError(f"L'hôte n'a pas démarré : {ligne!r}")
+    return hote, int(correspondance.group(1))
+
+
+def mesurer_palier(nb_sessions: int, port: int, hote_pid: int, memoire_depart, args, coeurs_clients: list) -> dict:
+    """Ouvre nb_sessions réparties sur les processus clients et mesure la fenêtre"""
+    nb_processus = max(1, min(args.processus, nb_sessions))
+    # Temps de connexion estimé, puis chauffe, avant la fenêtre de mesure
+    debut = time.time() + 1 + nb_sessions / 1000 + args.chauffe
+    fin = debut + args.duree
+    
+    clients = []
+    for i in range(nb_processus):
+        nb = nb_sessions // nb_processus + (i < nb_sessions % nb_processus)
+        processus = subprocess.Popen(
+            [sys.executable, __file__, "--clients", str(nb), "--port", str(port),
+             "--terminal", *map(str, args.terminal), "--debut", repr(debut), "--fin", repr(fin)],
+            cwd=str(DOSSIER_JEU), stdout=subprocess.PIPE, text=True,
+        )
+        epingler(processus.pid, coeurs_clients)
+        clients.append(processus)
+    
+    time.sleep(max(0.0, debut - time.time()))
+    cpu_debut = temps_cpu(hote_pid)
+    time.sleep(max(0.0, fin - time.time()))
+    cpu_fin = temps_cpu(hote_pid)
+    memoire = memoire_residente(hote_pid)
+    
+    mesures, prets = [], True
+    for processus in clients:
+        sortie, _ = processus.communicate()
+        resultat = json.loads(sortie.strip().splitlines()[-1])
+        mesures += resultat["mesures"]
+        prets &= resultat["pret_avant_debut"]
+    
+    images_par_s = ConfigDifficulte.FPS_CIBLE / FRAMES_PAR_IMAGE
+    attendues = images_par_s * args.duree
+    taux = [m["images"] / attendues for m in mesures]
+    taux += [0.0] * (nb_sessions - len(taux))  # connexions refusées ou échouées
+    images = sum(m["images"] for m in mesures)
+    taux_moyen = sum(taux) / len(taux)
+    return {
+        "sessions": nb_sessions,
+        "taux_moyen": round(taux_moyen, 4),
+        "taux_p5": round(centile(taux, 5), 4),
+        "taux_min": round(min(taux), 4),
+        "images_par_s": round(images / args.duree, 1),
+        "octets_par_image": round(sum(m["octets"] for m in mesures) / images, 1) if images else None,
+        "parties": sum(m["parties"] for m in mesures),
+        "cpu_hote": (round((cpu_fin - cpu_debut) / args.duree, 3)
+                     if cpu_debut is not None and cpu_fin is not None else None),
+        "memoire_hote_mo": round(memoire / 2**20, 1) if memoire is not None else None,
+        "memoire_par_session_ko": (round((memoire - memoire_depart) / nb_sessions / 1024, 1)
+                                   if memoire is not None and memoire_depart is not None else None),
+        "clients_prets": prets,
+        "tenu": taux_moyen >= args.seuil,
+    }
+
+
+def afficher(resultat: dict):
+    """Affiche un palier sur une ligne"""
+    cpu = resultat["cpu_hote"]
+    par_session = resultat["memoire_par_session_ko"]
+    print(f"  {resultat['sessions']:>6} sessions   taux {resultat['taux_moyen']:>6.1%} "
+          f"(p5 {resultat['taux_p5']:>6.1%}, min {resultat['taux_min']:>6.1%})   "
+          f"{resultat['images_par_s']:>8,.0f} images/s   "
+          f"CPU hôte {'?' if cpu is None else f'{cpu:.0%}':>5}   "
+          f"mémoire {'?' if par_session is None else f'{par_session:,.0f} Ko':>8}/session   "
+          f"{'✅' if resultat['tenu'] else '❌'}{'' if resultat['clients_prets'] else ' (clients en retard)'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de l'hôte console")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[25, 50, 100, 200, 400, 800],
+                        help="paliers de sessions simultanées (défaut : 25 50 100 200 400 800)")
+    parser.add_argument("--terminal", type=int, nargs=2, default=[80, 24], metavar=("COLONNES", "LIGNES"),
+                        help="taille annoncée par les clients (défaut : 80 24)")
+    parser.add_argument("--duree", type=float, default=5, help="secondes de mesure par palier (défaut : 5)")
+    parser.add_argument("--chauffe", type=float, default=2, help="secondes avant la mesure (défaut : 2)")
+    parser.add_argument("--seuil", type=float, default=0.95,
+                        help="taux moyen pour qu'un palier soit tenu (défaut : 0.95)")
+    parser.add_argument("--processus", type=int, default=max(1, len(coeurs_disponibles()) - 1),
+                        help="processus clients (défaut : un par cœur hors celui de l'hôte)")
+    parser.add_argument("--sortie", type=Path, help="fichier JSON des résultats")
+    parser.add_argument("--clients", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--debut", type=float, help=argparse.SUPPRESS)
+    parser.add_argument("--fin", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    # Sous-processus : sessions clientes, résultat JSON sur la sortie standard
+    if args.clients:
+        print(json.dumps(asyncio.run(
+            lancer_clients(args.clients, args.port, tuple(args.terminal), args.debut, args.fin))))
+        return 0
+    
+    relever_limite_fichiers()
+    coeurs = coeurs_disponibles()
+    coeur_hote, coeurs_clients = coeurs[:1], coeurs[1:] or coeurs
+    if len(coeurs) == 1:
+        print("⚠️  Un seul cœur : hôte et clients se le partagent, les résultats sont pessimistes")
+    
+    hote, port = demarrer_hote(coeur_hote)
+    memoire_depart = memoire_residente(hote.pid)
+    rapport = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": version_git(),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "coeurs": len(coeurs),
+        "terminal": args.terminal,
+        "duree": args.duree,
+        "seuil": args.seuil,
+        "memoire_depart_mo": round(memoire_depart / 2**20, 1) if memoire_depart is not None else None,
+        "resultats": [],
+        "sessions_tenues": 0,
+    }
+    print(f"📊 Hôte sur le port {port}, terminal {args.terminal[0]}×{args.terminal[1]}, "
+          f"{args.processus} processus client(s)")
+    try:
+        for nb_sessions in sorted(args.sessions):
+            resultat = mesurer_palier(nb_sessions, port, hote.pid, memoire_depart, args, coeurs_clients)
+            rapport["resultats"].append(resultat)
+            afficher(resultat)
+            if not resultat["tenu"]:
+                break
+            rapport["sessions_tenues"] = nb_sessions
+    finally:
+        hote.kill()
+        hote.wait()
+    
+    print(f"\n✅ Sessions tenues sur un cœur : {rapport['sessions_tenues']:,}")
+    if args.sortie:
+        args.sortie.write_text(json.dumps(rapport, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"💾 Résultats écrits dans {args.sortie}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
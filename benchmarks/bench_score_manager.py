@@ -0,0 +1,236 @@
+"""
+Benchmarks du ScoreManager (chargement, enregistrement, classements, export)
+
+Pour chaque taille demandée, génère un scores.json synthétique (au schéma
+courant), puis mesure dans un processus séparé (pour que le pic de
+mémoire soit celui de cette taille) :
+    - _charger_scores et la construction complète du ScoreManager
+    - enregistrer_score (sauvegarde de scores.json comprise) et enregistrer_lot
+    - obtenir_classement pour chaque tri et chaque ordre (début et page au hasard)
+    - obtenir_statistiques
+    - exporter_html (après une nouvelle partie, pour forcer la réécriture)
+
+Les résultats (débit, latences p50/p95/p99, pic de mémoire) sont écrits en
+JSON pour comparer les moteurs de stockage d'une version à l'autre.
+
+Usage :
+    python benchmarks/bench_score_manager.py --joueurs 10000 100000 1000000 --sortie resultats.json
+    python benchmarks/bench_score_manager.py --joueurs 100000 --partitions 4
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+DOSSIER_JEU = Path(__file__).resolve().parent.parent / "game"
+sys.path.insert(0, str(DOSSIER_JEU))
+
+from commun import version_git
+from migrer_scores import generer_fichier_ancien, migrer_fichier
+from score_manager import VERSION_SCHEMA, ScoreManager
+from scores_partitionnes import ScoreManagerPartitionne
+
+# Pic de mémoire du processus (module absent sous Windows)
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+
+TRIS = ("score", "date", "pseudo")
+ORDRES = ("desc", "asc")
+
+
+def resumer(durees: list) -> dict:
+    """Débit et latences (ms) d'une série de mesures en secondes"""
+    durees = sorted(durees)
+    total = sum(durees)
+    
+    def centile(p):
+        return round(durees[min(len(durees) - 1, int(p / 100 * len(durees)))] * 1000, 4)
+    
+    return {
+        "n": len(durees),
+        "debit": round(len(durees) / total, 1) if total else None,
+        "p50": centile(50),
+        "p95": centile(95),
+        "p99": centile(99),
+        "max": round(durees[-1] * 1000, 4),
+    }
+
+
+def chronometrer(fonction, nb: int, preparer=None) -> dict:
+    """Mesure `nb` appels de fonction(argument), argument fourni par preparer()"""
+    durees = []
+    for _ in range(nb):
+        argument = preparer() if preparer is not None else None
+        debut = time.perf_counter()
+        fonction(argument)
+        durees.append(time.perf_counter() - debut)
+    return resumer(durees)
+
+
+def rss_max_mo():
+    """Pic de mémoire résidente du processus en Mo (None si indisponible)"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    return round(pic / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def preparer_fichier(dossier: Path, nb_joueurs: int) -> Path:
+    """Génère un fichier de scores synthétique migré au schéma courant"""
+    ancien = dossier / "scores_v1.json"
+    fichier = dossier / "scores.json"
+    generer_fichier_ancien(ancien, nb_joueurs)
+    migrer_fichier(ancien, fichier)
+    ancien.unlink()
+    return fichier
+
+
+def mesurer(fichier: Path, nb_joueurs: int, iterations: int, partitions: int) -> dict:
+    """Lance toutes les mesures sur un fichier de scores (dans ce processus)"""
+    aleatoire = random.Random(7)
+    
+    def creer():
+        if partitions:
+            return ScoreManagerPartitionne(str(fichier), nb_partitions=partitions, verbeux=False)
+        return ScoreManager(str(fichier), verbeux=False)
+    
+    def joueur_existant(_=None):
+        return f"Joueur{aleatoire.randrange(nb_joueurs)}"
+    
+    operations = {}
+    
+    # Première construction hors mesure : migration éventuelle et répartition en partitions
+    manager = creer()
+    nb_chargements = max(1, min(5, iterations // 20))
+    operations["chargement"] = chronometrer(lambda _: creer(), nb_chargements)
+    if not partitions:
+        temoin = creer()
+        operations["_charger_scores"] = chronometrer(lambda _: temoin._charger_scores(), nb_chargements)
+    
+    # Enregistrement : sauvegarde complète (partition du joueur seulement si partitionné)
+    nb_enregistrements = max(1, iterations // 10)
+    operations["enregistrer_score"] = chronometrer(
+        lambda joueur: manager.enregistrer_score(joueur, aleatoire.randrange(0, 5000, 10)),
+        nb_enregistrements, joueur_existant
+    )
+    operations["enregistrer_lot_100"] = chronometrer(
+        lambda lot: manager.enregistrer_lot(lot),
+        nb_enregistrements,
+        lambda: [(joueur_existant(), aleatoire.randrange(0, 5000, 10)) for _ in range(100)]
+    )
+    
+    for tri in TRIS:
+        for ordre in ORDRES:
+            operations[f"obtenir_classement_{tri}_{ordre}"] = chronometrer(
+                lambda _: manager.obtenir_classement(10, tri=tri, ordre=ordre), iterations
+            )
+            operations[f"obtenir_classement_{tri}_{ordre}_offset"] = chronometrer(
+                lambda offset: manager.obtenir_classement(10, tri=tri, ordre=ordre, offset=offset),
+                iterations, lambda: aleatoire.randrange(nb_joueurs)
+            )
+    
+    operations["obtenir_statistiques"] = chronometrer(
+        manager.obtenir_statistiques, iterations, joueur_existant
+    )
+    
+    # Export : une partie avant chaque mesure, sinon le fichier n'est pas réécrit
+    sortie = fichier.with_name("index.html")
+    operations["exporter_html"] = chronometrer(
+        lambda _: manager.exporter_html(str(sortie)),
+        max(1, iterations // 10),
+        lambda: manager.enregistrer_lot([(joueur_existant(), aleatoire.randrange(0, 5000, 10))])
+    )
+    
+    fichiers = [fichier]
+    if partitions:
+        fichiers = list(fichier.parent.glob(f"{fichier.stem}.*sur{partitions}{fichier.suffix}"))
+    return {
+        "joueurs": nb_joueurs,
+        "stockage": f"{partitions} partitions" if partitions else "fichier unique",
+        "taille_fichier_mo": round(sum(f.stat().st_size for f in fichiers) / 1e6, 1),
+        "rss_max_mo": rss_max_mo(),
+        "operations": operations,
+    }
+
+
+def mesurer_taille(nb_joueurs: int, iterations: int, partitions: int) -> dict:
+    """Génère le fichier puis lance les mesures dans un sous-processus"""
+    with tempfile.TemporaryDirectory() as dossier:
+        debut = time.perf_counter()
+        fichier = preparer_fichier(Path(dossier), nb_joueurs)
+        duree_generation = time.perf_counter() - debut
+        
+        sortie = subprocess.run(
+            [sys.executable, __file__, "--mesurer", str(fichier),
+             "--joueurs", str(nb_joueurs), "--iterations", str(iterations),
+             "--partitions", str(partitions)],
+            cwd=str(DOSSIER_JEU), capture_output=True, text=True, check=True,
+        )
+    resultat = json.loads(sortie.stdout.strip().splitlines()[-1])
+    resultat["generation_s"] = round(duree_generation, 2)
+    return resultat
+
+
+def afficher(resultat: dict):
+    """Affiche les résultats d'une taille sous forme de tableau"""
+    print(f"\n📊 {resultat['joueurs']:,} joueurs ({resultat['stockage']}, "
+          f"{resultat['taille_fichier_mo']} Mo, pic mémoire {resultat['rss_max_mo']} Mo)")
+    for nom, mesure in resultat["operations"].items():
+        print(f"  {nom:<40} {mesure['debit'] or 0:>10.1f} op/s   p50 {mesure['p50']:>9.3f} ms   "
+              f"p95 {mesure['p95']:>9.3f} ms   p99 {mesure['p99']:>9.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks du ScoreManager")
+    parser.add_argument("--joueurs", type=int, nargs="+", default=[10000, 100000],
+                        help="tailles à mesurer (défaut : 10000 100000)")
+    parser.add_argument("--iterations", type=int, default=200,
+                        help="mesures par opération de lecture (défaut : 200)")
+    parser.add_argument("--partitions", type=int, default=0,
+                        help="mesurer ScoreManagerPartitionne avec N partitions (défaut : fichier unique)")
+    parser.add_argument("--sortie", type=Path, help="fichier JSON des résultats")
+    parser.add_argument("--mesurer", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    # Sous-processus : mesures sur un fichier déjà généré, résultat JSON sur la sortie standard
+    if args.mesurer:
+        print(json.dumps(mesurer(args.mesurer, args.joueurs[0], args.iterations, args.partitions)))
+        return
+    
+    rapport = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": version_git(),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "schema": VERSION_SCHEMA,
+        "iterations": args.iterations,
+        "resultats": [],
+    }
+    for nb_joueurs in args.joueurs:
+        print(f"📝 Génération et mesures pour {nb_joueurs:,} joueurs...")
+        resultat = mesurer_taille(nb_joueurs, args.iterations, args.partitions)
+        rapport["resultats"].append(resultat)
+        afficher(resultat)
+    
+    if args.sortie:
+        args.sortie.write_text(json.dumps(rapport, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Résultats écrits dans {args.sortie}")
+    else:
+        print()
+        print(json.dumps(rapport, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
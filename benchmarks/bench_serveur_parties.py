@@ -0,0 +1,247 @@
+"""
+Test de charge du serveur de parties (sessions simultanées tenues par un cœur)
+
+Lance game/serveur_parties.py dans un processus séparé (épinglé sur le
+premier cœur quand la plateforme le permet), puis, pour chaque palier,
+ouvre le nombre de sessions demandé depuis des processus clients (sur les
+autres cœurs). Chaque client décode les différences (ClientPartie),
+acquitte chaque tick, change d'actions de temps en temps et relance une
+partie quand elle se termine.
+
+Pendant la fenêtre de mesure, chaque session doit avancer de
+frequence × durée ticks : le taux est le rapport entre les ticks reçus et
+ce nombre. Un palier est tenu si le taux moyen atteint le seuil (0,95 par
+défaut) ; la montée s'arrête au premier palier qui ne l'est pas.
+
+Usage :
+    python benchmarks/bench_serveur_parties.py --sessions 250 500 1000 2000 --sortie resultats.json
+    python benchmarks/bench_serveur_parties.py --sessions 1000 --frequence 30 --duree 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+DOSSIER_JEU = Path(__file__).resolve().parent.parent / "game"
+sys.path.insert(0, str(DOSSIER_JEU))
+
+from commun import (centile, coeurs_disponibles, epingler,
+                    relever_limite_fichiers, temps_cpu, version_git)
+from serveur_parties import ACTIONS, ClientPartie, encoder
+
+CHANCE_ACTIONS = 0.05          # probabilité de changer d'actions à chaque tick
+DELAI_DEMARRAGE = 10           # secondes d'attente de l'ouverture du port
+
+
+# ==============================================================================
+# PROCESSUS CLIENT
+# ==============================================================================
+
+async def jouer(port: int, debut: float, fin: float, mesures: list):
+    """Une session : décode, acquitte, joue ; note le premier et le dernier tick de la fenêtre"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    client = ClientPartie()
+    aleatoire = random.Random()
+    mesure = {"tick_debut": None, "tick_fin": None, "messages": 0, "octets": 0}
+    mesures.append(mesure)
+    try:
+        while True:
+            ligne = await reader.readline()
+            if not ligne:
+                return
+            tick = client.appliquer(json.loads(ligne))
+            maintenant = time.time()
+            if maintenant >= fin:
+                return
+            if maintenant >= debut:
+                if mesure["tick_debut"] is None:
+                    mesure["tick_debut"] = tick
+                mesure["tick_fin"] = tick
+                mesure["messages"] += 1
+                mesure["octets"] += len(ligne)
+            
+            reponse = {"ack": tick}
+            if aleatoire.random() < CHANCE_ACTIONS:
+                reponse["actions"] = aleatoire.sample(ACTIONS, aleatoire.randint(0, 2))
+            if client.fin:
+                reponse["nouvelle"] = True
+            writer.write(encoder(reponse))
+    finally:
+        writer.close()
+
+
+async def lancer_clients(nb: int, port: int, debut: float, fin: float) -> dict:
+    """Ouvre nb sessions et les fait jouer jusqu'à la fin de la fenêtre"""
+    mesures = []
+    taches = []
+    for _ in range(nb):
+        taches.append(asyncio.create_task(jouer(port, debut, fin, mesures)))
+        # Ne pas saturer la file d'attente d'acceptation du serveur
+        await asyncio.sleep(0)
+    pret = time.time()
+    # Une session qui ne reçoit plus rien garde le dernier tick reçu
+    _, en_attente = await asyncio.wait(taches, timeout=max(0.0, fin - time.time()) + 2)
+    for tache in en_attente:
+        tache.cancel()
+    return {"mesures": mesures, "pret_avant_debut": pret <= debut}
+
+
+# ==============================================================================
+# PROCESSUS PRINCIPAL
+# ==============================================================================
+
+def demarrer_serveur(frequence: float, coeur: list) -> tuple:
+    """Lance le serveur sur un port libre, retourne (processus, port)"""
+    environnement = dict(os.environ, PYTHONIOENCODING="utf-8")
+    serveur = subprocess.Popen(
+        [sys.executable, str(DOSSIER_JEU / "serveur_parties.py"), "--port", "0",
+         "--frequence", str(frequence), "--silencieux"],
+        cwd=str(DOSSIER_JEU), stdout=subprocess.PIPE, text=True, encoding="utf-8", env=environnement,
+    )
+    epingler(serveur.pid, coeur)
+    debut = time.perf_counter()
+    ligne = serveur.stdout.readline()
+    correspondance = re.search(r":(\d+) ", ligne)
+    if correspondance is None or time.perf_counter() - debut > DELAI_DEMARRAGE:
+        serveur.kill()
+        raise RuntimeError(f"Le serveur n'a pas démarré : {ligne!r}")
+    return serveur, int(correspondance.group(1))
+
+
+def mesurer_palier(nb_sessions: int, port: int, serveur_pid: int, args, coeurs_clients: list) -> dict:
+    """Ouvre nb_sessions réparties sur les processus clients et mesure la fenêtre"""
+    nb_processus = max(1, min(args.processus, nb_sessions))
+    # Temps de connexion estimé, puis chauffe, avant la fenêtre de mesure
+    debut = time.time() + 1 + nb_sessions / 2000 + args.chauffe
+    fin = debut + args.duree
+    
+    clients = []
+    for i in range(nb_processus):
+        nb = nb_sessions // nb_processus + (i < nb_sessions % nb_processus)
+        processus = subprocess.Popen(
+            [sys.executable, __file__, "--clients", str(nb), "--port", str(port),
+             "--debut", repr(debut), "--fin", repr(fin)],
+            cwd=str(DOSSIER_JEU), stdout=subprocess.PIPE, text=True,
+        )
+        epingler(processus.pid, coeurs_clients)
+        clients.append(processus)
+    
+    time.sleep(max(0.0, debut - time.time()))
+    cpu_debut = temps_cpu(serveur_pid)
+    time.sleep(max(0.0, fin - time.time()))
+    cpu_fin = temps_cpu(serveur_pid)
+    
+    mesures, prets = [], True
+    for processus in clients:
+        sortie, _ = processus.communicate()
+        resultat = json.loads(sortie.strip().splitlines()[-1])
+        mesures += resultat["mesures"]
+        prets &= resultat["pret_avant_debut"]
+    
+    attendus = args.frequence * args.duree
+    taux = [
+        (m["tick_fin"] - m["tick_debut"]) / attendus if m["tick_debut"] is not None and m["tick_fin"] is not None
+        else 0.0
+        for m in mesures
+    ]
+    taux += [0.0] * (nb_sessions - len(taux))  # connexions refusées ou échouées
+    messages = sum(m["messages"] for m in mesures)
+    taux_moyen = sum(taux) / len(taux)
+    return {
+        "sessions": nb_sessions,
+        "taux_moyen": round(taux_moyen, 4),
+        "taux_p5": round(centile(taux, 5), 4),
+        "taux_min": round(min(taux), 4),
+        "ticks_par_s": round(sum(taux) * args.frequence, 1),
+        "octets_par_message": round(sum(m["octets"] for m in mesures) / messages, 1) if messages else None,
+        "cpu_serveur": (round((cpu_fin - cpu_debut) / args.duree, 3)
+                        if cpu_debut is not None and cpu_fin is not None else None),
+        "clients_prets": prets,
+        "tenu": taux_moyen >= args.seuil,
+    }
+
+
+def afficher(resultat: dict):
+    """Affiche un palier sur une ligne"""
+    cpu = resultat["cpu_serveur"]
+    print(f"  {resultat['sessions']:>6} sessions   taux {resultat['taux_moyen']:>6.1%} "
+          f"(p5 {resultat['taux_p5']:>6.1%}, min {resultat['taux_min']:>6.1%})   "
+          f"{resultat['ticks_par_s']:>9,.0f} ticks/s   {resultat['octets_par_message'] or 0:>6.1f} o/msg   "
+          f"CPU serveur {'?' if cpu is None else f'{cpu:.0%}':>5}   "
+          f"{'✅' if resultat['tenu'] else '❌'}{'' if resultat['clients_prets'] else ' (clients en retard)'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge du serveur de parties")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100, 250, 500, 1000, 2000, 4000],
+                        help="paliers de sessions simultanées (défaut : 100 250 500 1000 2000 4000)")
+    parser.add_argument("--frequence", type=float, default=20, help="ticks par seconde (défaut : 20)")
+    parser.add_argument("--duree", type=float, default=5, help="secondes de mesure par palier (défaut : 5)")
+    parser.add_argument("--chauffe", type=float, default=2, help="secondes avant la mesure (défaut : 2)")
+    parser.add_argument("--seuil", type=float, default=0.95,
+                        help="taux moyen pour qu'un palier soit tenu (défaut : 0.95)")
+    parser.add_argument("--processus", type=int, default=max(1, len(coeurs_disponibles()) - 1),
+                        help="processus clients (défaut : un par cœur hors celui du serveur)")
+    parser.add_argument("--sortie", type=Path, help="fichier JSON des résultats")
+    parser.add_argument("--clients", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--debut", type=float, help=argparse.SUPPRESS)
+    parser.add_argument("--fin", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    # Sous-processus : sessions clientes, résultat JSON sur la sortie standard
+    if args.clients:
+        print(json.dumps(asyncio.run(lancer_clients(args.clients, args.port, args.debut, args.fin))))
+        return 0
+    
+    relever_limite_fichiers()
+    coeurs = coeurs_disponibles()
+    coeur_serveur, coeurs_clients = coeurs[:1], coeurs[1:] or coeurs
+    if len(coeurs) == 1:
+        print("⚠️  Un seul cœur : serveur et clients se le partagent, les résultats sont pessimistes")
+    
+    serveur, port = demarrer_serveur(args.frequence, coeur_serveur)
+    rapport = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": version_git(),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "coeurs": len(coeurs),
+        "frequence": args.frequence,
+        "duree": args.duree,
+        "seuil": args.seuil,
+        "resultats": [],
+        "sessions_tenues": 0,
+    }
+    print(f"📊 Serveur sur le port {port}, {args.frequence:g} ticks/s par session, "
+          f"{args.processus} processus client(s)")
+    try:
+        for nb_sessions in sorted(args.sessions):
+            resultat = mesurer_palier(nb_sessions, port, serveur.pid, args, coeurs_clients)
+            rapport["resultats"].append(resultat)
+            afficher(resultat)
+            if not resultat["tenu"]:
+                break
+            rapport["sessions_tenues"] = nb_sessions
+    finally:
+        serveur.kill()
+        serveur.wait()
+    
+    print(f"\n✅ Sessions tenues sur un cœur : {rapport['sessions_tenues']:,}")
+    if args.sortie:
+        args.sortie.write_text(json.dumps(rapport, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"💾 Résultats écrits dans {args.sortie}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Benchmark de la sortie console sur un terminal lent (EcranNonBloquant)
+
+Simule la boucle de jeu de shooter_console (30 frames/s, une image tous
+les 0,067 s) en écrivant les images sur un pseudo-terminal dont l'autre
+bout est lu à débit limité, comme un lien SSH lent. Un terminal figé
+(Ctrl+S, fenêtre bloquée) peut aussi être simulé par une pause du
+lecteur au milieu de la mesure.
+
+Deux sorties sont comparées :
+    - bloquant : print(..., flush=True) de toute l'image (ancienne boucle)
+    - non_bloquant : EcranNonBloquant (images sautées tant que la précédente est en vol)
+
+Mesures : cadence du jeu (frames/s), cadence d'affichage (images/s),
+images sautées, plus longue interruption de la boucle de jeu.
+
+Usage :
+    python benchmarks/bench_sortie_console.py --debits 0 64 16 --pause 1 --sortie resultats.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+DOSSIER_JEU = Path(__file__).resolve().parent.parent / "game"
+sys.path.insert(0, str(DOSSIER_JEU))
+
+from commun import version_git
+from shooter_console import (ConfigDifficulte, EcranNonBloquant, GameEngineConsole, avancer_frame,
+                             preparer_partie, rendre_grille)
+
+PERIODE_IMAGE = 0.067          # comme boucle_jeu (environ 15 images/s)
+BLOC_LECTURE = 1024            # octets lus à la fois par le terminal simulé
+
+
+class TerminalLent(threading.Thread):
+    """Lit l'autre bout du pseudo-terminal à débit limité (0 : sans limite), avec une pause éventuelle"""
+    
+    def __init__(self, fd: int, debit: float, pause: tuple):
+        super().__init__(daemon=True)
+        self.fd = fd
+        self.debit = debit * 1024
+        self.debut_pause, self.fin_pause = pause
+        self.octets = 0
+    
+    def run(self):
+        while True:
+            maintenant = time.perf_counter()
+            if self.debut_pause <= maintenant < self.fin_pause:
+                time.sleep(self.fin_pause - maintenant)
+            try:
+                donnees = os.read(self.fd, BLOC_LECTURE if self.debit else 65536)
+            except OSError:
+                return
+            if not donnees:
+                return
+            self.octets += len(donnees)
+            if self.debit:
+                time.sleep(len(donnees) / self.debit)
+
+
+def mesurer(mode: str, debit: float, args) -> dict:
+    """Joue la durée demandée en affichant sur un terminal lent, retourne les cadences"""
+    maitre, esclave = os.openpty()
+    debut = time.perf_counter()
+    pause = (debut + args.duree / 3, debut + args.duree / 3 + args.pause) if args.pause else (0, 0)
+    terminal = TerminalLent(maitre, debit, pause)
+    terminal.start()
+    sortie = open(esclave, "w", encoding="utf-8", closefd=False)
+    
+    game_engine = GameEngineConsole(args.largeur, args.hauteur, graine=1)
+    spawner = preparer_partie(game_engine)
+    ennemis_detruits = 0
+    frames = images = 0
+    pire_interruption = 0.0
+    ecran = EcranNonBloquant(fd=esclave)
+    temps_debut = time.time()
+    with ecran:
+        debut = derniere_frame = prochaine_frame = prochaine_image = time.perf_counter()
+        fin = debut + args.duree
+        while time.perf_counter() < fin:
+            maintenant = time.perf_counter()
+            if maintenant >= prochaine_frame:
+                pire_interruption = max(pire_interruption, maintenant - derniere_frame)
+                derniere_frame = maintenant
+                ennemis_detruits = avancer_frame(game_engine, spawner, ennemis_detruits)
+                game_engine.tirer()
+                if game_engine.jeu_termine:
+                    game_engine = GameEngineConsole(args.largeur, args.hauteur, graine=1)
+                    spawner = preparer_partie(game_engine)
+                frames += 1
+                prochaine_frame += ConfigDifficulte.VITESSE_MAJ
+                if prochaine_frame < maintenant:
+                    prochaine_frame = maintenant  # pas de rattrapage en rafale après un blocage
+            if maintenant >= prochaine_image:
+                prochaine_image = maintenant + PERIODE_IMAGE
+                if mode == "bloquant":
+                    print('\033[H' + rendre_grille(game_engine, None, ennemis_detruits, temps_debut),
+                          end='', file=sortie, flush=True)
+                    images += 1
+                elif ecran.pret():
+                    ecran.afficher('\033[H' + rendre_grille(game_engine, None, ennemis_detruits, temps_debut))
+                else:
+                    ecran.sauter()
+            else:
+                ecran.poursuivre()
+            time.sleep(ConfigDifficulte.VITESSE_INPUT)
+        duree = time.perf_counter() - debut
+    sortie.close()
+    os.close(esclave)
+    os.close(maitre)
+    
+    if mode != "bloquant":
+        images = ecran.images
+    return {
+        "mode": mode,
+        "debit_ko_s": debit,
+        "frames_par_s": round(frames / duree, 1),
+        "images_par_s": round(images / duree, 1),
+        "images_sautees": ecran.sautees,
+        "pire_interruption_ms": round(pire_interruption * 1000, 1),
+    }
+
+
+def afficher(resultat: dict):
+    """Affiche une mesure sur une ligne"""
+    debit = resultat["debit_ko_s"]
+    print(f"  {'illimité' if not debit else f'{debit:g} Ko/s':>10}   {resultat['mode']:<12}   "
+          f"jeu {resultat['frames_par_s']:>5.1f} frames/s   affichage {resultat['images_par_s']:>5.1f} images/s   "
+          f"sautées {resultat['images_sautees']:>4}   "
+          f"pire interruption {resultat['pire_interruption_ms']:>7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la sortie console sur un terminal lent")
+    parser.add_argument("--debits", type=float, nargs="+", default=[0, 64, 16],
+                        help="débits du terminal en Ko/s, 0 : illimité (défaut : 0 64 16)")
+    parser.add_argument("--pause", type=float, default=1.0,
+                        help="secondes de terminal figé au tiers de la mesure, 0 : aucune (défaut : 1)")
+    parser.add_argument("--duree", type=float, default=5, help="secondes de jeu par mesure (défaut : 5)")
+    parser.add_argument("--largeur", type=int, default=80, help="largeur de la grille (défaut : 80)")
+    parser.add_argument("--hauteur", type=int, default=30, help="hauteur de la grille (défaut : 30)")
+    parser.add_argument("--sortie", type=Path, help="fichier JSON des résultats")
+    args = parser.parse_args()
+    
+    if not hasattr(os, "openpty"):
+        print("❌ Pseudo-terminaux indisponibles sur cette plateforme")
+        return 1
+    
+    rapport = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": version_git(),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "duree": args.duree,
+        "pause": args.pause,
+        "grille": [args.largeur, args.hauteur],
+        "resultats": [],
+    }
+    print(f"🖥️  Grille {args.largeur}×{args.hauteur}, {ConfigDifficulte.FPS_CIBLE} frames/s visées, "
+          f"terminal figé {args.pause:g} s")
+    for debit in args.debits:
+        for mode in ("bloquant", "non_bloquant"):
+            resultat = mesurer(mode, debit, args)
+            rapport["resultats"].append(resultat)
+            afficher(resultat)
+    
+    if args.sortie:
+        args.sortie.write_text(json.dumps(rapport, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Résultats écrits dans {args.sortie}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
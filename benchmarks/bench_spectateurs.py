@@ -0,0 +1,226 @@
+"""
+Benchmark de la diffusion aux spectateurs (spectateurs.py)
+
+Pour chaque nombre de spectateurs demandé, connecte les spectateurs
+depuis un processus séparé (dont une part de spectateurs « lents » qui ne
+lisent jamais), puis simule la boucle de jeu console : une partie
+GameEngineConsole avance à 30 FPS et son image (rendre_grille) est publiée
+au rythme de l'affichage.
+
+Mesures :
+    - durée de publier() vue par la boucle de jeu (p50/p99), dont l'encodage
+    - durée de l'envoi d'une image à tous les spectateurs (thread réseau)
+    - images par seconde effectivement tenues par la boucle de jeu
+    - images reçues par les spectateurs normaux, images sautées au total
+
+L'encodage et publier() ne doivent pas dépendre du nombre de spectateurs,
+ni de la présence de spectateurs lents.
+
+Usage :
+    python benchmarks/bench_spectateurs.py --spectateurs 0 10 100 1000 --lents 10 --sortie resultats.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+DOSSIER_JEU = Path(__file__).resolve().parent.parent / "game"
+sys.path.insert(0, str(DOSSIER_JEU))
+
+from commun import centile, relever_limite_fichiers, version_git
+from shooter_console import Apparitions, ConfigDifficulte, GameEngineConsole, rendre_grille
+from spectateurs import DEBUT_IMAGE, DiffuseurSpectateurs
+
+MARQUEUR = DEBUT_IMAGE.encode("ascii")
+DELAI_CONNEXION = 30           # secondes d'attente de la connexion des spectateurs
+TAMPON_LENT = 4096             # tampon de réception d'un spectateur lent (réseau saturé)
+
+
+# ==============================================================================
+# PROCESSUS SPECTATEURS
+# ==============================================================================
+
+async def regarder(port: int, images: list, index: int):
+    """Spectateur normal : lit tout et compte les débuts d'image jusqu'à la déconnexion"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    reste = b""
+    try:
+        while True:
+            bloc = await reader.read(65536)
+            if not bloc:
+                return
+            bloc = reste + bloc
+            images[index] += bloc.count(MARQUEUR)
+            # Un marqueur coupé entre deux lectures sera compté avec la suivante
+            reste = bloc[-(len(MARQUEUR) - 1):] if not bloc.endswith(MARQUEUR) else b""
+    finally:
+        writer.close()
+
+
+async def lancer_spectateurs(nb: int, nb_lents: int, port: int, duree_max: float) -> dict:
+    """Connecte nb spectateurs (dont nb_lents qui ne lisent pas) jusqu'à la fin de la mesure"""
+    images = [0] * (nb - nb_lents)
+    taches = [asyncio.create_task(regarder(port, images, i)) for i in range(nb - nb_lents)]
+    lents = []
+    for _ in range(nb_lents):
+        # Petit tampon de réception : le serveur voit vite un spectateur qui n'avance plus
+        connexion = socket.socket()
+        connexion.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, TAMPON_LENT)
+        connexion.connect(("127.0.0.1", port))
+        lents.append(connexion)
+    if taches:
+        await asyncio.wait(taches, timeout=duree_max)
+    else:
+        # Que des spectateurs lents : rester connecté jusqu'à la fermeture de l'entrée standard par la mesure
+        await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(None, sys.stdin.read), duree_max)
+    for tache in taches:
+        tache.cancel()
+    for connexion in lents:
+        connexion.close()
+    return {"images": images}
+
+
+# ==============================================================================
+# PROCESSUS PRINCIPAL (BOUCLE DE JEU SIMULÉE)
+# ==============================================================================
+
+def mesurer(nb_spectateurs: int, args) -> dict:
+    """Connecte les spectateurs, joue et publie pendant la durée demandée"""
+    nb_lents = min(args.lents, nb_spectateurs)
+    diffuseur = DiffuseurSpectateurs(port=0)
+    port = diffuseur.demarrer()
+    spectateurs = None
+    if nb_spectateurs:
+        spectateurs = subprocess.Popen(
+            [sys.executable, __file__, "--regarder", str(nb_spectateurs), "--lents", str(nb_lents),
+             "--port", str(port), "--duree", str(args.duree)],
+            cwd=str(DOSSIER_JEU), stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        limite = time.perf_counter() + DELAI_CONNEXION
+        while diffuseur.spectateurs < nb_spectateurs and time.perf_counter() < limite:
+            time.sleep(0.05)
+    
+    def nouvelle_partie():
+        game_engine = GameEngineConsole(args.largeur, args.hauteur, graine=1)
+        Apparitions(game_engine)
+        return game_engine
+    
+    game_engine = nouvelle_partie()
+    publications = []
+    periode_image = 1 / args.fps
+    periode_frame = ConfigDifficulte.VITESSE_MAJ
+    temps_debut = time.time()
+    debut = prochaine_frame = prochaine_image = time.perf_counter()
+    fin = debut + args.duree
+    while time.perf_counter() < fin:
+        maintenant = time.perf_counter()
+        if maintenant >= prochaine_frame:
+            game_engine.mettre_a_jour()
+            game_engine.vider_evenements()
+            game_engine.tirer()
+            if game_engine.jeu_termine:
+                game_engine = nouvelle_partie()
+            prochaine_frame += periode_frame
+        if maintenant >= prochaine_image:
+            image = rendre_grille(game_engine, None, 0, temps_debut)
+            avant = time.perf_counter()
+            diffuseur.publier(image)
+            publications.append(time.perf_counter() - avant)
+            prochaine_image += periode_image
+        time.sleep(max(0.0, min(prochaine_frame, prochaine_image) - time.perf_counter()))
+    duree = time.perf_counter() - debut
+    
+    # Laisser partir la dernière image, puis fermer : les spectateurs normaux voient la fin du flux
+    time.sleep(0.5)
+    statistiques = diffuseur.statistiques()
+    connectes = statistiques["spectateurs"]
+    diffuseur.arreter()
+    
+    images = []
+    if spectateurs is not None:
+        sortie, _ = spectateurs.communicate()
+        images = json.loads(sortie.strip().splitlines()[-1])["images"]
+    
+    publiees = statistiques["publiees"]
+    return {
+        "spectateurs": nb_spectateurs,
+        "lents": nb_lents,
+        "connectes": connectes,
+        "taille_image_octets": len(diffuseur.derniere_image[1]),
+        "images_publiees": publiees,
+        "fps_jeu": round(publiees / duree, 1),
+        "publier_p50_us": round(centile(publications, 50) * 1e6, 1),
+        "publier_p99_us": round(centile(publications, 99) * 1e6, 1),
+        "encodage_moyen_us": round(statistiques["encodage_s"] / publiees * 1e6, 1),
+        "diffusion_moyenne_us": round(statistiques["diffusion_s"] / publiees * 1e6, 1),
+        "images_recues_moyenne": round(sum(images) / len(images), 1) if images else None,
+        "images_recues_min": min(images) if images else None,
+        "images_sautees": statistiques["sautees"],
+    }
+
+
+def afficher(resultat: dict):
+    """Affiche un nombre de spectateurs sur une ligne"""
+    recues = resultat["images_recues_moyenne"]
+    recues = "-" if recues is None else f"{recues:.0f}/{resultat['images_publiees']}"
+    print(f"  {resultat['spectateurs']:>5} spectateurs ({resultat['lents']} lents)   "
+          f"publier p50 {resultat['publier_p50_us']:>7.1f} µs  p99 {resultat['publier_p99_us']:>7.1f} µs   "
+          f"encodage {resultat['encodage_moyen_us']:>6.1f} µs   diffusion {resultat['diffusion_moyenne_us']:>8.1f} µs   jeu {resultat['fps_jeu']:>5.1f} img/s   "
+          f"reçues {recues:>9}   "
+          f"sautées {resultat['images_sautees']:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la diffusion aux spectateurs")
+    parser.add_argument("--spectateurs", type=int, nargs="+", default=[0, 10, 100, 1000],
+                        help="nombres de spectateurs (défaut : 0 10 100 1000)")
+    parser.add_argument("--lents", type=int, default=10,
+                        help="spectateurs qui ne lisent jamais, parmi eux (défaut : 10)")
+    parser.add_argument("--fps", type=float, default=15, help="images publiées par seconde (défaut : 15)")
+    parser.add_argument("--duree", type=float, default=5, help="secondes de jeu par mesure (défaut : 5)")
+    parser.add_argument("--largeur", type=int, default=80, help="largeur de la grille (défaut : 80)")
+    parser.add_argument("--hauteur", type=int, default=30, help="hauteur de la grille (défaut : 30)")
+    parser.add_argument("--sortie", type=Path, help="fichier JSON des résultats")
+    parser.add_argument("--regarder", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    relever_limite_fichiers()
+    
+    # Sous-processus : spectateurs, images reçues en JSON sur la sortie standard
+    if args.regarder:
+        duree_max = DELAI_CONNEXION + args.duree + 10
+        print(json.dumps(asyncio.run(lancer_spectateurs(args.regarder, args.lents, args.port, duree_max))))
+        return 0
+    
+    rapport = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": version_git(),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "fps": args.fps,
+        "duree": args.duree,
+        "grille": [args.largeur, args.hauteur],
+        "resultats": [],
+    }
+    print(f"📡 Diffusion d'une grille {args.largeur}×{args.hauteur} à {args.fps:g} images/s")
+    for nb_spectateurs in args.spectateurs:
+        resultat = mesurer(nb_spectateurs, args)
+        rapport["resultats"].append(resultat)
+        afficher(resultat)
+    
+    if args.sortie:
+        args.sortie.write_text(json.dumps(rapport, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Résultats écrits dans {args.sortie}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Test de charge de l'API des scores de serveur_web.py (POST /scores, GET /leaderboard)
+
+Lance le serveur sur un fichier de scores temporaire (éventuellement
+pré-rempli), puis N clients simultanés soumettent des scores sur des
+connexions keep-alive. Chaque réponse n'arrive qu'une fois le score écrit
+sur le disque : le débit mesuré est celui des écritures groupées.
+
+Usage :
+    python benchmarks/charge_api_scores.py --clients 200 --requetes 50 --joueurs 100000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "game"))
+
+from charge_serveur_web import afficher, demarrer, lire_reponse
+from migrer_scores import generer_fichier_ancien, migrer_fichier
+
+SERVEUR_API = (
+    "import serveur_web;"
+    "serveur_web.SERVICE = serveur_web.ServiceScores({fichier!r});"
+    "serveur_web.SERVICE.demarrer();"
+    "serveur_web.ServeurHTTP(('127.0.0.1', {port}), journal_actif=False).serve_forever()"
+)
+
+
+async def client(port: int, nb_requetes: int, fabriquer_requete, latences: list, compteurs: dict):
+    """Un client keep-alive qui envoie `nb_requetes` requêtes à la suite"""
+    lecteur, ecrivain = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for _ in range(nb_requetes):
+            debut = time.perf_counter()
+            ecrivain.write(fabriquer_requete())
+            await ecrivain.drain()
+            statut, _, taille = await lire_reponse(lecteur)
+            latences.append(time.perf_counter() - debut)
+            compteurs[statut] = compteurs.get(statut, 0) + 1
+            compteurs["octets"] += taille
+    except (ConnectionError, asyncio.IncompleteReadError, OSError):
+        compteurs["erreurs"] += 1
+    finally:
+        ecrivain.close()
+
+
+async def lancer(port: int, nb_clients: int, nb_requetes: int, fabriquer_requete) -> dict:
+    """Lance les clients et calcule débit et latences"""
+    latences = []
+    compteurs = {"erreurs": 0, "octets": 0}
+    debut = time.perf_counter()
+    await asyncio.gather(*(
+        client(port, nb_requetes, fabriquer_requete, latences, compteurs)
+        for _ in range(nb_clients)
+    ))
+    duree = time.perf_counter() - debut
+    
+    latences.sort()
+    
+    def centile(p):
+        return latences[min(len(latences) - 1, int(p / 100 * len(latences)))] * 1000 if latences else 0
+    
+    return {
+        "requetes": len(latences),
+        "duree": duree,
+        "debit": len(latences) / duree if duree else 0,
+        "p50": centile(50),
+        "p95": centile(95),
+        "p99": centile(99),
+        "compteurs": compteurs,
+    }
+
+
+def requete_score(nb_joueurs: int):
+    """Fabrique des POST /scores pour des joueurs tirés au hasard"""
+    def fabriquer():
+        corps = json.dumps({
+            "joueur": f"Joueur_{random.randrange(nb_joueurs)}",
+            "score": random.randrange(0, 5000, 10),
+        }).encode()
+        return (
+            b"POST /scores HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+            + f"Content-Length: {len(corps)}\r\n\r\n".encode() + corps
+        )
+    return fabriquer
+
+
+def requete_leaderboard(nb_joueurs: int):
+    """Fabrique des GET /leaderboard sur des pages tirées au hasard"""
+    def fabriquer():
+        tri, ordre = random.choice(["score", "date", "pseudo"]), random.choice(["asc", "desc"])
+        offset = random.randrange(max(1, nb_joueurs))
+        return (
+            f"GET /leaderboard?tri={tri}&ordre={ordre}&limite=20&offset={offset} HTTP/1.1\r\n"
+            f"Host: 127.0.0.1\r\n\r\n"
+        ).encode()
+    return fabriquer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de l'API des scores")
+    parser.add_argument("--clients", type=int, default=200, help="clients simultanés (défaut : 200)")
+    parser.add_argument("--requetes", type=int, default=50, help="requêtes par client (défaut : 50)")
+    parser.add_argument("--joueurs", type=int, default=10000, help="joueurs déjà enregistrés (défaut : 10000)")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as dossier:
+        fichier = Path(dossier) / "scores.json"
+        if args.joueurs:
+            ancien = Path(dossier) / "scores_v1.json"
+            generer_fichier_ancien(ancien, args.joueurs)
+            migrer_fichier(ancien, fichier)
+        
+        print(f"📊 {args.clients} clients × {args.requetes} requêtes, {args.joueurs} joueurs existants")
+        processus = demarrer(SERVEUR_API, args.port, fichier=str(fichier))
+        try:
+            afficher("POST /scores", asyncio.run(
+                lancer(args.port, args.clients, args.requetes, requete_score(max(1, args.joueurs)))))
+            afficher("GET /leaderboard", asyncio.run(
+                lancer(args.port, args.clients, args.requetes, requete_leaderboard(args.joueurs))))
+            
+            metriques = urllib.request.urlopen(f"http://127.0.0.1:{args.port}/metrics").read().decode()
+            valeurs = dict(ligne.rsplit(" ", 1) for ligne in metriques.splitlines())
+            nb_scores = int(valeurs["serveur_web_scores_ecrits"])
+            nb_lots = int(valeurs["serveur_web_lots_ecrits"])
+            print(f"\n💾 {nb_scores} scores écrits en {nb_lots} écritures du journal "
+                  f"({nb_scores / max(1, nb_lots):.0f} scores par écriture)")
+        finally:
+            processus.terminate()
+            processus.wait()
+
+
+if __name__ == "__main__":
+    main()
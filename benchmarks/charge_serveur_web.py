@@ -0,0 +1,181 @@
+"""
+Générateur de charge pour serveur_web.py
+
+Lance le serveur dans un processus séparé puis simule N clients simultanés
+(connexions keep-alive) qui rechargent index.html en boucle, avec ou sans
+revalidation (If-None-Match). Compare avec l'ancien serveur mono-thread.
+
+Usage :
+    python benchmarks/charge_serveur_web.py --clients 500 --requetes 20
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+DOSSIER_JEU = Path(__file__).resolve().parent.parent / "game"
+sys.path.insert(0, str(DOSSIER_JEU))
+
+# Code des serveurs lancés dans un sous-processus
+SERVEUR_NOUVEAU = (
+    "import serveur_web;"
+    "serveur_web.ServeurHTTP(('127.0.0.1', {port}), journal_actif=False).serve_forever()"
+)
+SERVEUR_ANCIEN = (
+    "import http.server, socketserver, functools;"
+    "h = functools.partial(http.server.SimpleHTTPRequestHandler, directory={dossier!r});"
+    "h.func.log_message = lambda *a: None;"
+    "socketserver.TCPServer.request_queue_size = 1024;"
+    "socketserver.TCPServer.allow_reuse_address = True;"
+    "socketserver.TCPServer(('127.0.0.1', {port}), h).serve_forever()"
+)
+
+
+async def lire_reponse(lecteur: asyncio.StreamReader):
+    """Lit une réponse HTTP/1.x, retourne (statut, entêtes, taille du corps)"""
+    ligne_statut = await lecteur.readline()
+    if not ligne_statut:
+        raise ConnectionError("connexion fermée")
+    version, statut = ligne_statut.split()[:2]
+    entetes = {"version": version.decode()}
+    while True:
+        ligne = await lecteur.readline()
+        if ligne in (b"\r\n", b"\n", b""):
+            break
+        cle, _, valeur = ligne.decode("latin-1").partition(":")
+        entetes[cle.strip().lower()] = valeur.strip()
+    
+    taille = int(entetes.get("content-length", 0))
+    if taille:
+        await lecteur.readexactly(taille)
+    return int(statut), entetes, taille
+
+
+async def client(port: int, nb_requetes: int, revalider: bool, latences: list, compteurs: dict):
+    """Un client : une connexion keep-alive (rouverte si le serveur la ferme)"""
+    lecteur = ecrivain = None
+    etag = None
+    for _ in range(nb_requetes):
+        entetes = "Accept-Encoding: gzip, br\r\n"
+        if revalider and etag:
+            entetes += f"If-None-Match: {etag}\r\n"
+        requete = (
+            f"GET /index.html HTTP/1.1\r\nHost: 127.0.0.1\r\n{entetes}\r\n"
+        ).encode()
+        
+        debut = time.perf_counter()
+        try:
+            if ecrivain is None:
+                lecteur, ecrivain = await asyncio.open_connection("127.0.0.1", port)
+            ecrivain.write(requete)
+            await ecrivain.drain()
+            statut, reponse, taille = await lire_reponse(lecteur)
+        except (ConnectionError, asyncio.IncompleteReadError, OSError):
+            compteurs["erreurs"] += 1
+            if ecrivain is not None:
+                ecrivain.close()
+            lecteur = ecrivain = None
+            continue
+        latences.append(time.perf_counter() - debut)
+        
+        compteurs[statut] = compteurs.get(statut, 0) + 1
+        compteurs["octets"] += taille
+        etag = reponse.get("etag", etag)
+        # Un serveur HTTP/1.0 ferme la connexion après chaque réponse
+        if reponse["version"] == "HTTP/1.0" or reponse.get("connection", "").lower() == "close":
+            ecrivain.close()
+            lecteur = ecrivain = None
+    if ecrivain is not None:
+        ecrivain.close()
+
+
+async def lancer_charge(port: int, nb_clients: int, nb_requetes: int, revalider: bool) -> dict:
+    """Lance `nb_clients` clients simultanés et mesure débit et latences"""
+    latences = []
+    compteurs = {"erreurs": 0, "octets": 0}
+    debut = time.perf_counter()
+    await asyncio.gather(*(
+        client(port, nb_requetes, revalider, latences, compteurs)
+        for _ in range(nb_clients)
+    ))
+    duree = time.perf_counter() - debut
+    
+    latences.sort()
+    
+    def centile(p):
+        return latences[min(len(latences) - 1, int(p / 100 * len(latences)))] * 1000 if latences else 0
+    
+    return {
+        "requetes": len(latences),
+        "duree": duree,
+        "debit": len(latences) / duree if duree else 0,
+        "p50": centile(50),
+        "p95": centile(95),
+        "p99": centile(99),
+        "moyenne": statistics.mean(latences) * 1000 if latences else 0,
+        "compteurs": compteurs,
+    }
+
+
+def demarrer(code: str, port: int, **parametres) -> subprocess.Popen:
+    """Démarre un serveur dans un sous-processus et attend qu'il écoute"""
+    processus = subprocess.Popen(
+        [sys.executable, "-c", code.format(port=port, dossier=str(DOSSIER_JEU), **parametres)],
+        cwd=str(DOSSIER_JEU),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    limite = time.time() + 60
+    while time.time() < limite and processus.poll() is None:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return processus
+        except OSError:
+            time.sleep(0.1)
+    processus.kill()
+    raise RuntimeError(f"le serveur n'a pas démarré sur le port {port}")
+
+
+def afficher(titre: str, resultat: dict):
+    """Affiche les résultats d'un scénario"""
+    compteurs = dict(resultat["compteurs"])
+    octets = compteurs.pop("octets")
+    print(f"  {titre:<28} {resultat['debit']:>8.0f} req/s   "
+          f"p50 {resultat['p50']:>7.1f} ms   p95 {resultat['p95']:>7.1f} ms   "
+          f"p99 {resultat['p99']:>7.1f} ms   {octets / max(1, resultat['requetes']):>7.0f} o/req   "
+          f"{compteurs}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge du serveur web des scores")
+    parser.add_argument("--clients", type=int, default=500, help="clients simultanés (défaut : 500)")
+    parser.add_argument("--requetes", type=int, default=20, help="requêtes par client (défaut : 20)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sans-ancien", action="store_true", help="ne pas mesurer l'ancien serveur")
+    args = parser.parse_args()
+    
+    serveurs = [("ThreadingHTTPServer + cache", SERVEUR_NOUVEAU)]
+    if not args.sans_ancien:
+        serveurs.append(("TCPServer (ancien)", SERVEUR_ANCIEN))
+    
+    print(f"📊 {args.clients} clients × {args.requetes} requêtes sur /index.html")
+    for nom, code in serveurs:
+        processus = demarrer(code, args.port)
+        try:
+            print(f"\n🌐 {nom}")
+            afficher("téléchargement complet", asyncio.run(
+                lancer_charge(args.port, args.clients, args.requetes, revalider=False)))
+            afficher("revalidation (If-None-Match)", asyncio.run(
+                lancer_charge(args.port, args.clients, args.requetes, revalider=True)))
+        finally:
+            processus.terminate()
+            processus.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Fonctions communes aux benchmarks
+
+Importées par les scripts bench_*.py du même dossier (lancés depuis
+n'importe où : le dossier du script est en tête de sys.path).
+"""
+
+import os
+import subprocess
+from pathlib import Path
+
+# Limite de fichiers ouverts (module absent sous Windows)
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+DOSSIER_JEU = Path(__file__).resolve().parent.parent / "game"
+
+
+def version_git():
+    """Commit courant du dépôt (None hors d'un dépôt git)"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=str(DOSSIER_JEU),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def centile(valeurs: list, p: float):
+    """Centile p (0-100) d'une liste non vide"""
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(p / 100 * len(valeurs)))]
+
+
+def coeurs_disponibles() -> list:
+    """Cœurs utilisables par ce processus (tous si l'affinité n'est pas gérée)"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def epingler(pid: int, coeurs: list):
+    """Restreint un processus à des cœurs (sans effet hors Linux)"""
+    if hasattr(os, "sched_setaffinity") and coeurs:
+        os.sched_setaffinity(pid, coeurs)
+
+
+def relever_limite_fichiers():
+    """Monte la limite de fichiers ouverts au maximum permis (héritée par les sous-processus)"""
+    if RESOURCE_AVAILABLE:
+        _, maximum = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (maximum, maximum))
+
+
+def temps_cpu(pid: int):
+    """Temps CPU (utilisateur + système) d'un processus en secondes (None hors Linux)"""
+    try:
+        champs = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(champs[11]) + int(champs[12])) / os.sysconf("SC_CLK_TCK")
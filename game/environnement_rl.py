@@ -0,0 +1,494 @@
+"""
+Environnements d'apprentissage par renforcement pour le Shooter Spatial
+
+Deux interfaces au style Gym, mêmes règles, mêmes observations :
+    - EnvironnementShooter : une partie, autour d'un vrai GameEngine
+    - EnvironnementsVectorises : N parties avancées ensemble ; l'état est
+      rangé en tableaux NumPy (un tableau par attribut, une ligne par
+      partie) et chaque règle du moteur est appliquée à toutes les parties
+      d'un coup, remise à zéro automatique comprise.
+
+reset(seed) retourne l'observation, step(action) le triplet
+(observation, récompense, terminé). L'observation est un tenseur uint8
+d'occupation (CANAUX × hauteur × largeur) : vaisseau, ennemis,
+projectiles puis un canal par type de bonus (voir GameEngine.rasteriser).
+Avec facteur > 1, chaque case couvre facteur × facteur cellules du jeu.
+
+La récompense est l'évolution du score plus penalite_vie fois
+l'évolution du nombre de vies (négative quand une vie est perdue).
+
+Usage :
+    env = EnvironnementsVectorises(1024, graine=0)
+    observations = env.reset()
+    observations, recompenses, termines = env.step(actions)   # actions : tableau de 1024 entiers
+
+Nécessite NumPy (pip install numpy).
+"""
+
+import math
+from typing import Optional
+
+from game_classes import CANAUX, Bonus, GameEngine
+
+# NumPy est optionnel pour le jeu, indispensable ici
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Actions : (déplacement du vaisseau, tir)
+ACTIONS = (
+    (None, False),
+    ("gauche", False),
+    ("droite", False),
+    ("haut", False),
+    ("bas", False),
+    (None, True),
+    ("gauche", True),
+    ("droite", True),
+)
+NOMS_ACTIONS = ("rien", "gauche", "droite", "haut", "bas", "tir", "gauche_tir", "droite_tir")
+
+TYPES_BONUS = tuple(Bonus.TYPES)
+
+# Règles de la partie d'entraînement (apparitions régulières, sans progression)
+LARGEUR = 40
+HAUTEUR = 20
+INTERVALLE = 20
+VITESSE = 0.3
+CHANCE_BONUS = 0.1
+FRAMES_MAX = 5000
+PENALITE_VIE = 50
+
+# Constantes du moteur reproduites par la version vectorisée
+MARGE = 0.5
+VIES_MAX = 5
+DUREE_BONUS = 300
+COOLDOWN_NORMAL = 10
+COOLDOWN_RAPIDE = 5
+POINTS_ENNEMI = 10
+
+
+def _verifier_numpy():
+    if not NUMPY_AVAILABLE:
+        raise ImportError("Les environnements RL demandent NumPy : pip install numpy")
+
+
+# ==============================================================================
+# UNE PARTIE (GameEngine)
+# ==============================================================================
+
+class EnvironnementShooter:
+    """
+    Environnement d'une seule partie autour d'un GameEngine
+    
+    Attributs :
+        engine (GameEngine) : Partie en cours (recréée à chaque reset)
+    """
+    
+    def __init__(self, largeur: int = LARGEUR, hauteur: int = HAUTEUR, intervalle: int = INTERVALLE,
+                 vitesse: float = VITESSE, chance_bonus: float = CHANCE_BONUS,
+                 frames_max: int = FRAMES_MAX, penalite_vie: float = PENALITE_VIE, facteur: int = 1):
+        _verifier_numpy()
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.intervalle = intervalle
+        self.vitesse = vitesse
+        self.chance_bonus = chance_bonus
+        self.frames_max = frames_max
+        self.penalite_vie = penalite_vie
+        self.facteur = facteur
+        self.engine: Optional[GameEngine] = None
+        forme = (len(CANAUX), -(-hauteur // facteur), -(-largeur // facteur))
+        self._observation = np.zeros(forme, dtype=np.uint8)
+    
+    def reset(self, seed: Optional[int] = None):
+        """Commence une nouvelle partie, retourne la première observation"""
+        self.engine = GameEngine(self.largeur, self.hauteur, graine=seed)
+        self.engine.programmer_apparitions(self.intervalle, self.vitesse, self.chance_bonus, premiere=0)
+        return self._observer()
+    
+    def step(self, action: int):
+        """Joue une frame, retourne (observation, récompense, terminé)"""
+        engine = self.engine
+        deplacement, tir = ACTIONS[action]
+        if deplacement is not None:
+            getattr(engine.vaisseau, "deplacer_" + deplacement)()
+        if tir:
+            engine.tirer()
+        
+        score, vies = engine.score, engine.vaisseau.vies
+        engine.mettre_a_jour()
+        engine.evenements.clear()
+        
+        recompense = engine.score - score + self.penalite_vie * (engine.vaisseau.vies - vies)
+        termine = engine.jeu_termine or engine.frame_count >= self.frames_max
+        return self._observer(), recompense, termine
+    
+    def _observer(self):
+        """Tenseur d'occupation de la partie (réutilisé d'un appel à l'autre : copier pour le garder)"""
+        return self.engine.rasteriser(self._observation, self.facteur)
+
+
+# ==============================================================================
+# N PARTIES (tableaux NumPy)
+# ==============================================================================
+
+class EnvironnementsVectorises:
+    """
+    N parties avancées ensemble, état en tableaux NumPy
+    
+    Reprend les règles de GameEngine.mettre_a_jour() dans le même ordre
+    (minuteries, ennemis, projectiles, bonus, collisions, nettoyage) sur
+    des tableaux (N, capacité) : ennemis, projectiles et bonus restent
+    rangés par ordre d'apparition, donc « le premier de la liste » garde
+    le même sens que dans le moteur. Une partie terminée (plus de vies ou
+    frames_max atteint) est remise à zéro pendant le même step.
+    
+    Les capacités sont calculées pour que ni ennemis, ni projectiles, ni
+    bonus ne manquent de place avec les règles données.
+    
+    Attributs :
+        nb (int) : Nombre de parties
+        score, vies, frame : Tableaux (N,) de la partie en cours de chacune
+        score_final : Score de la partie qui vient de se terminer (valable là où terminé)
+    """
+    
+    def __init__(self, nb: int, largeur: int = LARGEUR, hauteur: int = HAUTEUR,
+                 intervalle: int = INTERVALLE, vitesse: float = VITESSE,
+                 chance_bonus: float = CHANCE_BONUS, frames_max: int = FRAMES_MAX,
+                 penalite_vie: float = PENALITE_VIE, facteur: int = 1, graine: Optional[int] = None):
+        _verifier_numpy()
+        self.nb = nb
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.intervalle = intervalle
+        self.vitesse = vitesse
+        self.chance_bonus = chance_bonus
+        self.frames_max = frames_max
+        self.penalite_vie = penalite_vie
+        self.facteur = facteur
+        self.rng = np.random.default_rng(graine)
+        
+        self.vitesse_base = min(2.5, 1.0 + max(0, largeur - 30) / 60.0)
+        poids = np.array([Bonus.TYPES[t]["poids"] for t in TYPES_BONUS], dtype=np.float64)
+        self._poids_bonus = poids / poids.sum()
+        
+        # Capacités : durée de vie maximale / intervalle d'apparition
+        self.cap_ennemis = math.ceil(hauteur / vitesse / intervalle) + 2
+        self.cap_projectiles = 3 * (math.ceil(hauteur / 2 / COOLDOWN_RAPIDE) + 2)
+        self.cap_bonus = math.ceil(hauteur / 0.5 / intervalle) + 2
+        
+        n = nb
+        entier, reel, booleen = np.int64, np.float64, np.bool_
+        self._lignes = np.arange(n)
+        
+        # Vaisseau et partie
+        self.frame = np.zeros(n, entier)
+        self.score = np.zeros(n, entier)
+        self.vies = np.zeros(n, entier)
+        self.vx = np.zeros(n, reel)
+        self.vy = np.zeros(n, reel)
+        self.invincible = np.zeros(n, entier)
+        self.dernier_tir = np.zeros(n, entier)
+        self.cooldown = np.zeros(n, entier)
+        self.vitesse_bonus = np.ones(n, reel)
+        self.tir_double = np.zeros(n, booleen)
+        self.tir_triple = np.zeros(n, booleen)
+        # Fin de chaque bonus temporaire (0 : inactif), colonnes = TYPES_BONUS[1:]
+        self.fins_bonus = np.zeros((n, len(TYPES_BONUS) - 1), entier)
+        self.prochaine_apparition = np.zeros(n, entier)
+        self.score_final = np.zeros(n, entier)
+        
+        # Ennemis (y = partie entière de nb_pas × vitesse, comme Ennemi.avancer)
+        self.ex = np.zeros((n, self.cap_ennemis), reel)
+        self.ey = np.zeros((n, self.cap_ennemis), reel)
+        self.e_pas = np.zeros((n, self.cap_ennemis), entier)
+        self.e_actif = np.zeros((n, self.cap_ennemis), booleen)
+        self.nb_ennemis = np.zeros(n, entier)
+        
+        # Projectiles
+        self.px = np.zeros((n, self.cap_projectiles), reel)
+        self.py = np.zeros((n, self.cap_projectiles), reel)
+        self.p_actif = np.zeros((n, self.cap_projectiles), booleen)
+        self.nb_projectiles = np.zeros(n, entier)
+        
+        # Bonus (type : index dans TYPES_BONUS)
+        self.bx = np.zeros((n, self.cap_bonus), reel)
+        self.by = np.zeros((n, self.cap_bonus), reel)
+        self.b_type = np.zeros((n, self.cap_bonus), entier)
+        self.b_actif = np.zeros((n, self.cap_bonus), booleen)
+        self.nb_bonus = np.zeros(n, entier)
+        
+        self._deplacements = np.array([
+            ("gauche", "droite", "haut", "bas").index(d) + 1 if d else 0 for d, _ in ACTIONS
+        ])
+        self._tirs = np.array([tir for _, tir in ACTIONS])
+        forme = (len(CANAUX), -(-hauteur // facteur), -(-largeur // facteur))
+        self._observations = np.zeros((n,) + forme, dtype=np.uint8)
+    
+    # --------------------------------------------------------------------------
+    # Remise à zéro
+    # --------------------------------------------------------------------------
+    
+    def reset(self, seed: Optional[int] = None):
+        """Recommence toutes les parties, retourne les observations"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reinitialiser(np.ones(self.nb, dtype=bool))
+        return self._observer()
+    
+    def _reinitialiser(self, masque):
+        """Remet les parties désignées par le masque dans l'état d'un GameEngine neuf"""
+        self.frame[masque] = 0
+        self.score[masque] = 0
+        self.vies[masque] = 3
+        self.vx[masque] = self.largeur // 2
+        self.vy[masque] = self.hauteur - 3
+        self.invincible[masque] = 0
+        self.dernier_tir[masque] = 0
+        self.cooldown[masque] = COOLDOWN_NORMAL
+        self.vitesse_bonus[masque] = 1.0
+        self.tir_double[masque] = False
+        self.tir_triple[masque] = False
+        self.fins_bonus[masque] = 0
+        # programmer_apparitions(..., premiere=0) : première apparition à la frame 1
+        self.prochaine_apparition[masque] = 1
+        self.e_actif[masque] = False
+        self.nb_ennemis[masque] = 0
+        self.p_actif[masque] = False
+        self.nb_projectiles[masque] = 0
+        self.b_actif[masque] = False
+        self.nb_bonus[masque] = 0
+    
+    # --------------------------------------------------------------------------
+    # Une frame
+    # --------------------------------------------------------------------------
+    
+    def step(self, actions):
+        """Joue une frame dans chaque partie, retourne (observations, récompenses, terminés)"""
+        actions = np.asarray(actions)
+        score_avant = self.score.copy()
+        vies_avant = self.vies.copy()
+        
+        self._appliquer_actions(actions)
+        self.frame += 1
+        self._minuteries()
+        vivantes = self._avancer()
+        self._collisions_vaisseau_ennemis(vivantes)
+        self._collisions_projectiles(vivantes)
+        self._collisions_bonus(vivantes)
+        self._nettoyer()
+        
+        recompenses = (self.score - score_avant) + self.penalite_vie * (self.vies - vies_avant)
+        termines = (self.vies <= 0) | (self.frame >= self.frames_max)
+        if termines.any():
+            self.score_final[termines] = self.score[termines]
+            self._reinitialiser(termines)
+        return self._observer(), recompenses, termines
+    
+    def _appliquer_actions(self, actions):
+        """Déplacements et tirs du vaisseau (avant la frame, comme une interface)"""
+        deplacement = self._deplacements[actions]
+        pas = self.vitesse_base * self.vitesse_bonus
+        
+        gauche = (deplacement == 1) & (self.vx > 0)
+        self.vx = np.where(gauche, np.maximum(0, self.vx - pas), self.vx)
+        droite = (deplacement == 2) & (self.vx < self.largeur - 2)
+        self.vx = np.where(droite, np.minimum(self.largeur - 2, self.vx + pas), self.vx)
+        haut = (deplacement == 3) & (self.vy > self.hauteur // 2)
+        self.vy = np.where(haut, self.vy - pas, self.vy)
+        bas = (deplacement == 4) & (self.vy < self.hauteur - 2)
+        self.vy = np.where(bas, self.vy + pas, self.vy)
+        
+        tir = self._tirs[actions] & (self.frame - self.dernier_tir >= self.cooldown)
+        if not tir.any():
+            return
+        self.dernier_tir[tir] = self.frame[tir]
+        
+        # Vaisseau.tirer : 1, 2 ou 3 projectiles autour du centre
+        centre = self.vx + 1
+        nombre = np.where(self.tir_triple, 3, np.where(self.tir_double, 2, 1))
+        decalages = (
+            np.where(self.tir_triple, -1.0, np.where(self.tir_double, -0.5, 0.0)),
+            np.where(self.tir_triple, 0.0, 0.5),
+            np.ones(self.nb),
+        )
+        for k, decalage in enumerate(decalages):
+            self._ajouter(tir & (nombre > k), self.nb_projectiles, self.p_actif,
+                          ((self.px, centre + decalage), (self.py, self.vy - 1)))
+    
+    def _ajouter(self, masque, nombres, actifs, valeurs):
+        """Ajoute un objet à la fin de la liste des parties désignées (valeurs : (tableau, valeurs par partie))"""
+        masque = masque & (nombres < actifs.shape[1])
+        lignes = np.flatnonzero(masque)
+        if not len(lignes):
+            return
+        colonnes = nombres[lignes]
+        for tableau, valeur in valeurs:
+            tableau[lignes, colonnes] = valeur[lignes] if np.ndim(valeur) else valeur
+        actifs[lignes, colonnes] = True
+        nombres[lignes] += 1
+    
+    def _minuteries(self):
+        """Fins de bonus et apparitions dues à cette frame"""
+        expires = (self.fins_bonus == self.frame[:, None]) & (self.fins_bonus > 0)
+        if expires.any():
+            # Colonnes : vitesse, tir_double, tir_triple, tir_rapide (voir Vaisseau.desactiver_bonus)
+            self.vitesse_bonus[expires[:, 0]] = 1.0
+            tirs = expires[:, 1] | expires[:, 2]
+            self.tir_double[tirs] = False
+            self.tir_triple[tirs] = False
+            self.cooldown[expires[:, 3]] = COOLDOWN_NORMAL
+            self.fins_bonus[expires] = 0
+        
+        apparition = self.frame == self.prochaine_apparition
+        if not apparition.any():
+            return
+        self.prochaine_apparition[apparition] += self.intervalle
+        zeros = np.zeros(self.nb)
+        self._ajouter(apparition, self.nb_ennemis, self.e_actif, (
+            (self.ex, self.rng.integers(0, self.largeur - 1, self.nb).astype(np.float64)),
+            (self.ey, zeros),
+            (self.e_pas, 0),
+        ))
+        bonus = apparition & (self.rng.random(self.nb) < self.chance_bonus)
+        if bonus.any():
+            self._ajouter(bonus, self.nb_bonus, self.b_actif, (
+                (self.bx, self.rng.integers(1, self.largeur - 1, self.nb).astype(np.float64)),
+                (self.by, zeros),
+                (self.b_type, self.rng.choice(len(TYPES_BONUS), self.nb, p=self._poids_bonus)),
+            ))
+    
+    def _avancer(self):
+        """Déplace tout ; retourne les parties encore en cours après les ennemis arrivés en bas"""
+        self.e_pas += self.e_actif
+        self.ey = np.floor(self.e_pas * self.vitesse)
+        en_bas = self.e_actif & (self.ey >= self.hauteur - 1)
+        self.e_actif &= ~en_bas
+        
+        # Le moteur s'arrête au premier ennemi qui coûte la dernière vie
+        pertes = np.minimum(en_bas.sum(axis=1), self.vies)
+        self.vies -= pertes
+        vivantes = self.vies > 0
+        
+        self.py -= 2
+        self.by += 0.5
+        return vivantes
+    
+    def _contact(self, x, y, largeur, hauteur):
+        """Collision vaisseau / objets (x, y : tableaux (N, capacité)), marge du moteur"""
+        vx, vy = self.vx[:, None], self.vy[:, None]
+        return ((vx - MARGE < x + largeur) & (vx + 2 + MARGE > x) &
+                (vy - MARGE < y + hauteur) & (vy + 1 + MARGE > y))
+    
+    def _collisions_vaisseau_ennemis(self, vivantes):
+        """Chaque ennemi touché coûte une vie ; invincibilité si la première ne tue pas"""
+        ouvertes = vivantes & (self.frame > self.invincible)
+        touches = self.e_actif & self._contact(self.ex, self.ey, 1, 1) & ouvertes[:, None]
+        nb_touches = touches.sum(axis=1)
+        if not nb_touches.any():
+            return
+        self.e_actif &= ~touches
+        survit = (nb_touches > 0) & (self.vies > 1)
+        self.invincible[survit] = self.frame[survit] + 20
+        self.vies -= nb_touches
+    
+    def _collisions_projectiles(self, vivantes):
+        """Chaque projectile, dans l'ordre, détruit le premier ennemi encore actif qu'il touche"""
+        px, py = self.px[:, :, None], self.py[:, :, None]
+        ex, ey = self.ex[:, None, :], self.ey[:, None, :]
+        contacts = ((px - MARGE < ex + 1) & (px + 0.5 + MARGE > ex) &
+                    (py - MARGE < ey + 1) & (py + 1 + MARGE > ey))
+        contacts &= self.p_actif[:, :, None] & self.e_actif[:, None, :] & vivantes[:, None, None]
+        
+        # Seuls les projectiles qui touchent quelque chose dans au moins une partie
+        for p in np.flatnonzero(contacts.any(axis=(0, 2))):
+            cibles = contacts[:, p, :] & self.e_actif
+            lignes = np.flatnonzero(cibles.any(axis=1))
+            if not len(lignes):
+                continue
+            self.e_actif[lignes, cibles[lignes].argmax(axis=1)] = False
+            self.p_actif[lignes, p] = False
+            self.score[lignes] += POINTS_ENNEMI
+    
+    def _collisions_bonus(self, vivantes):
+        """Bonus ramassés, dans l'ordre ; sans effet s'il est déjà actif (ou 5 vies)"""
+        contacts = self.b_actif & self._contact(self.bx, self.by, 1, 1) & vivantes[:, None]
+        for b in np.flatnonzero(contacts.any(axis=0)):
+            lignes = np.flatnonzero(contacts[:, b])
+            self.b_actif[lignes, b] = False
+            types = self.b_type[lignes, b]
+            
+            vie = lignes[(types == 0) & (self.vies[lignes] < VIES_MAX)]
+            self.vies[vie] += 1
+            
+            for k in range(1, len(TYPES_BONUS)):
+                lignes_k = lignes[(types == k) & (self.fins_bonus[lignes, k - 1] == 0)]
+                if not len(lignes_k):
+                    continue
+                self.fins_bonus[lignes_k, k - 1] = self.frame[lignes_k] + DUREE_BONUS
+                if TYPES_BONUS[k] == "vitesse":
+                    self.vitesse_bonus[lignes_k] = 1.5
+                elif TYPES_BONUS[k] == "tir_double":
+                    self.tir_double[lignes_k] = True
+                    self.tir_triple[lignes_k] = False
+                elif TYPES_BONUS[k] == "tir_triple":
+                    self.tir_triple[lignes_k] = True
+                    self.tir_double[lignes_k] = False
+                elif TYPES_BONUS[k] == "tir_rapide":
+                    self.cooldown[lignes_k] = COOLDOWN_RAPIDE
+    
+    def _nettoyer(self):
+        """Retire les objets inactifs ou sortis, en gardant l'ordre d'apparition"""
+        self.e_actif &= self.ey < self.hauteur
+        self.p_actif &= self.py > 0
+        self.b_actif &= self.by < self.hauteur
+        self.nb_ennemis = self._tasser(self.e_actif, self.nb_ennemis, (self.ex, self.ey, self.e_pas))
+        self.nb_projectiles = self._tasser(self.p_actif, self.nb_projectiles, (self.px, self.py))
+        self.nb_bonus = self._tasser(self.b_actif, self.nb_bonus, (self.bx, self.by, self.b_type))
+    
+    def _tasser(self, actifs, nombres, tableaux):
+        """Ramène les objets actifs en tête de ligne (tri stable), retourne leur nombre par partie"""
+        restants = actifs.sum(axis=1)
+        if not (restants != nombres).any():
+            return nombres
+        ordre = np.argsort(~actifs, axis=1, kind="stable")
+        for tableau in tableaux:
+            tableau[:] = np.take_along_axis(tableau, ordre, axis=1)
+        actifs[:] = np.take_along_axis(actifs, ordre, axis=1)
+        return restants
+    
+    # --------------------------------------------------------------------------
+    # Observations
+    # --------------------------------------------------------------------------
+    
+    def _observer(self):
+        """Tenseurs d'occupation (N, CANAUX, lignes, colonnes), réutilisés d'un step à l'autre"""
+        observations = self._observations
+        observations.fill(0)
+        lignes = self._lignes
+        
+        colonne = self.vx.astype(np.int64)
+        ligne = self.vy.astype(np.int64)
+        for decalage in (0, 1):
+            dedans = (colonne + decalage < self.largeur) & (ligne >= 0) & (ligne < self.hauteur)
+            observations[lignes[dedans], 0, ligne[dedans] // self.facteur,
+                         (colonne[dedans] + decalage) // self.facteur] = 1
+        
+        self._marquer(observations, 1, self.e_actif, self.ex, self.ey)
+        self._marquer(observations, 2, self.p_actif, self.px, self.py)
+        self._marquer(observations, 3 + self.b_type, self.b_actif, self.bx, self.by)
+        return observations
+    
+    def _marquer(self, observations, canal, actifs, x, y):
+        """Marque les objets actifs dans leur canal (canal : entier ou tableau par objet)"""
+        colonne = x.astype(np.int64)
+        ligne = y.astype(np.int64)
+        dedans = actifs & (colonne >= 0) & (colonne < self.largeur) & (ligne >= 0) & (ligne < self.hauteur)
+        parties, objets = np.nonzero(dedans)
+        canaux = canal[parties, objets] if np.ndim(canal) else canal
+        observations[parties, canaux, ligne[parties, objets] // self.facteur,
+                     colonne[parties, objets] // self.facteur] = 1
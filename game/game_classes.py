@@ -3,9 +3,39 @@ Classes principales du jeu Shooter Spatial
 Version complète avec système de bonus corrigé
 """
 
-from typing import List
+from collections import deque
+from typing import Any, List, NamedTuple, Optional
+import heapq
+import itertools
+import math
 import random
 
+from minuteries import Minuterie, RoueMinuteries
+
+
+# ==============================================================================
+# ÉVÉNEMENTS DU MOTEUR
+# ==============================================================================
+
+# Types d'événements émis par GameEngine
+ENNEMI_DETRUIT = "ennemi_detruit"   # objet : l'ennemi, info : "tir", "vaisseau" ou "bas"
+VIE_PERDUE = "vie_perdue"           # info : "vaisseau" ou "bas"
+BONUS_RAMASSE = "bonus_ramasse"     # objet : le bonus, info : son type
+BONUS_EXPIRE = "bonus_expire"       # info : type du bonus
+TIR = "tir"                         # objet : le projectile
+FIN_DE_PARTIE = "fin_de_partie"
+
+# Événements gardés entre deux lectures (les plus anciens sont écrasés)
+TAILLE_EVENEMENTS = 1024
+
+
+class Evenement(NamedTuple):
+    """Événement survenu pendant une frame (voir GameEngine.vider_evenements)"""
+    type: str
+    frame: int
+    objet: Optional['ObjetVolant'] = None
+    info: Any = None
+
 
 # ==============================================================================
 # CLASSE DE BASE
@@ -22,6 +52,7 @@ class ObjetVolant:
         x, y (float) : Position de l'objet sur la grille
         largeur, hauteur (float) : Dimensions de l'objet
         actif (bool) : Indique si l'objet est encore dans le jeu
+        numero (int) : Numéro d'apparition attribué par le moteur (None avant)
     """
     
     def __init__(self, x: float, y: float, largeur: float = 1, hauteur: float = 1):
@@ -31,6 +62,7 @@ class ObjetVolant:
         self.largeur = largeur
         self.hauteur = hauteur
         self.actif = True
+        self.numero = None
     
     def deplacer(self, dx: float, dy: float):
         """Déplace l'objet de dx, dy"""
@@ -167,24 +199,34 @@ class Vaisseau(ObjetVolant):
             self.cooldown_tir = 5
             self.bonus_actif_jusqu_a["tir_rapide"] = frame_actuelle + duree
     
-    def mettre_a_jour_bonus(self, frame_actuelle: int):
-        """Désactive les bonus expirés"""
-        bonus_a_retirer = []
+    def desactiver_bonus(self, type_bonus: str):
+        """Retire l'effet d'un bonus"""
+        if type_bonus == "vitesse":
+            self.vitesse_bonus = 1.0
+        elif type_bonus in ["tir_double", "tir_triple"]:
+            self.tir_double = False
+            self.tir_triple = False
+        elif type_bonus == "tir_rapide":
+            self.cooldown_tir = 10
+        
+        self.bonus_actif_jusqu_a.pop(type_bonus, None)
+    
+    def mettre_a_jour_bonus(self, frame_actuelle: int) -> List[str]:
+        """
+        Désactive les bonus expirés, retourne leurs types
         
-        for type_bonus, frame_fin in self.bonus_actif_jusqu_a.items():
-            if frame_actuelle >= frame_fin:
-                bonus_a_retirer.append(type_bonus)
-                
-                if type_bonus == "vitesse":
-                    self.vitesse_bonus = 1.0
-                elif type_bonus in ["tir_double", "tir_triple"]:
-                    self.tir_double = False
-                    self.tir_triple = False
-                elif type_bonus == "tir_rapide":
-                    self.cooldown_tir = 10
+        Inutile dans un GameEngine, qui programme la fin de chaque bonus
+        (voir GameEngine.activer_bonus).
+        """
+        bonus_a_retirer = [
+            type_bonus for type_bonus, frame_fin in self.bonus_actif_jusqu_a.items()
+            if frame_actuelle >= frame_fin
+        ]
         
         for type_bonus in bonus_a_retirer:
-            del self.bonus_actif_jusqu_a[type_bonus]
+            self.desactiver_bonus(type_bonus)
+        
+        return bonus_a_retirer
 
 
 # ==============================================================================
@@ -199,15 +241,25 @@ class Ennemi(ObjetVolant):
         self.vitesse = vitesse
         self.points = 10
         self.deplacement_fractionnaire = 0.0
+        self.nb_pas = 0
     
-    def avancer(self):
-        """Fait descendre l'ennemi"""
-        self.deplacement_fractionnaire += self.vitesse
+    def avancer(self, nb_frames: int = 1):
+        """
+        Fait descendre l'ennemi
         
-        if self.deplacement_fractionnaire >= 1.0:
-            pixels = int(self.deplacement_fractionnaire)
-            self.deplacer(0, pixels)
-            self.deplacement_fractionnaire -= pixels
+        La distance parcourue est la partie entière de nb_pas × vitesse
+        (plutôt qu'un reste accumulé frame après frame) : la position ne
+        dérive pas et se calcule pour n'importe quelle frame (voir y_apres).
+        """
+        avant = int(self.nb_pas * self.vitesse)
+        self.nb_pas += nb_frames
+        apres = int(self.nb_pas * self.vitesse)
+        self.deplacer(0, apres - avant)
+        self.deplacement_fractionnaire = self.nb_pas * self.vitesse - apres
+    
+    def y_apres(self, nb_frames: int) -> float:
+        """Position verticale après nb_frames appels à avancer()"""
+        return self.y + int((self.nb_pas + nb_frames) * self.vitesse) - int(self.nb_pas * self.vitesse)
 
 
 # ==============================================================================
@@ -221,9 +273,47 @@ class Projectile(ObjetVolant):
         super().__init__(x, y, largeur=0.5, hauteur=1)
         self.vitesse = 2
     
-    def avancer(self):
+    def avancer(self, nb_frames: int = 1):
         """Fait monter le projectile"""
-        self.deplacer(0, -self.vitesse)
+        self.deplacer(0, -self.vitesse * nb_frames)
+    
+    def y_apres(self, nb_frames: int) -> float:
+        """Position verticale après nb_frames appels à avancer()"""
+        return self.y - self.vitesse * nb_frames
+
+
+def predire_impact(projectile: Projectile, ennemi: Ennemi, marge: float = 0.5) -> Optional[int]:
+    """
+    Nombre de frames avant que le projectile touche l'ennemi (None : jamais)
+    
+    Les deux objets ne bougent que verticalement, en sens opposés : ils se
+    chevauchent en x pour toujours ou jamais, et l'écart vertical
+    (ennemi - projectile) augmente d'au moins projectile.vitesse par frame.
+    Seule la première frame où cet écart entre dans la zone de contact peut
+    donner une collision ; ensuite les objets se sont croisés.
+    
+    Le test est exactement celui de projectile.collision_avec(ennemi, marge)
+    sur les positions données par y_apres.
+    """
+    if not (projectile.x - marge < ennemi.x + ennemi.largeur and
+            projectile.x + projectile.largeur + marge > ennemi.x):
+        return None
+    
+    # Zone de contact : -(hauteur ennemi + marge) < écart < hauteur projectile + marge
+    entree = -(ennemi.hauteur + marge)
+    sortie = projectile.hauteur + marge
+    
+    def ecart(nb_frames):
+        return ennemi.y_apres(nb_frames) - projectile.y_apres(nb_frames)
+    
+    # Estimation linéaire, corrigée ensuite sur les positions exactes
+    nb_frames = max(1, math.ceil((entree - (ennemi.y - projectile.y)) / (projectile.vitesse + ennemi.vitesse)))
+    while nb_frames > 1 and ecart(nb_frames - 1) > entree:
+        nb_frames -= 1
+    while ecart(nb_frames) <= entree:
+        nb_frames += 1
+    
+    return nb_frames if ecart(nb_frames) < sortie else None
 
 
 # ==============================================================================
@@ -241,19 +331,28 @@ class Bonus(ObjetVolant):
         "tir_rapide": {"nom": "Tir Rapide", "couleur": "#ff0000", "icone": "!!!", "poids": 20},
     }
     
-    def __init__(self, x: float, y: float):
+    def __init__(self, x: float, y: float, aleatoire: random.Random = random):
         super().__init__(x, y, largeur=1, hauteur=1)
         self.vitesse = 0.5
         
         types_disponibles = list(self.TYPES.keys())
         poids = [self.TYPES[t]["poids"] for t in types_disponibles]
-        self.type = random.choices(types_disponibles, weights=poids, k=1)[0]
+        self.type = aleatoire.choices(types_disponibles, weights=poids, k=1)[0]
         
         self.info = self.TYPES[self.type]
     
-    def avancer(self):
+    def avancer(self, nb_frames: int = 1):
         """Fait descendre le bonus"""
-        self.deplacer(0, self.vitesse)
+        self.deplacer(0, self.vitesse * nb_frames)
+    
+    def y_apres(self, nb_frames: int) -> float:
+        """Position verticale après nb_frames appels à avancer()"""
+        return self.y + self.vitesse * nb_frames
+
+
+# Canaux de GameEngine.rasteriser : vaisseau, ennemis, projectiles puis un par type de bonus
+CANAUX = ("vaisseau", "ennemi", "projectile") + tuple(Bonus.TYPES)
+CANAL_BONUS = {type_bonus: index for index, type_bonus in enumerate(CANAUX) if type_bonus in Bonus.TYPES}
 
 
 # ==============================================================================
@@ -271,16 +370,49 @@ class GameEngine:
     - L'état général du jeu (en cours / terminé)
     - L'apparition des bonus
     
+    Collisions projectile-ennemi planifiées : ennemis et projectiles ne
+    bougent que verticalement à vitesse constante, donc la frame d'impact
+    de chaque paire se calcule dès l'apparition de l'un des deux
+    (predire_impact). Ces impacts sont rangés dans une file de priorité
+    (frame, projectile, ennemi) et seuls ceux de la frame courante sont
+    vérifiés, au lieu de tester toutes les paires à chaque frame. Les
+    entrées d'un objet détruit entre-temps sont ignorées au dépilage.
+    Ennemis et projectiles doivent donc passer par ajouter_ennemi() et
+    tirer() ; collisions_planifiees=False revient au test de toutes les paires.
+    
+    Chaque frame émet ses événements (ennemi détruit, vie perdue, bonus
+    ramassé ou expiré, tir, fin de partie) dans un tampon circulaire que
+    les interfaces vident avec vider_evenements() : pas besoin de recompter
+    les ennemis avant et après mettre_a_jour().
+    
+    Tout ce qui dépend du temps est compté en frames dans une roue de
+    minuteries (self.minuteries) : fin des bonus et apparitions
+    programmées (programmer_apparitions). Une frame ne déclenche que les
+    minuteries dues, et une partie simulée va aussi vite que le processeur.
+    
+    Le hasard (position des ennemis, type des bonus) vient de
+    self.aleatoire : avec une graine, une partie se rejoue à l'identique.
+    
     Usage :
         engine = GameEngine(largeur=40, hauteur=20)
         engine.tirer()  # Le vaisseau tire
         engine.mettre_a_jour()  # Met à jour tous les objets (1 frame)
     """
     
-    def __init__(self, largeur: int = 40, hauteur: int = 20):
+    # Marges de collision (plus c'est grand, plus c'est facile)
+    MARGE_VAISSEAU_ENNEMI = 0.5
+    MARGE_PROJECTILE_ENNEMI = 0.5
+    MARGE_BONUS = 0.5
+    
+    # Frames d'invincibilité après une collision avec un ennemi
+    INVINCIBILITE_COLLISION = 20
+    
+    def __init__(self, largeur: int = 40, hauteur: int = 20, collisions_planifiees: bool = True,
+                 graine: Optional[int] = None):
         """Initialise le moteur avec les dimensions de la grille de jeu"""
         self.largeur = largeur
         self.hauteur = hauteur
+        self.aleatoire = random.Random(graine)
         
         self.vaisseau = Vaisseau(
             x=largeur // 2,
@@ -296,23 +428,97 @@ class GameEngine:
         self.score = 0
         self.jeu_termine = False
         self.frame_count = 0
+        self.evenements = deque(maxlen=TAILLE_EVENEMENTS)
+        self.minuteries = RoueMinuteries()
+        
+        # Apparitions programmées (voir programmer_apparitions)
+        self.intervalle_apparition = None
+        self.vitesse_apparition = 0.5
+        self.chance_bonus = 0.0
+        self._minuterie_apparition: Optional[Minuterie] = None
+        
+        # Impacts prévus : tas de (frame, numéro projectile, numéro ennemi, projectile, ennemi)
+        self.collisions_planifiees = collisions_planifiees
+        self._impacts = []
+        self._numeros = itertools.count()
+        # Objets apparus depuis la dernière frame (les spawners peuvent tourner dans un autre thread)
+        self._nouveaux_ennemis = deque()
+        self._nouveaux_projectiles = deque()
     
     def ajouter_ennemi(self, vitesse: float = 0.5):
         """Ajoute un nouvel ennemi"""
-        x = random.randint(0, self.largeur - 2)
+        x = self.aleatoire.randint(0, self.largeur - 2)
         ennemi = Ennemi(x, 0, vitesse)
         self.ennemis.append(ennemi)
+        if self.collisions_planifiees:
+            self._nouveaux_ennemis.append(ennemi)
     
     def ajouter_bonus(self):
         """Ajoute un bonus aléatoire"""
-        x = random.randint(1, self.largeur - 2)
-        bonus_obj = Bonus(x, 0)
+        x = self.aleatoire.randint(1, self.largeur - 2)
+        bonus_obj = Bonus(x, 0, self.aleatoire)
+        bonus_obj.numero = next(self._numeros)
         self.bonus.append(bonus_obj)
     
+    def programmer_apparitions(self, intervalle: int, vitesse: float, chance_bonus: float = 0.0,
+                               premiere: Optional[int] = None):
+        """
+        Fait apparaître un ennemi toutes les `intervalle` frames
+        
+        Chaque apparition ajoute aussi un bonus avec la probabilité
+        chance_bonus. intervalle_apparition, vitesse_apparition et
+        chance_bonus peuvent être modifiés ensuite (difficulté) : ils
+        s'appliquent dès l'apparition suivante.
+        
+        Args:
+            premiere: Frames avant la première apparition (défaut : intervalle, 0 : tout de suite)
+        """
+        self.intervalle_apparition = intervalle
+        self.vitesse_apparition = vitesse
+        self.chance_bonus = chance_bonus
+        
+        if self._minuterie_apparition is not None:
+            self._minuterie_apparition.annuler()
+        delai = intervalle if premiere is None else premiere
+        self._minuterie_apparition = self.minuteries.programmer(self.frame_count + delai, self._apparition)
+    
+    def _apparition(self):
+        """Minuterie d'apparition : un ennemi, peut-être un bonus, puis la suivante"""
+        self.ajouter_ennemi(self.vitesse_apparition)
+        if self.aleatoire.random() < self.chance_bonus:
+            self.ajouter_bonus()
+        self._minuterie_apparition = self.minuteries.programmer(
+            self.frame_count + self.intervalle_apparition, self._apparition
+        )
+    
     def tirer(self):
         """Le vaisseau tire"""
         projectiles = self.vaisseau.tirer(self.frame_count)
         self.projectiles.extend(projectiles)
+        if self.collisions_planifiees:
+            self._nouveaux_projectiles.extend(projectiles)
+        for projectile in projectiles:
+            self._emettre(TIR, projectile)
+    
+    def _emettre(self, type_evenement: str, objet: Optional[ObjetVolant] = None, info: Any = None):
+        """Ajoute un événement de la frame courante au tampon"""
+        self.evenements.append(Evenement(type_evenement, self.frame_count, objet, info))
+    
+    def vider_evenements(self) -> List[Evenement]:
+        """Retourne les événements depuis la dernière lecture (du plus ancien au plus récent) et vide le tampon"""
+        evenements = []
+        while self.evenements:
+            evenements.append(self.evenements.popleft())
+        return evenements
+    
+    def _perdre_vie(self, cause: str) -> bool:
+        """Le vaisseau perd une vie ; retourne True si la partie est terminée"""
+        self._emettre(VIE_PERDUE, info=cause)
+        if self.vaisseau.perdre_vie():
+            self.jeu_termine = True
+            self._emettre(FIN_DE_PARTIE)
+            return True
+        return False
     
     def _peut_ramasser_bonus(self, type_bonus: str) -> bool:
         """Vérifie si un bonus peut être ramassé"""
@@ -329,15 +535,19 @@ class GameEngine:
             return
         
         self.frame_count += 1
-        self.vaisseau.mettre_a_jour_bonus(self.frame_count)
+        
+        # Minuteries dues (apparitions, fin des bonus), puis impacts des nouveaux objets
+        self.minuteries.avancer_jusqu_a(self.frame_count)
+        if self.collisions_planifiees:
+            self._planifier_nouveaux(self.frame_count - 1)
         
         # Déplacer les ennemis
         for ennemi in self.ennemis:
             ennemi.avancer()
             if ennemi.y >= self.hauteur - 1:
                 ennemi.actif = False
-                if self.vaisseau.perdre_vie():
-                    self.jeu_termine = True
+                self._emettre(ENNEMI_DETRUIT, ennemi, "bas")
+                if self._perdre_vie("bas"):
                     return
         
         # Déplacer les projectiles
@@ -351,27 +561,100 @@ class GameEngine:
         # Vérifier les collisions
         self._verifier_collisions()
         
-        # Nettoyer les objets inactifs
+        self._nettoyer()
+    
+    def avancer_sans_collision(self, nb_frames: int):
+        """
+        Avance tous les objets de nb_frames d'un coup, sans aucun test
+        
+        Réservé aux frames où l'appelant sait qu'il ne se passe rien
+        (voir simulation.SimulationRapide) : ni collision, ni ennemi en
+        bas, ni minuterie due, ni action du joueur.
+        """
+        if self.collisions_planifiees:
+            self._planifier_nouveaux()
+        
+        self.frame_count += nb_frames
+        self.minuteries.avancer_jusqu_a(self.frame_count)
+        for groupe in (self.ennemis, self.projectiles, self.bonus):
+            for objet in groupe:
+                objet.avancer(nb_frames)
+        
+        self._nettoyer()
+    
+    def _nettoyer(self):
+        """Retire les objets inactifs ou sortis de l'écran"""
         self.ennemis = [e for e in self.ennemis if e.actif and e.y < self.hauteur]
         self.projectiles = [p for p in self.projectiles if p.actif and p.y > 0]
         self.bonus = [b for b in self.bonus if b.actif and b.y < self.hauteur]
     
+    def _planifier_impact(self, projectile: Projectile, ennemi: Ennemi, frame_etat: int):
+        """
+        Ajoute l'impact prévu d'une paire à la file (rien s'il n'a pas lieu avant la sortie du projectile)
+        
+        frame_etat est la frame à laquelle correspondent les positions actuelles.
+        """
+        nb_frames = predire_impact(projectile, ennemi, self.MARGE_PROJECTILE_ENNEMI)
+        # Le projectile est retiré à la fin de la première frame où y <= 0
+        if nb_frames is not None and projectile.y_apres(nb_frames - 1) > 0:
+            heapq.heappush(self._impacts, (frame_etat + nb_frames, projectile.numero,
+                                           ennemi.numero, projectile, ennemi))
+    
+    def _planifier_nouveaux(self, frame_etat: Optional[int] = None):
+        """
+        Numérote les objets apparus depuis la dernière frame et prévoit leurs impacts
+        
+        frame_etat : frame des positions actuelles (défaut : frame_count ; la
+        frame précédente quand les objets n'ont pas encore bougé dans celle-ci).
+        """
+        if frame_etat is None:
+            frame_etat = self.frame_count
+        
+        while self._nouveaux_ennemis:
+            ennemi = self._nouveaux_ennemis.popleft()
+            ennemi.numero = next(self._numeros)
+            for projectile in self.projectiles:
+                if projectile.actif and projectile.numero is not None:
+                    self._planifier_impact(projectile, ennemi, frame_etat)
+        
+        while self._nouveaux_projectiles:
+            projectile = self._nouveaux_projectiles.popleft()
+            projectile.numero = next(self._numeros)
+            for ennemi in self.ennemis:
+                if ennemi.actif and ennemi.numero is not None:
+                    self._planifier_impact(projectile, ennemi, frame_etat)
+    
     def _verifier_collisions(self):
         """Vérifie toutes les collisions"""
-        # Collision vaisseau-ennemi (avec invincibilité)
+        self._collisions_vaisseau_ennemis()
+        if self.collisions_planifiees:
+            self._collisions_projectiles_planifiees()
+        else:
+            self._collisions_projectiles()
+        self._collisions_bonus()
+    
+    def _collisions_vaisseau_ennemis(self):
+        """Collision vaisseau-ennemi (avec invincibilité)"""
         if self.frame_count > self.vaisseau.invincible_jusqu_a:
             for ennemi in self.ennemis:
                 if not ennemi.actif:
                     continue
                 
-                if self.vaisseau.collision_avec(ennemi):
+                if self.vaisseau.collision_avec(ennemi, marge=self.MARGE_VAISSEAU_ENNEMI):
                     ennemi.actif = False
-                    if self.vaisseau.perdre_vie():
-                        self.jeu_termine = True
-                    else:
-                        self.vaisseau.invincible_jusqu_a = self.frame_count + 20
-        
-        # Collision projectile-ennemi
+                    self._emettre(ENNEMI_DETRUIT, ennemi, "vaisseau")
+                    if not self._perdre_vie("vaisseau") and self.INVINCIBILITE_COLLISION:
+                        self.vaisseau.invincible_jusqu_a = self.frame_count + self.INVINCIBILITE_COLLISION
+    
+    def _detruire(self, projectile: Projectile, ennemi: Ennemi):
+        """Un projectile détruit un ennemi"""
+        projectile.actif = False
+        ennemi.actif = False
+        self.score += ennemi.points
+        self._emettre(ENNEMI_DETRUIT, ennemi, "tir")
+    
+    def _collisions_projectiles(self):
+        """Collision projectile-ennemi : test de toutes les paires"""
         for projectile in self.projectiles:
             if not projectile.actif:
                 continue
@@ -380,19 +663,37 @@ class GameEngine:
                 if not ennemi.actif:
                     continue
                 
-                if projectile.collision_avec(ennemi):
-                    projectile.actif = False
-                    ennemi.actif = False
-                    self.score += ennemi.points
+                if projectile.collision_avec(ennemi, marge=self.MARGE_PROJECTILE_ENNEMI):
+                    self._detruire(projectile, ennemi)
                     break
+    
+    def _collisions_projectiles_planifiees(self):
+        """
+        Collision projectile-ennemi : seuls les impacts prévus pour cette frame
         
-        # Collision vaisseau-bonus
+        L'ordre (numéro du projectile, puis de l'ennemi) est celui des listes :
+        le résultat est identique au test de toutes les paires.
+        """
+        while self._impacts and self._impacts[0][0] <= self.frame_count:
+            _, _, _, projectile, ennemi = heapq.heappop(self._impacts)
+            if not (projectile.actif and ennemi.actif):
+                continue
+            
+            if projectile.collision_avec(ennemi, marge=self.MARGE_PROJECTILE_ENNEMI):
+                self._detruire(projectile, ennemi)
+            elif projectile.y > 0:
+                # Prévision manquée (objet déplacé hors du moteur) : recalculer depuis la position actuelle
+                self._planifier_impact(projectile, ennemi, self.frame_count)
+    
+    def _collisions_bonus(self):
+        """Collision vaisseau-bonus"""
         for bonus_obj in self.bonus:
             if not bonus_obj.actif:
                 continue
             
-            if self.vaisseau.collision_avec(bonus_obj):
+            if self.vaisseau.collision_avec(bonus_obj, marge=self.MARGE_BONUS):
                 bonus_obj.actif = False
+                self._emettre(BONUS_RAMASSE, bonus_obj, bonus_obj.type)
                 # Appliquer le bonus seulement s'il peut être ramassé
                 if self._peut_ramasser_bonus(bonus_obj.type):
                     self._appliquer_bonus(bonus_obj.type)
@@ -405,7 +706,20 @@ class GameEngine:
                 self.vaisseau.gagner_vie()
         else:
             # Power-up temporaire
-            self.vaisseau.activer_bonus(type_bonus, self.frame_count)
+            self.activer_bonus(type_bonus)
+    
+    def activer_bonus(self, type_bonus: str, duree: int = 300):
+        """Active un power-up du vaisseau et programme sa fin"""
+        self.vaisseau.activer_bonus(type_bonus, self.frame_count, duree)
+        frame_fin = self.vaisseau.bonus_actif_jusqu_a.get(type_bonus)
+        if frame_fin is not None:
+            self.minuteries.programmer(frame_fin, self._expirer_bonus, type_bonus, frame_fin)
+    
+    def _expirer_bonus(self, type_bonus: str, frame_fin: int):
+        """Minuterie de fin de bonus (ignorée si le bonus a été réactivé depuis)"""
+        if self.vaisseau.bonus_actif_jusqu_a.get(type_bonus) == frame_fin:
+            self.vaisseau.desactiver_bonus(type_bonus)
+            self._emettre(BONUS_EXPIRE, info=type_bonus)
     
     def obtenir_grille_console(self) -> List[List[str]]:
         """Génère la grille pour l'affichage console"""
@@ -446,4 +760,38 @@ class GameEngine:
             if x + 1 < self.largeur:
                 grille[y][x + 1] = '^'
         
+        return grille
+    
+    def forme_grille(self, facteur: int = 1) -> tuple:
+        """Forme (canaux, lignes, colonnes) du tampon attendu par rasteriser()"""
+        return (len(CANAUX), -(-self.hauteur // facteur), -(-self.largeur // facteur))
+    
+    def rasteriser(self, grille, facteur: int = 1):
+        """
+        Écrit l'occupation de la grille dans un tampon fourni (tableau NumPy uint8)
+        
+        Le tampon a la forme forme_grille(facteur) : un plan par entrée de
+        CANAUX, une case pour facteur × facteur cellules du jeu (1 : au
+        moins un objet de ce type). Il est effacé puis rempli sur place,
+        sans allocation : le même tableau peut resservir à chaque frame.
+        Retourne grille.
+        """
+        if grille.shape != self.forme_grille(facteur):
+            raise ValueError(f"Tampon de forme {grille.shape}, attendue {self.forme_grille(facteur)}")
+        grille.fill(0)
+        largeur, hauteur = self.largeur, self.hauteur
+        
+        for canal, objets in ((1, self.ennemis), (2, self.projectiles), (None, self.bonus)):
+            for objet in objets:
+                x, y = int(objet.x), int(objet.y)
+                if objet.actif and 0 <= x < largeur and 0 <= y < hauteur:
+                    grille[CANAL_BONUS[objet.type] if canal is None else canal,
+                           y // facteur, x // facteur] = 1
+        
+        # Le vaisseau occupe deux cellules, comme dans obtenir_grille_console()
+        x, y = int(self.vaisseau.x), int(self.vaisseau.y)
+        if 0 <= y < hauteur:
+            for colonne in (x, x + 1):
+                if 0 <= colonne < largeur:
+                    grille[0, y // facteur, colonne // facteur] = 1
         return grille
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Historique compact des parties pour le Shooter Spatial
+
+Chaque joueur garde ses parties dans un tableau d'octets (clé "parties",
+en base64 dans scores.json) : pour chaque partie, l'écart en millisecondes
+avec la partie précédente puis le score, tous deux en varint zigzag. Une
+partie occupe ainsi 3 à 6 octets au lieu d'un dictionnaire avec une date
+en texte.
+
+La politique de rétention (Retention) choisit combien de parties garder en
+détail ; les plus anciennes sont résumées en agrégats journaliers (clé
+"jours" : jour -> [nombre, somme, max]) ou oubliées.
+"""
+
+import base64
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from statistiques import jour_de
+
+
+# Précision des timestamps stockés (millisecondes)
+RESOLUTION = 1000
+
+MS_PAR_JOUR = 86400 * RESOLUTION
+
+
+class Retention:
+    """
+    Politique de conservation de l'historique détaillé
+    
+    Attributs :
+        parties_max (int) : Nombre maximal de parties détaillées (None : illimité)
+        jours_detail (int) : Âge maximal (en jours) d'une partie détaillée (None : illimité)
+        agreger (bool) : Résumer les parties retirées en agrégats journaliers
+                         plutôt que les oublier
+    """
+    
+    def __init__(self, parties_max: Optional[int] = None, jours_detail: Optional[int] = None,
+                 agreger: bool = True):
+        self.parties_max = parties_max
+        self.jours_detail = jours_detail
+        self.agreger = agreger
+
+
+# Par défaut, toutes les parties sont gardées en détail
+RETENTION_PAR_DEFAUT = Retention()
+
+
+def ecrire_varint(tampon: bytearray, valeur: int):
+    """Ajoute un entier positif au tampon (7 bits par octet, bit de poids fort = suite)"""
+    while valeur >= 0x80:
+        tampon.append((valeur & 0x7F) | 0x80)
+        valeur >>= 7
+    tampon.append(valeur)
+
+
+def lire_varint(donnees, position: int) -> Tuple[int, int]:
+    """Lit un entier écrit par ecrire_varint, retourne (valeur, position suivante)"""
+    valeur = decalage = 0
+    while True:
+        octet = donnees[position]
+        position += 1
+        valeur |= (octet & 0x7F) << decalage
+        if octet < 0x80:
+            return valeur, position
+        decalage += 7
+
+
+def _zigzag(valeur: int) -> int:
+    """Entier signé -> entier positif (0, -1, 1, -2... -> 0, 1, 2, 3...)"""
+    return valeur * 2 if valeur >= 0 else -valeur * 2 - 1
+
+
+def _dezigzag(valeur: int) -> int:
+    """Inverse de _zigzag"""
+    return valeur >> 1 if not valeur & 1 else -((valeur + 1) >> 1)
+
+
+def nouvel_historique() -> dict:
+    """Retourne un historique vide (joueur sans partie)"""
+    return {"nb": 0, "dernier": 0, "parties": bytearray(), "jours": {}}
+
+
+def _octets(historique: dict) -> bytearray:
+    """Tableau d'octets des parties (décodé du base64 au premier accès)"""
+    parties = historique["parties"]
+    if isinstance(parties, str):
+        parties = historique["parties"] = bytearray(base64.b64decode(parties))
+    return parties
+
+
+def _ecrire_partie(tampon: bytearray, ecart: int, score: int):
+    """Ajoute une partie (écart en ms avec la précédente, score)"""
+    ecrire_varint(tampon, _zigzag(ecart))
+    ecrire_varint(tampon, _zigzag(score))
+
+
+def _lire_partie(donnees, position: int, precedent: int) -> Tuple[int, int, int]:
+    """Lit une partie, retourne (timestamp en ms, score, position suivante)"""
+    ecart, position = lire_varint(donnees, position)
+    score, position = lire_varint(donnees, position)
+    return precedent + _dezigzag(ecart), _dezigzag(score), position
+
+
+def _retirer_plus_ancienne(historique: dict) -> Tuple[int, int]:
+    """
+    Retire la plus ancienne partie détaillée, retourne (timestamp en ms, score)
+    
+    Seule la partie suivante est réécrite (son écart devient un timestamp
+    absolu) : le coût ne dépend pas de la taille de l'historique.
+    """
+    parties = _octets(historique)
+    ms, score, fin = _lire_partie(parties, 0, 0)
+    if historique["nb"] == 1:
+        del parties[:]
+    else:
+        ms_suivante, score_suivant, fin_suivante = _lire_partie(parties, fin, ms)
+        tete = bytearray()
+        _ecrire_partie(tete, ms_suivante, score_suivant)
+        parties[:fin_suivante] = tete
+    historique["nb"] -= 1
+    return ms, score
+
+
+def _agreger(historique: dict, ms: int, score: int):
+    """Ajoute une partie aux agrégats journaliers [nombre, somme, max]"""
+    cle = str(jour_de(ms / RESOLUTION))
+    jour = historique["jours"].get(cle)
+    if jour is None:
+        historique["jours"][cle] = [1, score, score]
+    else:
+        jour[0] += 1
+        jour[1] += score
+        jour[2] = max(jour[2], score)
+
+
+def ajouter_au_historique(historique: dict, score: int, timestamp: float,
+                          retention: Retention = RETENTION_PAR_DEFAUT):
+    """
+    Ajoute une partie à la fin de l'historique puis applique la rétention
+    
+    Les parties doivent arriver dans l'ordre chronologique pour que les
+    écarts restent petits (un écart négatif reste toutefois possible).
+    """
+    ms = round(timestamp * RESOLUTION)
+    parties = _octets(historique)
+    _ecrire_partie(parties, ms - historique["dernier"] if historique["nb"] else ms, score)
+    historique["nb"] += 1
+    historique["dernier"] = ms
+    
+    limite_age = None
+    if retention.jours_detail is not None:
+        limite_age = ms - retention.jours_detail * MS_PAR_JOUR
+    
+    while historique["nb"]:
+        trop_nombreuses = retention.parties_max is not None and historique["nb"] > retention.parties_max
+        trop_ancienne = limite_age is not None and _lire_partie(parties, 0, 0)[0] < limite_age
+        if not (trop_nombreuses or trop_ancienne):
+            break
+        ms_ancienne, score_ancien = _retirer_plus_ancienne(historique)
+        if retention.agreger:
+            _agreger(historique, ms_ancienne, score_ancien)
+
+
+def lire_historique(historique: dict) -> List[Tuple[float, int]]:
+    """Retourne les parties détaillées [(timestamp, score)], de la plus ancienne à la plus récente"""
+    parties = _octets(historique)
+    resultat = []
+    position = ms = 0
+    for _ in range(historique["nb"]):
+        ms, score, position = _lire_partie(parties, position, ms)
+        resultat.append((ms / RESOLUTION, score))
+    return resultat
+
+
+def historique_depuis_liste(entrees: List[dict], retention: Retention = RETENTION_PAR_DEFAUT) -> dict:
+    """Construit un historique compact depuis l'ancien format [{score, date, timestamp}]"""
+    historique = nouvel_historique()
+    for entree in entrees:
+        ajouter_au_historique(historique, entree.get("score", 0), entree.get("timestamp", 0), retention)
+    return historique
+
+
+def parties_en_dictionnaires(historique: dict) -> List[dict]:
+    """Parties détaillées au format {score, date, timestamp} (affichage)"""
+    return [
+        {
+            "score": score,
+            "date": datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": timestamp,
+        }
+        for timestamp, score in lire_historique(historique)
+    ]
+
+
+def encoder_json(objet):
+    """Fonction `default` de json.dumps : les tableaux d'octets sont écrits en base64"""
+    if isinstance(objet, (bytes, bytearray)):
+        return base64.b64encode(objet).decode('ascii')
+    raise TypeError(f"Objet de type {type(objet).__name__} non sérialisable en JSON")
@@ -0,0 +1,408 @@
+"""
+Hébergement de parties console pour plusieurs joueurs (telnet, asyncio)
+
+Chaque connexion joue sa propre partie GameEngineConsole, affichée comme
+dans le terminal local (rendre_grille) et pilotée au clavier (ZQSD,
+flèches, espace). Toutes les sessions sont animées par une seule tâche
+asyncio, sur une seule boucle et donc un seul cœur : pas de processus ni
+de threads par joueur.
+
+À la connexion, l'hôte négocie avec le client telnet :
+    - le mode caractère (le serveur fait l'écho, sans attendre Entrée)
+    - la taille du terminal (NAWS, RFC 1073) ; la grille de jeu s'y adapte
+Sans réponse sous ATTENTE_TAILLE secondes (nc, client minimal), la partie
+démarre pour un terminal de TERMINAL_DEFAUT.
+
+Le jeu avance à ConfigDifficulte.FPS_CIBLE frames par seconde, l'image
+est envoyée une frame sur FRAMES_PAR_IMAGE. Une connexion dont l'image
+précédente n'est pas encore partie ne reçoit pas la suivante (image
+sautée, rendue plus tard à jour) : un joueur lent ne coûte ni rendu ni
+mémoire tampon.
+
+Usage :
+    python hote_console.py --port 2323
+    telnet localhost 2323
+"""
+
+import argparse
+import asyncio
+import socket
+import sys
+import time
+from typing import Optional
+
+from shooter_console import (ConfigDifficulte, GameEngineConsole, appliquer_touche, avancer_frame,
+                             preparer_partie, rendre_bilan, rendre_grille)
+from spectateurs import EFFACER_ECRAN, TAMPON_NOYAU, encoder_image
+
+
+# Configuration
+HOTE = "127.0.0.1"
+PORT = 2323
+SESSIONS_MAX = 10000
+FRAMES_PAR_IMAGE = 2           # 30 frames/s de jeu, 15 images/s (comme la version locale)
+ATTENTE_TAILLE = 1.0           # secondes d'attente de la taille du terminal
+TERMINAL_DEFAUT = (80, 24)     # colonnes, lignes sans négociation
+LARGEUR_JEU = (20, 200)        # bornes de la grille de jeu
+HAUTEUR_JEU = (10, 60)
+INTERVALLE_STATISTIQUES = 10   # secondes entre deux affichages des statistiques
+
+# Telnet (RFC 854) : commandes et options utilisées
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+ECHO, SUPPRESSION_GA, NAWS = 1, 3, 31
+NEGOCIATION = bytes([IAC, WILL, ECHO, IAC, WILL, SUPPRESSION_GA, IAC, DO, NAWS])
+
+MASQUER_CURSEUR = b"\033[?25l"
+AFFICHER_CURSEUR = b"\033[?25h"
+INVITE_FIN = "  [R] Rejouer   [X] Quitter\n"
+AU_REVOIR = "\033[HÀ bientôt !\r\n".encode("utf-8")
+FLECHES = {ord('A'): 'UP', ord('B'): 'DOWN', ord('C'): 'RIGHT', ord('D'): 'LEFT'}
+
+
+def taille_jeu(colonnes: int, lignes: int) -> tuple:
+    """Taille de la grille de jeu pour un terminal (mêmes marges que la version locale)"""
+    largeur = min(max(colonnes - 4, LARGEUR_JEU[0]), LARGEUR_JEU[1])
+    hauteur = min(max(lignes - 8, HAUTEUR_JEU[0]), HAUTEUR_JEU[1])
+    return largeur, hauteur
+
+
+class DecodeurTelnet:
+    """
+    Flux d'octets d'un client telnet (ou nc) découpé en touches
+    
+    Les commandes telnet sont retirées du flux ; la sous-négociation NAWS
+    met à jour la taille du terminal. Les touches ont la même forme que
+    ClavierNonBloquant.lire_touche : minuscules, 'UP'/'DOWN'/'LEFT'/'RIGHT'
+    pour les flèches, '\\x1b' pour Échap.
+    
+    Attributs :
+        colonnes, lignes (int) : Taille du terminal (None tant qu'elle n'est pas reçue)
+    """
+    
+    def __init__(self):
+        self.colonnes: Optional[int] = None
+        self.lignes: Optional[int] = None
+        self._commande: Optional[int] = None   # IAC reçu (0) ou WILL/WONT/DO/DONT en attente d'option
+        self._sous_negociation: Optional[bytearray] = None
+        self._echappement = b""
+    
+    def lire(self, donnees: bytes) -> list:
+        """Consomme des octets reçus, retourne les touches complètes"""
+        touches = []
+        for octet in donnees:
+            if self._commande is not None:
+                self._lire_commande(octet)
+            elif octet == IAC:
+                self._commande = 0
+            elif self._sous_negociation is not None:
+                self._sous_negociation.append(octet)
+            elif self._echappement:
+                self._lire_echappement(octet, touches)
+            elif octet == 0x1b:
+                self._echappement = b"\x1b"
+            elif 0x20 <= octet < 0x7f:
+                touches.append(chr(octet).lower())
+        # Échap seul en fin de paquet (les flèches arrivent d'un bloc)
+        if self._echappement == b"\x1b":
+            touches.append('\x1b')
+            self._echappement = b""
+        return touches
+    
+    def _lire_commande(self, octet: int):
+        """Octet qui suit IAC, ou option d'une demande WILL/WONT/DO/DONT"""
+        commande, self._commande = self._commande, None
+        if commande != 0:
+            return  # option d'une demande : rien à répondre, l'hôte a déjà annoncé ses choix
+        if octet in (WILL, WONT, DO, DONT):
+            self._commande = octet
+        elif octet == SB:
+            self._sous_negociation = bytearray()
+        elif octet == SE and self._sous_negociation is not None:
+            self._fin_sous_negociation(bytes(self._sous_negociation))
+            self._sous_negociation = None
+        elif octet == IAC and self._sous_negociation is not None:
+            self._sous_negociation.append(IAC)  # 255 doublé dans les données
+    
+    def _fin_sous_negociation(self, contenu: bytes):
+        """NAWS : largeur et hauteur sur deux octets chacune (0 : inconnue)"""
+        if len(contenu) == 5 and contenu[0] == NAWS:
+            colonnes = contenu[1] << 8 | contenu[2]
+            lignes = contenu[3] << 8 | contenu[4]
+            if colonnes and lignes:
+                self.colonnes, self.lignes = colonnes, lignes
+    
+    def _lire_echappement(self, octet: int, touches: list):
+        """Séquence ESC [ x ou ESC O x des flèches"""
+        if self._echappement == b"\x1b" and octet in (ord('['), ord('O')):
+            self._echappement += bytes([octet])
+            return
+        self._echappement = b""
+        if octet in FLECHES:
+            touches.append(FLECHES[octet])
+
+
+class SessionConsole:
+    """
+    Une partie console hébergée (sans entrées/sorties)
+    
+    Attributs :
+        engine (GameEngineConsole) : Partie en cours
+        nom_joueur (str) : Nom affiché dans le bilan
+        ennemis_detruits (int) : Ennemis détruits dans la partie en cours
+        temps_debut (float) : Début de la partie en cours (time.time())
+    """
+    
+    def __init__(self, largeur: int, hauteur: int, nom_joueur: str):
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.nom_joueur = nom_joueur
+        self.nouvelle_partie()
+    
+    def nouvelle_partie(self):
+        """(Re)commence une partie"""
+        self.engine = GameEngineConsole(self.largeur, self.hauteur)
+        self.spawner = preparer_partie(self.engine)
+        self.ennemis_detruits = 0
+        self.temps_debut = time.time()
+    
+    @property
+    def terminee(self) -> bool:
+        return self.engine.jeu_termine
+    
+    def touche(self, touche: str) -> bool:
+        """Applique une touche ; retourne False si le joueur quitte l'hôte"""
+        if not self.terminee:
+            if not appliquer_touche(self.engine, touche) and touche in ('x', '\x1b'):
+                self.engine.jeu_termine = True
+        elif touche == 'r':
+            self.nouvelle_partie()
+        elif touche in ('x', '\x1b'):
+            return False
+        return True
+    
+    def avancer(self):
+        """Une frame de jeu"""
+        self.ennemis_detruits = avancer_frame(self.engine, self.spawner, self.ennemis_detruits)
+    
+    def image(self) -> str:
+        """Image courante de la grille"""
+        return rendre_grille(self.engine, None, self.ennemis_detruits, self.temps_debut)
+    
+    def bilan(self) -> str:
+        """Grille finale, bilan et choix de la suite"""
+        return (self.image() + rendre_bilan(self.engine, self.nom_joueur, self.ennemis_detruits, self.temps_debut)
+                + INVITE_FIN)
+
+
+class ConnexionConsole(asyncio.Protocol):
+    """
+    Connexion d'un joueur (boucle de l'hôte)
+    
+    La session n'est créée qu'une fois la taille du terminal connue (ou
+    après ATTENTE_TAILLE). Le tampon d'envoi n'accepte qu'une image : tant
+    qu'il n'est pas vide (pause_writing), les images sont sautées.
+    """
+    
+    def __init__(self, hote: "HoteConsole"):
+        self.hote = hote
+        self.transport: Optional[asyncio.Transport] = None
+        self.decodeur = DecodeurTelnet()
+        self.session: Optional[SessionConsole] = None
+        self.en_pause = False
+        self.bilan_envoye = False
+        self.limite_taille = 0.0
+        self.phase = 0
+    
+    def connection_made(self, transport: asyncio.Transport):
+        hote = self.hote
+        self.transport = transport
+        if len(hote.connexions) >= hote.sessions_max:
+            hote.compteurs["refus"] += 1
+            transport.write(b"Serveur complet\r\n")
+            transport.close()
+            return
+        hote.connexions.add(self)
+        hote.compteurs["connexions"] += 1
+        # Répartir les rendus des sessions sur les frames
+        self.phase = hote.compteurs["connexions"] % FRAMES_PAR_IMAGE
+        self.limite_taille = time.perf_counter() + ATTENTE_TAILLE
+        transport.set_write_buffer_limits(high=0)
+        connexion = transport.get_extra_info("socket")
+        if connexion is not None:
+            connexion.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, TAMPON_NOYAU)
+        transport.write(NEGOCIATION)
+    
+    def data_received(self, data: bytes):
+        touches = self.decodeur.lire(data)
+        if self.session is None:
+            if self.decodeur.colonnes is not None:
+                self.demarrer()
+            return
+        for touche in touches:
+            terminee = self.session.terminee
+            if not self.session.touche(touche):
+                self.transport.write(EFFACER_ECRAN + AFFICHER_CURSEUR + AU_REVOIR)
+                self.transport.close()
+                return
+            if terminee and not self.session.terminee:
+                # Nouvelle partie : effacer le bilan
+                self.bilan_envoye = False
+                self.transport.write(EFFACER_ECRAN)
+    
+    def demarrer(self):
+        """Crée la session à la taille du terminal (ou à la taille par défaut)"""
+        decodeur = self.decodeur
+        colonnes, lignes = TERMINAL_DEFAUT
+        if decodeur.colonnes is not None:
+            colonnes, lignes = decodeur.colonnes, decodeur.lignes
+        largeur, hauteur = taille_jeu(colonnes, lignes)
+        self.session = SessionConsole(largeur, hauteur, f"Joueur {self.hote.compteurs['connexions']}")
+        self.transport.write(EFFACER_ECRAN + MASQUER_CURSEUR)
+    
+    def frame(self, numero: int):
+        """Une frame de l'hôte : démarrage différé, jeu, image ou bilan"""
+        session = self.session
+        if session is None:
+            if time.perf_counter() >= self.limite_taille:
+                self.demarrer()
+            return
+        compteurs = self.hote.compteurs
+        if session.terminee:
+            if not self.bilan_envoye:
+                self.bilan_envoye = True
+                self.transport.write(EFFACER_ECRAN + encoder_image(session.bilan()))
+            return
+        session.avancer()
+        compteurs["frames"] += 1
+        if (numero + self.phase) % FRAMES_PAR_IMAGE:
+            return
+        if self.en_pause:
+            compteurs["images_sautees"] += 1
+            return
+        image = encoder_image(session.image())
+        self.transport.write(image)
+        compteurs["images"] += 1
+        compteurs["octets"] += len(image)
+    
+    def pause_writing(self):
+        self.en_pause = True
+    
+    def resume_writing(self):
+        self.en_pause = False
+    
+    def connection_lost(self, exc: Optional[Exception]):
+        self.hote.connexions.discard(self)
+
+
+class HoteConsole:
+    """
+    Hôte asyncio : une session par connexion, une seule tâche pour animer toutes les sessions
+    
+    Les frames suivent des échéances absolues ; quand la boucle prend plus
+    d'une frame de retard, elle repart de maintenant : les parties
+    ralentissent au lieu d'enchaîner les frames en rafale (compté dans
+    frames_en_retard).
+    
+    Attributs :
+        connexions (set) : Connexions ouvertes
+        compteurs (dict) : Connexions, refus, frames jouées, images envoyées et sautées, octets
+    """
+    
+    def __init__(self, sessions_max: int = SESSIONS_MAX):
+        self.sessions_max = sessions_max
+        self.connexions = set()
+        self.compteurs = {"connexions": 0, "refus": 0, "frames": 0, "frames_en_retard": 0,
+                          "images": 0, "images_sautees": 0, "octets": 0}
+        self._serveur: Optional[asyncio.AbstractServer] = None
+    
+    async def demarrer(self, hote: str = HOTE, port: int = PORT) -> int:
+        """Ouvre le port d'écoute, retourne le port effectif (utile avec port=0)"""
+        boucle = asyncio.get_running_loop()
+        self._serveur = await boucle.create_server(lambda: ConnexionConsole(self), hote, port)
+        return self._serveur.sockets[0].getsockname()[1]
+    
+    async def servir(self):
+        """Anime les sessions jusqu'à l'annulation"""
+        async with self._serveur:
+            animation = asyncio.create_task(self._animer())
+            try:
+                await self._serveur.serve_forever()
+            finally:
+                animation.cancel()
+    
+    def statistiques(self) -> dict:
+        """Compteurs depuis le démarrage et connexions en cours"""
+        return dict(self.compteurs, sessions=len(self.connexions))
+    
+    async def _animer(self):
+        """Frames de toutes les sessions (échéances absolues, sans dérive)"""
+        boucle = asyncio.get_running_loop()
+        periode = ConfigDifficulte.VITESSE_MAJ
+        echeance = boucle.time()
+        numero = 0
+        
+        while True:
+            # Toujours rendre la main, même en retard, pour lire les joueurs
+            await asyncio.sleep(max(0.0, echeance - boucle.time()))
+            if boucle.time() - echeance > periode:
+                self.compteurs["frames_en_retard"] += 1
+                echeance = boucle.time()
+            echeance += periode
+            numero += 1
+            
+            for connexion in list(self.connexions):
+                if not connexion.transport.is_closing():
+                    connexion.frame(numero)
+
+
+# ==============================================================================
+# LIGNE DE COMMANDE
+# ==============================================================================
+
+async def executer(args):
+    """Démarre l'hôte et affiche ses statistiques régulièrement"""
+    hote = HoteConsole(args.sessions_max)
+    port = await hote.demarrer(args.hote, args.port)
+    print(f"🚀 Hôte console sur {args.hote}:{port} (telnet {args.hote} {port})", flush=True)
+    
+    tache = asyncio.create_task(hote.servir())
+    if args.silencieux:
+        await tache
+        return
+    
+    precedent, debut = hote.statistiques(), time.perf_counter()
+    while not tache.done():
+        await asyncio.sleep(INTERVALLE_STATISTIQUES)
+        stats, fin = hote.statistiques(), time.perf_counter()
+        duree = fin - debut
+        print(f"📊 {stats['sessions']} session(s) | "
+              f"jeu {(stats['frames'] - precedent['frames']) / duree:,.0f} frames/s | "
+              f"affichage {(stats['images'] - precedent['images']) / duree:,.0f} images/s | "
+              f"{(stats['octets'] - precedent['octets']) / duree / 1024:,.1f} Ko/s | "
+              f"retards: {stats['frames_en_retard'] - precedent['frames_en_retard']} | "
+              f"sautées: {stats['images_sautees'] - precedent['images_sautees']}", flush=True)
+        precedent, debut = stats, fin
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Hébergement de parties console pour plusieurs joueurs (telnet)")
+    parser.add_argument("--hote", default=HOTE, help=f"Adresse d'écoute (défaut: {HOTE})")
+    parser.add_argument("--port", type=int, default=PORT, help=f"Port (défaut: {PORT}, 0 : au hasard)")
+    parser.add_argument("--sessions-max", type=int, default=SESSIONS_MAX,
+                        help=f"Sessions simultanées maximum (défaut: {SESSIONS_MAX})")
+    parser.add_argument("--silencieux", action="store_true", help="Ne pas afficher les statistiques")
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(executer(args))
+    except KeyboardInterrupt:
+        print("\n🛑 Hôte arrêté")
+    except OSError as e:
+        print(f"❌ ERREUR : {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+"""
+Index trié du classement pour le Shooter Spatial
+
+Le ScoreManager garde une liste triée par mode de tri ('score', 'date',
+'pseudo'), mise à jour à chaque partie. Une page du classement se lit
+alors sans trier tous les joueurs, à partir d'une position (offset) ou
+d'un curseur (la clé de la dernière ligne de la page précédente).
+
+L'index 'pseudo' sert aussi à la recherche de joueurs : pseudos comparés
+sans tenir compte de la casse, complétion d'un préfixe et suggestions
+("vouliez-vous dire...") à une faute de frappe près.
+"""
+
+import base64
+import json
+import math
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from statistiques import ArbreFenwick
+
+
+TRIS = ("score", "date", "pseudo")
+
+
+def normaliser_nom(nom: str) -> str:
+    """Forme d'un pseudo utilisée pour les comparaisons sans casse"""
+    return nom.casefold()
+
+
+def variantes(mot: str, alphabet: Set[str]) -> Iterator[str]:
+    """
+    Mots à une modification de `mot` (suppression, inversion de deux
+    lettres voisines, remplacement ou insertion d'un caractère de `alphabet`)
+    """
+    for i in range(len(mot) + 1):
+        debut, fin = mot[:i], mot[i:]
+        if fin:
+            yield debut + fin[1:]
+            if len(fin) > 1:
+                yield debut + fin[1] + fin[0] + fin[2:]
+            for c in alphabet:
+                yield debut + c + fin[1:]
+        for c in alphabet:
+            yield debut + c + fin
+
+
+def cle_tri(tri: str, joueur: str, data: dict) -> tuple:
+    """
+    Retourne la clé de `joueur` dans l'index du tri demandé
+    
+    Le pseudo termine chaque clé : deux joueurs n'ont jamais la même clé,
+    et les égalités sont départagées par ordre alphabétique.
+    """
+    if tri == "score":
+        return (data["meilleur_score"], joueur)
+    if tri == "date":
+        return (data.get("timestamp", 0), joueur)
+    return (normaliser_nom(joueur), joueur)
+
+
+def encoder_curseur(tri: str, ordre: str, cle: tuple) -> str:
+    """Curseur opaque (utilisable dans une URL) désignant la clé `cle`"""
+    brut = json.dumps([tri, ordre, *cle], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(brut.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decoder_curseur(curseur: str) -> Tuple[str, str, tuple]:
+    """
+    Décode un curseur produit par encoder_curseur
+    
+    Returns:
+        Tuple[str, str, tuple] : (tri, ordre, clé)
+    
+    Raises:
+        ValueError : Si le curseur est invalide
+    """
+    try:
+        brut = base64.urlsafe_b64decode(curseur + '=' * (-len(curseur) % 4))
+        tri, ordre, valeur, joueur = json.loads(brut.decode('utf-8'))
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError(f"curseur invalide : {curseur!r}") from e
+    if tri not in TRIS or ordre not in ("asc", "desc") or not isinstance(joueur, str):
+        raise ValueError(f"curseur invalide : {curseur!r}")
+    # La clé est comparée à celles de l'index : elle doit en avoir les types (voir cle_tri)
+    if tri == "pseudo":
+        valide = isinstance(valeur, str)
+    else:
+        valide = isinstance(valeur, (int, float)) and not isinstance(valeur, bool) and math.isfinite(valeur)
+    if not valide:
+        raise ValueError(f"curseur invalide : {curseur!r}")
+    return tri, ordre, (valeur, joueur)
+
+
+class ListeTriee:
+    """
+    Liste triée découpée en blocs
+    
+    Insertion et suppression déplacent au plus 2 × CHARGE éléments (au lieu
+    de toute la liste). Un arbre de Fenwick sur la taille des blocs donne la
+    position d'une clé et l'élément à une position en O(log n) : un parcours
+    à partir d'une clé ou d'une position coûte O(log n + nombre d'éléments lus).
+    
+    Attributs :
+        blocs (list) : Blocs triés, chacun de 1 à 2 × CHARGE éléments
+        maximums (list) : Dernier élément de chaque bloc
+        longueurs (ArbreFenwick) : Taille de chaque bloc (None à reconstruire)
+    """
+    
+    CHARGE = 512
+    
+    def __init__(self, valeurs=()):
+        valeurs = sorted(valeurs)
+        self.blocs: List[list] = [valeurs[i:i + self.CHARGE] for i in range(0, len(valeurs), self.CHARGE)]
+        self.maximums = [bloc[-1] for bloc in self.blocs]
+        self.taille = len(valeurs)
+        self.longueurs: Optional[ArbreFenwick] = None
+    
+    def __len__(self) -> int:
+        return self.taille
+    
+    def ajouter(self, valeur):
+        """Insère une valeur à sa place"""
+        self.taille += 1
+        if not self.blocs:
+            self.blocs.append([valeur])
+            self.maximums.append(valeur)
+            self.longueurs = None
+            return
+        
+        i = min(bisect_left(self.maximums, valeur), len(self.blocs) - 1)
+        bloc = self.blocs[i]
+        insort(bloc, valeur)
+        self.maximums[i] = bloc[-1]
+        
+        # Bloc trop grand : on le coupe en deux (les indices des blocs changent)
+        if len(bloc) > 2 * self.CHARGE:
+            self.blocs[i:i + 1] = [bloc[:self.CHARGE], bloc[self.CHARGE:]]
+            self.maximums[i:i + 1] = [bloc[self.CHARGE - 1], bloc[-1]]
+            self.longueurs = None
+        elif self.longueurs is not None:
+            self.longueurs.ajouter(i, 1)
+    
+    def retirer(self, valeur):
+        """Retire une valeur (ValueError si elle est absente)"""
+        i = bisect_left(self.maximums, valeur)
+        if i == len(self.blocs):
+            raise ValueError(f"{valeur!r} absent de la liste")
+        bloc = self.blocs[i]
+        j = bisect_left(bloc, valeur)
+        if j == len(bloc) or bloc[j] != valeur:
+            raise ValueError(f"{valeur!r} absent de la liste")
+        
+        del bloc[j]
+        self.taille -= 1
+        if bloc:
+            self.maximums[i] = bloc[-1]
+            if self.longueurs is not None:
+                self.longueurs.ajouter(i, -1)
+        else:
+            del self.blocs[i]
+            del self.maximums[i]
+            self.longueurs = None
+    
+    def _longueurs(self) -> ArbreFenwick:
+        """Arbre des tailles de blocs, reconstruit en O(nombre de blocs) si besoin"""
+        if self.longueurs is None:
+            self.longueurs = ArbreFenwick.depuis_valeurs([len(bloc) for bloc in self.blocs])
+        return self.longueurs
+    
+    def position(self, valeur) -> int:
+        """Nombre d'éléments strictement inférieurs à `valeur`"""
+        i = bisect_left(self.maximums, valeur)
+        avant = self._longueurs().prefixe(i - 1) if i > 0 else 0
+        if i == len(self.blocs):
+            return avant
+        return avant + bisect_left(self.blocs[i], valeur)
+    
+    def _localiser_position(self, position: int) -> Tuple[int, int]:
+        """(bloc, indice dans le bloc) de l'élément à la position donnée"""
+        if position >= self.taille:
+            return len(self.blocs), 0
+        return self._longueurs().rechercher(position)
+    
+    def _localiser_cle(self, cle, inverse: bool, strict: bool) -> Tuple[int, int]:
+        """
+        (bloc, indice) du premier élément à lire après `cle`
+        
+        Sens croissant : premier élément > cle (>= si non strict).
+        Sens décroissant : dernier élément < cle (<= si non strict).
+        """
+        i = bisect_left(self.maximums, cle)
+        if not inverse:
+            if i == len(self.blocs):
+                return i, 0
+            recherche = bisect_right if strict else bisect_left
+            return i, recherche(self.blocs[i], cle)
+        
+        if i == len(self.blocs):
+            return i - 1, len(self.blocs[i - 1]) - 1
+        recherche = bisect_left if strict else bisect_right
+        return i, recherche(self.blocs[i], cle) - 1
+    
+    def iterer(self, depuis=None, inverse: bool = False, strict: bool = True,
+               position: int = 0) -> Iterator:
+        """
+        Parcourt la liste dans l'ordre croissant (ou décroissant si `inverse`)
+        
+        Args:
+            depuis : Clé à partir de laquelle lire (exclue si `strict`)
+            inverse (bool) : Parcours décroissant
+            strict (bool) : Exclure `depuis` s'il est présent
+            position (int) : Sans `depuis`, nombre d'éléments à sauter
+        """
+        if not self.blocs:
+            return
+        if depuis is not None:
+            i, j = self._localiser_cle(depuis, inverse, strict)
+        elif not inverse:
+            i, j = self._localiser_position(position)
+        elif position < self.taille:
+            i, j = self._localiser_position(self.taille - 1 - position)
+        else:
+            return
+        
+        if not inverse:
+            while i < len(self.blocs):
+                bloc = self.blocs[i]
+                while j < len(bloc):
+                    yield bloc[j]
+                    j += 1
+                i, j = i + 1, 0
+        else:
+            while i >= 0:
+                bloc = self.blocs[i]
+                while j >= 0:
+                    yield bloc[j]
+                    j -= 1
+                i -= 1
+                j = len(self.blocs[i]) - 1 if i >= 0 else -1
+
+
+class IndexClassement:
+    """
+    Une ListeTriee par mode de tri, tenue à jour joueur par joueur
+    
+    Attributs :
+        listes (dict) : Mode de tri -> ListeTriee des clés (voir cle_tri)
+        cles (dict) : Joueur -> clés actuelles (pour les retirer à la mise à jour)
+        noms (set) : Pseudos normalisés (voir normaliser_nom)
+        alphabet (set) : Caractères des pseudos normalisés (pour les suggestions)
+    """
+    
+    def __init__(self, scores: Dict[str, dict]):
+        self.cles: Dict[str, Tuple[tuple, ...]] = {
+            joueur: tuple(cle_tri(tri, joueur, data) for tri in TRIS)
+            for joueur, data in scores.items()
+        }
+        self.listes = {
+            tri: ListeTriee(cles[n] for cles in self.cles.values())
+            for n, tri in enumerate(TRIS)
+        }
+        # Les pseudos normalisés sont ceux des clés de l'index 'pseudo' (mêmes chaînes)
+        indice_pseudo = TRIS.index("pseudo")
+        self.noms: Set[str] = {cles[indice_pseudo][0] for cles in self.cles.values()}
+        self.alphabet: Set[str] = set("".join(self.noms))
+    
+    def __len__(self) -> int:
+        return len(self.cles)
+    
+    def cle(self, tri: str, joueur: str) -> Optional[tuple]:
+        """Clé actuelle d'un joueur dans l'index `tri` (None s'il est inconnu)"""
+        cles = self.cles.get(joueur)
+        return cles[TRIS.index(tri)] if cles is not None else None
+    
+    def rang(self, tri: str, ordre: str, cle: tuple) -> int:
+        """Rang (à partir de 1) d'une clé présente dans l'index, en O(log n)"""
+        position = self.listes[tri].position(cle)
+        if ordre == "desc":
+            return len(self) - position
+        return position + 1
+    
+    def mettre_a_jour(self, joueur: str, data: dict):
+        """Repositionne un joueur après une modification de ses données"""
+        nouvelles = tuple(cle_tri(tri, joueur, data) for tri in TRIS)
+        anciennes = self.cles.get(joueur)
+        if anciennes == nouvelles:
+            return
+        
+        for n, tri in enumerate(TRIS):
+            if anciennes is not None and anciennes[n] != nouvelles[n]:
+                self.listes[tri].retirer(anciennes[n])
+            if anciennes is None or anciennes[n] != nouvelles[n]:
+                self.listes[tri].ajouter(nouvelles[n])
+        self.cles[joueur] = nouvelles
+        
+        # Nouveau joueur : son pseudo devient cherchable
+        nom = nouvelles[TRIS.index("pseudo")][0]
+        if anciennes is None and nom not in self.noms:
+            self.noms.add(nom)
+            self.alphabet.update(nom)
+    
+    def parcourir_cles(self, tri: str, ordre: str = "desc", offset: int = 0,
+                       apres: Optional[tuple] = None) -> Iterator[tuple]:
+        """
+        Parcourt les clés dans l'ordre du classement
+        
+        Args:
+            tri (str) : 'score', 'date' ou 'pseudo'
+            ordre (str) : 'asc' ou 'desc'
+            offset (int) : Nombre de joueurs à sauter (si `apres` n'est pas donné)
+            apres (tuple) : Clé après laquelle reprendre le parcours (exclue)
+        """
+        liste = self.listes[tri if tri in self.listes else "score"]
+        return liste.iterer(depuis=apres, inverse=(ordre == "desc"), position=offset)
+    
+    def parcourir(self, tri: str, ordre: str = "desc", offset: int = 0,
+                  apres: Optional[tuple] = None) -> Iterator[str]:
+        """Parcourt les joueurs dans l'ordre du classement (voir parcourir_cles)"""
+        for cle in self.parcourir_cles(tri, ordre, offset, apres):
+            yield cle[-1]
+    
+    def completer(self, prefixe: str, limite: int = 10) -> List[str]:
+        """Joueurs dont le pseudo commence par `prefixe` (sans casse), par ordre alphabétique"""
+        debut = normaliser_nom(prefixe)
+        joueurs = []
+        for nom, joueur in self.listes["pseudo"].iterer(depuis=(debut,), strict=False):
+            if len(joueurs) >= limite or not nom.startswith(debut):
+                break
+            joueurs.append(joueur)
+        return joueurs
+    
+    def rechercher(self, nom: str) -> List[str]:
+        """Joueurs dont le pseudo est `nom` sans tenir compte de la casse"""
+        cible = normaliser_nom(nom)
+        if cible not in self.noms:
+            return []
+        joueurs = []
+        for cle, joueur in self.listes["pseudo"].iterer(depuis=(cible,), strict=False):
+            if cle != cible:
+                break
+            joueurs.append(joueur)
+        return joueurs
+    
+    def proches(self, nom: str) -> List[str]:
+        """
+        Joueurs dont le pseudo diffère de `nom` d'une faute de frappe (sans casse)
+        
+        Seules les variantes de `nom` sont cherchées dans l'ensemble des
+        pseudos (environ 2 × longueur × taille de l'alphabet tests) : le
+        coût ne dépend pas du nombre de joueurs.
+        """
+        cible = normaliser_nom(nom)
+        trouves = {v for v in variantes(cible, self.alphabet) if v in self.noms}
+        trouves.discard(cible)
+        return [joueur for v in sorted(trouves) for joueur in self.rechercher(v)]
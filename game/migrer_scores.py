@@ -0,0 +1,434 @@
+"""
+Outil de migration du fichier scores.json vers le schéma versionné
+
+Usage :
+    python migrer_scores.py                      # Migre scores.json sur place
+    python migrer_scores.py ancien.json -o nouveau.json
+    python migrer_scores.py --benchmark 200000   # Mesure le gain au chargement
+
+La migration lit le fichier joueur par joueur (mémoire bornée, même pour
+des millions de joueurs) et réécrit le résultat de façon atomique.
+Une fois le fichier migré, ScoreManager le charge sans aucune vérification
+par joueur.
+"""
+
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from score_manager import VERSION_SCHEMA, ScoreManager, VerrouFichier, _ecrire_atomique
+from statistiques import nouveaux_agregats, ajouter_partie, indice_seau
+from historique import historique_depuis_liste, encoder_json
+
+
+TAILLE_BLOC = 64 * 1024
+
+
+# ==============================================================================
+# ÉTAPES DE MIGRATION (une fonction par version)
+# ==============================================================================
+
+def _migrer_v1_vers_v2(data: dict):
+    """Format historique (sans version) → v2 : dates et timestamps complétés"""
+    # S'assurer que tous les historiques ont un timestamp
+    for entree in data.get("historique", []):
+        if "timestamp" not in entree:
+            try:
+                date_obj = datetime.strptime(entree["date"], "%Y-%m-%d %H:%M:%S")
+                entree["timestamp"] = date_obj.timestamp()
+            except (KeyError, TypeError, ValueError):
+                entree["timestamp"] = 0
+    
+    # Chercher la date la plus récente dans l'historique
+    derniere = data["historique"][-1] if data.get("historique") else {}
+    if "derniere_partie" not in data:
+        data["derniere_partie"] = derniere.get("date", "Inconnue")
+    if not data.get("timestamp"):
+        data["timestamp"] = derniere.get("timestamp", 0)
+    
+    data.setdefault("historique", [])
+
+
+def _migrer_v2_vers_v3(data: dict):
+    """v2 → v3 : agrégats statistiques reconstruits depuis l'historique
+    
+    L'historique ne contient que les dernières parties : les totaux connus
+    (nombre de parties, somme, record) sont repris tels quels, la somme
+    des carrés et l'histogramme sont extrapolés à partir des parties
+    disponibles. Ils sont alors marqués estimés ("somme_carres_estimee",
+    "histogramme_estime") : l'écart-type, le minimum et les percentiles du
+    joueur restent approximatifs, ainsi que sa part dans les percentiles
+    globaux (ScoreManager.obtenir_percentile).
+    """
+    agregats = nouveaux_agregats()
+    for entree in data.get("historique", []):
+        ajouter_partie(agregats, entree.get("score", 0), entree.get("timestamp", 0))
+    
+    nb_historique = agregats["nb"]
+    parties_jouees = data.get("parties_jouees", nb_historique)
+    if nb_historique and parties_jouees > nb_historique:
+        agregats["somme_carres"] = round(agregats["somme_carres"] / nb_historique * parties_jouees)
+        agregats["histogramme"] = _etendre_histogramme(agregats["histogramme"], parties_jouees)
+        agregats["somme_carres_estimee"] = True
+        agregats["histogramme_estime"] = True
+    elif not nb_historique and parties_jouees:
+        # Aucune partie détaillée : toutes comptées au score moyen
+        moyenne = data.get("score_total", 0) / parties_jouees
+        agregats["histogramme"] = {str(indice_seau(moyenne)): parties_jouees}
+        agregats["somme_carres_estimee"] = True
+        agregats["histogramme_estime"] = True
+    agregats["nb"] = data.get("parties_jouees", nb_historique)
+    agregats["somme"] = data.get("score_total", agregats["somme"])
+    if data.get("parties_jouees"):
+        agregats["max"] = data.get("meilleur_score", agregats["max"])
+    data["agregats"] = agregats
+
+
+def _etendre_histogramme(histogramme: dict, nb: int) -> dict:
+    """Répartit `nb` parties entre les seaux au prorata de l'histogramme (plus forts restes)"""
+    total = sum(histogramme.values())
+    parts = {seau: compte * nb / total for seau, compte in histogramme.items()}
+    resultat = {seau: int(part) for seau, part in parts.items()}
+    reste = nb - sum(resultat.values())
+    for seau in sorted(parts, key=lambda seau: resultat[seau] - parts[seau])[:reste]:
+        resultat[seau] += 1
+    return resultat
+
+
+def _migrer_v3_vers_v4(data: dict):
+    """v3 → v4 : historique compact (voir historique.py) à la place de la liste de parties"""
+    data["historique"] = historique_depuis_liste(data.get("historique", []))
+
+
+# Étape à appliquer pour passer de la version N à N+1
+MIGRATIONS = {
+    1: _migrer_v1_vers_v2,
+    2: _migrer_v2_vers_v3,
+    3: _migrer_v3_vers_v4,
+}
+
+
+def migrer_joueur(data: dict, version: int) -> dict:
+    """Applique toutes les étapes de migration depuis `version` jusqu'au schéma courant"""
+    while version < VERSION_SCHEMA:
+        MIGRATIONS[version](data)
+        version += 1
+    return data
+
+
+# ==============================================================================
+# LECTURE EN FLUX
+# ==============================================================================
+
+class LecteurFluxJSON:
+    """
+    Lecteur JSON incrémental pour les objets de premier niveau
+    
+    Ne garde en mémoire que le bloc en cours de lecture et la valeur
+    en cours de décodage (un joueur), jamais le fichier entier.
+    """
+    
+    def __init__(self, flux):
+        self.flux = flux
+        self.tampon = ""
+        self.position = 0
+        self.fin_fichier = False
+        self.decodeur = json.JSONDecoder()
+    
+    def _remplir(self) -> bool:
+        """Lit un bloc supplémentaire, retourne False en fin de fichier"""
+        if self.fin_fichier:
+            return False
+        bloc = self.flux.read(TAILLE_BLOC)
+        if not bloc:
+            self.fin_fichier = True
+            return False
+        # Oublier la partie déjà consommée pour borner la mémoire
+        self.tampon = self.tampon[self.position:] + bloc
+        self.position = 0
+        return True
+    
+    def _caractere_suivant(self) -> str:
+        """Retourne le prochain caractère non blanc sans le consommer"""
+        while True:
+            while self.position < len(self.tampon) and self.tampon[self.position] in " \t\r\n":
+                self.position += 1
+            if self.position < len(self.tampon):
+                return self.tampon[self.position]
+            if not self._remplir():
+                raise ValueError("Fin de fichier JSON inattendue")
+    
+    def attendre(self, caractere: str):
+        """Consomme le caractère attendu (erreur sinon)"""
+        trouve = self._caractere_suivant()
+        if trouve != caractere:
+            raise ValueError(f"JSON invalide : '{caractere}' attendu, '{trouve}' trouvé")
+        self.position += 1
+    
+    def lire_valeur(self):
+        """Décode la valeur JSON suivante, en lisant plus de blocs si besoin"""
+        self._caractere_suivant()
+        while True:
+            try:
+                valeur, fin = self.decodeur.raw_decode(self.tampon, self.position)
+                # Un nombre coupé en fin de bloc serait décodé tronqué
+                if fin < len(self.tampon) or self.fin_fichier:
+                    self.position = fin
+                    return valeur
+            except json.JSONDecodeError:
+                if self.fin_fichier:
+                    raise
+            self._remplir()
+    
+    def iterer_objet(self) -> Iterator[Tuple[str, object]]:
+        """Parcourt les paires (clé, valeur) d'un objet JSON"""
+        self.attendre("{")
+        if self._caractere_suivant() == "}":
+            self.position += 1
+            return
+        while True:
+            cle = self.lire_valeur()
+            self.attendre(":")
+            yield cle, self.lire_valeur()
+            if self._caractere_suivant() == ",":
+                self.position += 1
+                continue
+            self.attendre("}")
+            return
+
+
+def iterer_joueurs(flux, entete: Optional[dict] = None) -> Iterator[Tuple[str, dict, int]]:
+    """
+    Parcourt les joueurs d'un fichier de scores, quel que soit son format
+    
+    Args:
+        flux : Fichier de scores ouvert en lecture
+        entete (dict) : Reçoit les clés placées entre "version" et "joueurs"
+                        (par exemple "sequence"), avant le premier joueur
+    
+    Yields:
+        (nom_joueur, donnees, version_du_fichier)
+    
+    Les fichiers versionnés commencent toujours par la clé "version",
+    tout autre fichier est considéré comme l'ancien format (version 1).
+    """
+    if entete is None:
+        entete = {}
+    lecteur = LecteurFluxJSON(flux)
+    lecteur.attendre("{")
+    if lecteur._caractere_suivant() == "}":
+        return
+    
+    cle = lecteur.lire_valeur()
+    lecteur.attendre(":")
+    
+    if cle == "version" and lecteur._caractere_suivant() != "{":
+        version = lecteur.lire_valeur()
+        while True:
+            if lecteur._caractere_suivant() != ",":
+                raise ValueError("Clé 'joueurs' absente du fichier versionné")
+            lecteur.position += 1
+            cle = lecteur.lire_valeur()
+            lecteur.attendre(":")
+            if cle == "joueurs":
+                break
+            entete[cle] = lecteur.lire_valeur()
+        for joueur, data in lecteur.iterer_objet():
+            yield joueur, data, version
+        return
+    
+    # Ancien format : chaque clé de premier niveau est un joueur
+    version = 1
+    while True:
+        yield cle, lecteur.lire_valeur(), version
+        if lecteur._caractere_suivant() != ",":
+            lecteur.attendre("}")
+            return
+        lecteur.position += 1
+        cle = lecteur.lire_valeur()
+        lecteur.attendre(":")
+
+
+# ==============================================================================
+# MIGRATION D'UN FICHIER
+# ==============================================================================
+
+def _morceaux_migres(entree, compteurs: dict) -> Iterator[str]:
+    """Produit le fichier migré morceau par morceau (un joueur à la fois)"""
+    # L'en-tête est connu une fois le premier joueur atteint
+    entete = {}
+    joueurs = iterer_joueurs(entree, entete)
+    premier = next(joueurs, None)
+    yield f'{{"version": {VERSION_SCHEMA}, '
+    for cle, valeur in entete.items():
+        yield f'{json.dumps(cle, ensure_ascii=False)}: {json.dumps(valeur, ensure_ascii=False)}, '
+    yield '"joueurs": {'
+    separateur = "\n"
+    for joueur, data, version in chain([premier] if premier else [], joueurs):
+        compteurs["version_source"] = version
+        if version < VERSION_SCHEMA:
+            migrer_joueur(data, version)
+            compteurs["migres"] += 1
+        yield separateur
+        yield json.dumps(joueur, ensure_ascii=False)
+        yield ": "
+        yield json.dumps(data, ensure_ascii=False, default=encoder_json)
+        separateur = ",\n"
+        compteurs["joueurs"] += 1
+    yield "\n}}\n"
+
+
+def migrer_fichier(source: Path, destination: Path) -> dict:
+    """
+    Migre `source` vers le schéma courant et écrit le résultat dans `destination`
+    
+    L'écriture passe par un fichier temporaire renommé à la fin (voir
+    score_manager._ecrire_atomique), le fichier de destination n'est donc
+    jamais laissé à moitié écrit et garde ses droits. Les clés d'en-tête
+    (dont "sequence", dernière partie du journal incluse) sont recopiées.
+    
+    Le verrou des écrivains de la destination (voir ScoreManager) est tenu
+    de la lecture au remplacement : un jeu ou serveur_web qui sauvegarde
+    pendant la migration attend, au lieu d'être écrasé par la copie migrée.
+    
+    Returns:
+        dict : Compteurs de la migration (joueurs, joueurs modifiés, version d'origine)
+    """
+    compteurs = {"joueurs": 0, "migres": 0, "version_source": VERSION_SCHEMA}
+    
+    with VerrouFichier(destination.with_name(destination.name + ".verrou")):
+        with open(source, "r", encoding="utf-8") as entree:
+            _ecrire_atomique(str(destination), _morceaux_migres(entree, compteurs))
+    
+    return compteurs
+
+
+# ==============================================================================
+# BENCHMARK
+# ==============================================================================
+
+def generer_fichier_ancien(chemin: Path, nb_joueurs: int, graine: int = 42):
+    """Écrit (en flux) un fichier de scores synthétique à l'ancien format"""
+    aleatoire = random.Random(graine)
+    debut = datetime(2025, 1, 1).timestamp()
+    
+    with open(chemin, "w", encoding="utf-8") as f:
+        f.write("{")
+        for i in range(nb_joueurs):
+            historique = []
+            for _ in range(aleatoire.randint(1, 10)):
+                ts = debut + aleatoire.randint(0, 365 * 86400)
+                historique.append({
+                    "score": aleatoire.randint(0, 300) * 10,
+                    "date": datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S"),
+                })
+            scores = [e["score"] for e in historique]
+            data = {
+                "meilleur_score": max(scores),
+                "parties_jouees": len(scores),
+                "score_total": sum(scores),
+                "historique": historique,
+            }
+            if i:
+                f.write(",")
+            f.write(f"\n{json.dumps(f'Joueur{i}')}: {json.dumps(data)}")
+        f.write("\n}\n")
+
+
+def _chronometrer_chargement(chemin: Path) -> float:
+    """Retourne la durée (s) de construction d'un ScoreManager sur `chemin`"""
+    debut = time.perf_counter()
+    ScoreManager(str(chemin))
+    return time.perf_counter() - debut
+
+
+def benchmark(nb_joueurs: int):
+    """Compare le temps de chargement avant et après migration"""
+    with tempfile.TemporaryDirectory() as dossier:
+        ancien = Path(dossier) / "scores_ancien.json"
+        nouveau = Path(dossier) / "scores_v{}.json".format(VERSION_SCHEMA)
+        
+        print(f"📝 Génération de {nb_joueurs:,} joueurs (ancien format)...")
+        generer_fichier_ancien(ancien, nb_joueurs)
+        taille_mo = ancien.stat().st_size / 1e6
+        
+        avant = _chronometrer_chargement(ancien)
+        
+        debut = time.perf_counter()
+        migrer_fichier(ancien, nouveau)
+        duree_migration = time.perf_counter() - debut
+        
+        apres = _chronometrer_chargement(nouveau)
+    
+    print()
+    print("="*60)
+    print(f"  Fichier synthétique : {nb_joueurs:,} joueurs ({taille_mo:.1f} Mo)")
+    print(f"  Chargement avant migration : {avant * 1000:9.1f} ms")
+    print(f"  Migration (une seule fois) : {duree_migration * 1000:9.1f} ms")
+    print(f"  Chargement après migration : {apres * 1000:9.1f} ms")
+    if apres > 0:
+        print(f"  Gain au chargement         : x{avant / apres:.2f}")
+    print("="*60)
+
+
+# ==============================================================================
+# MAIN
+# ==============================================================================
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(
+        description=f"Migre un fichier de scores vers le schéma v{VERSION_SCHEMA}"
+    )
+    parser.add_argument("fichier", nargs="?", default="scores.json",
+                        help="Fichier à migrer (défaut: scores.json du jeu)")
+    parser.add_argument("-o", "--sortie",
+                        help="Fichier de sortie (défaut: migration sur place)")
+    parser.add_argument("--sans-sauvegarde", action="store_true",
+                        help="Ne pas conserver de copie .bak de l'original")
+    parser.add_argument("--benchmark", type=int, metavar="N",
+                        help="Mesurer le chargement avant/après sur N joueurs synthétiques")
+    args = parser.parse_args()
+    
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return 0
+    
+    source = Path(args.fichier)
+    if not source.is_absolute() and not source.exists():
+        source = Path(__file__).parent / source
+    if not source.exists():
+        print(f"❌ Fichier introuvable : {source}")
+        return 1
+    
+    destination = Path(args.sortie) if args.sortie else source
+    
+    if destination == source and not args.sans_sauvegarde:
+        sauvegarde = source.with_name(source.name + ".bak")
+        shutil.copy2(source, sauvegarde)
+        print(f"💾 Copie de sauvegarde : {sauvegarde}")
+    
+    try:
+        compteurs = migrer_fichier(source, destination)
+    except (ValueError, IOError) as e:
+        print(f"❌ Erreur lors de la migration : {e}")
+        return 1
+    
+    if compteurs["migres"]:
+        print(f"✅ {compteurs['migres']} joueur(s) migré(s) de la v{compteurs['version_source']} "
+              f"vers la v{VERSION_SCHEMA} → {destination}")
+    else:
+        print(f"✅ Fichier déjà à la v{VERSION_SCHEMA} ({compteurs['joueurs']} joueurs) → {destination}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Roue de minuteries hiérarchique pour le Shooter Spatial (temps en frames)
+
+Une minuterie est rangée selon son échéance dans l'un des NB_NIVEAUX
+niveaux de TAILLE_NIVEAU cases : le niveau 0 contient les 64 prochaines
+frames (une case par frame), le niveau 1 des blocs de 64 frames, le
+niveau 2 des blocs de 4096 frames, etc. À chaque bloc entamé, la case
+correspondante du niveau supérieur est redescendue (cascade). Avancer
+d'une frame ne touche donc que les minuteries dues, et les périodes sans
+minuterie sont sautées d'un bloc entier.
+
+Usage :
+    roue = RoueMinuteries()
+    minuterie = roue.programmer(300, print, "frame 300")
+    roue.avancer_jusqu_a(1000)   # affiche "frame 300"
+"""
+
+from typing import Callable, Optional
+
+
+BITS_PAR_NIVEAU = 6
+TAILLE_NIVEAU = 1 << BITS_PAR_NIVEAU
+MASQUE = TAILLE_NIVEAU - 1
+
+# 64^4 frames ≈ 6 jours à 30 FPS ; au-delà, les minuteries attendent dans une liste à part
+NB_NIVEAUX = 4
+
+
+class Minuterie:
+    """
+    Rappel programmé pour une frame donnée
+    
+    Attributs :
+        frame (int) : Frame d'échéance
+        annulee (bool) : La minuterie ne se déclenchera pas
+    """
+    
+    __slots__ = ("frame", "rappel", "arguments", "annulee")
+    
+    def __init__(self, frame: int, rappel: Callable, arguments: tuple):
+        self.frame = frame
+        self.rappel = rappel
+        self.arguments = arguments
+        self.annulee = False
+    
+    def annuler(self):
+        """Empêche le déclenchement (la minuterie est retirée à son échéance)"""
+        self.annulee = True
+
+
+class RoueMinuteries:
+    """
+    Roue de minuteries indexée sur frame_count
+    
+    Attributs :
+        maintenant (int) : Dernière frame traitée
+    """
+    
+    def __init__(self, maintenant: int = 0):
+        self.maintenant = maintenant
+        self._niveaux = [[[] for _ in range(TAILLE_NIVEAU)] for _ in range(NB_NIVEAUX)]
+        self._nombres = [0] * NB_NIVEAUX
+        self._lointaines = []
+    
+    def __len__(self) -> int:
+        """Nombre de minuteries en attente (annulées comprises)"""
+        return sum(self._nombres) + len(self._lointaines)
+    
+    def programmer(self, frame: int, rappel: Callable, *arguments) -> Minuterie:
+        """
+        Programme rappel(*arguments) pour la frame donnée
+        
+        Une échéance déjà passée se déclenche à la prochaine frame traitée.
+        """
+        minuterie = Minuterie(max(frame, self.maintenant + 1), rappel, arguments)
+        self._placer(minuterie)
+        return minuterie
+    
+    def _placer(self, minuterie: Minuterie):
+        """Range la minuterie au niveau correspondant à son éloignement"""
+        ecart = minuterie.frame - self.maintenant
+        for niveau in range(NB_NIVEAUX):
+            if ecart < 1 << (BITS_PAR_NIVEAU * (niveau + 1)):
+                index = (minuterie.frame >> (BITS_PAR_NIVEAU * niveau)) & MASQUE
+                self._niveaux[niveau][index].append(minuterie)
+                self._nombres[niveau] += 1
+                return
+        self._lointaines.append(minuterie)
+    
+    def _vider_case(self, niveau: int, index: int) -> list:
+        """Retire et retourne le contenu d'une case"""
+        case = self._niveaux[niveau][index]
+        self._niveaux[niveau][index] = []
+        self._nombres[niveau] -= len(case)
+        return case
+    
+    def _cascader(self):
+        """Début de bloc : redescend les minuteries des cases qui commencent maintenant"""
+        for niveau in range(1, NB_NIVEAUX):
+            index = (self.maintenant >> (BITS_PAR_NIVEAU * niveau)) & MASQUE
+            for minuterie in self._vider_case(niveau, index):
+                if not minuterie.annulee:
+                    self._placer(minuterie)
+            if index:
+                return
+        
+        # Tour complet de la roue : les minuteries lointaines se rapprochent
+        lointaines, self._lointaines = self._lointaines, []
+        for minuterie in lointaines:
+            if not minuterie.annulee:
+                self._placer(minuterie)
+    
+    def avancer_jusqu_a(self, frame: int):
+        """Traite les frames jusqu'à `frame` incluse et déclenche les minuteries dues"""
+        while self.maintenant < frame:
+            if not len(self):
+                self.maintenant = frame
+                return
+            
+            # Tant que les niveaux inférieurs sont vides, rien n'est dû avant le prochain bloc
+            pas = 1
+            for niveau in range(NB_NIVEAUX):
+                if self._nombres[niveau]:
+                    break
+                pas = 1 << (BITS_PAR_NIVEAU * (niveau + 1))
+            self.maintenant = min(frame, (self.maintenant // pas + 1) * pas)
+            
+            if self.maintenant & MASQUE == 0:
+                self._cascader()
+            for minuterie in self._vider_case(0, self.maintenant & MASQUE):
+                if not minuterie.annulee:
+                    minuterie.rappel(*minuterie.arguments)
+    
+    def prochaine_echeance(self) -> Optional[int]:
+        """Frame de la prochaine minuterie non annulée (None : aucune)"""
+        echeances = [m.frame for m in self._lointaines if not m.annulee]
+        for niveau in range(NB_NIVEAUX):
+            if not self._nombres[niveau]:
+                continue
+            # La case courante d'un niveau ne contient que des échéances du tour suivant : elle passe en dernier
+            courant = (self.maintenant >> (BITS_PAR_NIVEAU * niveau)) & MASQUE
+            for decalage in range(1, TAILLE_NIVEAU + 1):
+                case = self._niveaux[niveau][(courant + decalage) & MASQUE]
+                frames = [m.frame for m in case if not m.annulee]
+                if frames:
+                    echeances.append(min(frames))
+                    break
+        return min(echeances) if echeances else None
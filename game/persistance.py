@@ -0,0 +1,163 @@
+"""
+Écriture groupée des scores (group commit) pour le Shooter Spatial
+
+Les scores soumis sont mis en file d'attente ; un thread les passe par lots
+à ScoreManager.enregistrer_lot, qui les ajoute au journal avec un seul fsync.
+Pendant qu'un lot est écrit, les scores suivants s'accumulent et partent
+ensemble dans l'écriture suivante. scores.json est réécrit en entier quand
+le journal devient grand, quand plus aucun score n'arrive, et à l'arrêt.
+
+Les interfaces du jeu (shooter_gui, shooter_console) passent aussi par ce
+thread : l'écran de fin de partie n'attend plus ni la réécriture de
+scores.json ni l'export HTML.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+from score_manager import ScoreManager
+
+
+# Nombre maximal de scores par écriture du journal
+TAILLE_LOT_MAX = 10000
+
+# Scores en attente au-delà desquels soumettre() bloque jusqu'à la prochaine écriture
+TAILLE_FILE_MAX = 100000
+
+# Secondes sans nouveau score avant de réécrire scores.json
+DELAI_POINT_CONTROLE = 5.0
+
+# Élément de file qui demande l'arrêt du thread d'écriture
+_ARRET = object()
+
+
+class EcrivainGroupe:
+    """
+    Thread d'écriture des scores par lots
+    
+    soumettre() rend la main immédiatement (sauf si la file est pleine) et
+    retourne un Future, résolu (nouveau record ou non) une fois le lot
+    contenant ce score écrit sur le disque.
+    
+    Attributs :
+        manager (ScoreManager) : Scores mis à jour
+        taille_lot_max (int) : Nombre maximal de scores par écriture
+        apres_lot (Callable) : Appelée dans le thread d'écriture après chaque lot
+                               (par exemple manager.exporter_html)
+        nb_lots (int) : Nombre d'écritures du journal
+        nb_scores (int) : Nombre de scores écrits
+    """
+    
+    def __init__(self, manager: ScoreManager, taille_lot_max: int = TAILLE_LOT_MAX,
+                 taille_file_max: int = TAILLE_FILE_MAX,
+                 apres_lot: Optional[Callable[[], object]] = None):
+        self.manager = manager
+        self.taille_lot_max = taille_lot_max
+        self.apres_lot = apres_lot
+        self.file: "queue.Queue" = queue.Queue(taille_file_max)
+        self.nb_lots = 0
+        self.nb_scores = 0
+        self._thread: Optional[threading.Thread] = None
+        self._verrou = threading.Lock()
+    
+    def demarrer(self):
+        """Lance le thread d'écriture (sans effet s'il tourne déjà)"""
+        with self._verrou:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._boucle, name="ecrivain-scores", daemon=True)
+                self._thread.start()
+    
+    def soumettre(self, joueur: str, score: int,
+                  rappel: Optional[Callable[[bool], None]] = None) -> Future:
+        """
+        Met un score en file d'attente d'écriture
+        
+        Args:
+            joueur (str) : Nom du joueur
+            score (int) : Score obtenu
+            rappel (Callable) : Appelée avec le résultat (nouveau record ou non)
+                                dans le thread d'écriture, si l'écriture réussit
+        """
+        self.demarrer()
+        futur = Future()
+        if rappel is not None:
+            def transmettre(f: Future):
+                if f.exception() is None:
+                    rappel(f.result())
+            futur.add_done_callback(transmettre)
+        self.file.put((joueur, score, futur))
+        return futur
+    
+    def vider(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend que tous les scores déjà soumis soient écrits
+        
+        Returns:
+            bool : False si le délai a expiré ou si une écriture a échoué
+        """
+        if self._thread is None:
+            return True
+        futur = Future()
+        self.file.put((None, None, futur))
+        try:
+            return futur.result(timeout)
+        except Exception:
+            return False
+    
+    def arreter(self, timeout: Optional[float] = None):
+        """Écrit les scores en attente et scores.json, puis arrête le thread"""
+        if self._thread is None:
+            return
+        self.file.put(_ARRET)
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def _boucle(self):
+        """Attend un premier score puis prend tout ce qui est arrivé entre-temps"""
+        while True:
+            try:
+                lot = [self.file.get(timeout=DELAI_POINT_CONTROLE)]
+            except queue.Empty:
+                self._point_de_controle()
+                continue
+            while len(lot) < self.taille_lot_max:
+                try:
+                    lot.append(self.file.get_nowait())
+                except queue.Empty:
+                    break
+            
+            arret = any(element is _ARRET for element in lot)
+            self._ecrire_lot([element for element in lot if element is not _ARRET])
+            if arret:
+                self._point_de_controle()
+                return
+    
+    def _point_de_controle(self):
+        """Réécrit scores.json si le journal contient des parties"""
+        if self.manager.entrees_journal:
+            self.manager.sauvegarder()
+    
+    def _ecrire_lot(self, lot: List[Tuple[Optional[str], Optional[int], Future]]):
+        """Enregistre un lot de scores avec une seule écriture du journal"""
+        # Les éléments sans joueur sont de simples points de synchronisation (vider)
+        parties = [(joueur, score) for joueur, score, _ in lot if joueur is not None]
+        try:
+            resultats = iter(self.manager.enregistrer_lot(parties) if parties else [])
+        except Exception as e:
+            for _, _, futur in lot:
+                futur.set_exception(e)
+            return
+        
+        if parties:
+            self.nb_lots += 1
+            self.nb_scores += len(parties)
+        for joueur, _, futur in lot:
+            futur.set_result(next(resultats) if joueur is not None else True)
+        
+        if parties and self.apres_lot is not None:
+            try:
+                self.apres_lot()
+            except Exception as e:
+                print(f"⚠️  Erreur après l'écriture des scores: {e}")
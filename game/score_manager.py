@@ -2,10 +2,45 @@
 Gestionnaire de scores pour le Shooter Spatial
 """
 
+import hashlib
 import json
+import os
+import re
+import stat
+import sys
+import tempfile
+import threading
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, List, Optional, Tuple
 from datetime import datetime
+from itertools import islice
+from statistiques import (
+    nouveaux_agregats, ajouter_partie, resumer_agregats, indice_seau, DistributionScores
+)
+from index_classement import IndexClassement, TRIS, encoder_curseur, decoder_curseur, normaliser_nom
+from historique import (
+    Retention, RETENTION_PAR_DEFAUT, nouvel_historique, ajouter_au_historique,
+    parties_en_dictionnaires, encoder_json
+)
+
+# Verrou entre processus selon le système (voir VerrouFichier)
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
+
+
+# Version du format de scores.json (voir migrer_scores.py pour les migrations)
+VERSION_SCHEMA = 4
+
+# Nombre de lignes par vue exportées pour le leaderboard web
+LIMITE_LEADERBOARD = 100
+
+# Taille du journal des parties (enregistrer_lot) qui déclenche la réécriture de scores.json
+ENTREES_JOURNAL_MAX = 50000
+
+# Fichiers à l'ancien format déjà signalés (voir _charger_scores)
+_MIGRATIONS_SIGNALEES = set()
 
 
 class ScoreManager:
@@ -16,14 +51,31 @@ class ScoreManager:
     - Enregistrement des scores avec historique
     - Classement des meilleurs joueurs
     - Statistiques détaillées par joueur
+    - Rang et percentile d'un score parmi toutes les parties
     - Export HTML pour affichage web
+    - Notification des abonnés à chaque partie enregistrée
+    - Utilisable depuis plusieurs threads (verrou réentrant)
+    - Utilisable depuis plusieurs processus (jeu et serveur_web) : chaque
+      écriture se fait sous un verrou de fichier, après avoir relu ce que
+      les autres processus ont écrit depuis
     
     Attributs :
         fichier (Path) : Chemin du fichier JSON de sauvegarde
         scores (dict) : Dictionnaire contenant tous les scores
+        distribution_parties (DistributionScores) : Scores de toutes les parties
+        distribution_records (DistributionScores) : Meilleur score de chaque joueur
+        index (IndexClassement) : Joueurs triés par score, date et pseudo
+        verrou (RLock) : À tenir pour lire ou modifier les scores depuis un autre thread
+        signature_fichier (tuple) : (mtime, taille, inode) du fichier au dernier chargement ou sauvegarde
+        fichier_journal (Path) : Parties enregistrées par lots depuis la dernière sauvegarde
+        position_journal (int) : Octets du journal déjà appliqués en mémoire
+        sequence (int) : Numéro de la dernière partie journalisée (tous processus confondus)
+        verrou_fichier (VerrouFichier) : Verrou entre processus des écritures (scores.json.verrou)
+        retention (Retention) : Parties gardées en détail dans l'historique
     """
     
-    def __init__(self, fichier: str = "scores.json"):
+    def __init__(self, fichier: str = "scores.json", verbeux: bool = True,
+                 retention: Retention = RETENTION_PAR_DEFAUT):
         """Initialise le gestionnaire avec le fichier de scores"""
         # Utiliser un chemin absolu basé sur l'emplacement du script
         if not Path(fichier).is_absolute():
@@ -31,50 +83,198 @@ class ScoreManager:
             self.fichier = script_dir / fichier
         else:
             self.fichier = Path(fichier)
+        self.fichier_journal = self.fichier.with_name(self.fichier.name + ".journal")
+        self.verrou_fichier = VerrouFichier(self.fichier.with_name(self.fichier.name + ".verrou"))
+        self.verbeux = verbeux
+        self.retention = retention
+        self.verrou = threading.RLock()
+        self.signature_fichier = None
+        self.sequence = 0
+        self.entrees_journal = 0
+        self.position_journal = 0
         self.scores = self._charger_scores()
+        self._construire_distributions()
+        self.index = IndexClassement(self.scores)
+        
+        # Détection des changements pour l'export HTML
+        self.version_donnees = 0
+        self._document_cache = None
+        self._cle_document = None
+        self._derniers_exports = {}
+        
+        # Fonctions appelées après chaque partie enregistrée
+        self._abonnes: List[Callable[[dict], None]] = []
+        
+        # Parties enregistrées par lots pas encore sauvegardées dans scores.json
+        self._rejouer_journal()
+    
+    def abonner(self, rappel: Callable[[dict], None]):
+        """
+        Abonne une fonction aux nouvelles parties
+        
+        Le rappel reçoit un dict {"joueur", "score", "nouveau_record", "version"}
+        une fois la partie sauvegardée. Il est appelé dans le thread qui
+        enregistre le score et doit donc rester rapide.
+        """
+        self._abonnes.append(rappel)
+    
+    def desabonner(self, rappel: Callable[[dict], None]):
+        """Retire un abonné ajouté par abonner()"""
+        if rappel in self._abonnes:
+            self._abonnes.remove(rappel)
+    
+    def _notifier(self, evenement: dict):
+        """Prévient les abonnés (une erreur d'abonné n'interrompt pas l'enregistrement)"""
+        for rappel in list(self._abonnes):
+            try:
+                rappel(evenement)
+            except Exception as e:
+                print(f"⚠️  Erreur d'un abonné aux scores: {e}")
+    
+    def recharger(self):
+        """Relit le fichier de scores (modifié par un autre processus)"""
+        with self.verrou:
+            self.scores = self._charger_scores()
+            self._construire_distributions()
+            self.index = IndexClassement(self.scores)
+            self._rejouer_journal()
+            self.version_donnees += 1
+    
+    def recharger_si_modifie(self) -> bool:
+        """
+        Applique les parties enregistrées par un autre processus
+        
+        scores.json remplacé : il est relu en entier ; sinon seules les
+        nouvelles lignes du journal sont rejouées.
+        
+        Returns:
+            bool : True si les scores ont changé
+        """
+        with self.verrou:
+            if self._lire_signature() != self.signature_fichier:
+                self.recharger()
+                return True
+            taille = self._taille_journal()
+            if taille == self.position_journal:
+                return False
+            if taille < self.position_journal:
+                # Journal vidé par un autre processus sans que scores.json ait changé : tout relire
+                self.recharger()
+                return True
+            return self._rejouer_journal(self.position_journal) > 0
+    
+    def _lire_signature(self):
+        """(mtime, taille, inode) du fichier de scores, None s'il n'existe pas"""
+        try:
+            statistiques = os.stat(self.fichier)
+        except OSError:
+            return None
+        return (statistiques.st_mtime_ns, statistiques.st_size, statistiques.st_ino)
+    
+    def _taille_journal(self) -> int:
+        """Taille du journal en octets (0 s'il n'existe pas)"""
+        try:
+            return os.path.getsize(self.fichier_journal)
+        except OSError:
+            return 0
     
     def _charger_scores(self) -> dict:
         """Charge les scores depuis le fichier JSON"""
+        self.signature_fichier = self._lire_signature()
+        self.sequence = 0
         if not self.fichier.exists():
             return {}
         
         try:
             with open(self.fichier, 'r', encoding='utf-8') as f:
-                scores = json.load(f)
-            
-            # Migration des anciennes données: ajouter les champs manquants
-            for joueur, data in scores.items():
-                if "derniere_partie" not in data:
-                    # Chercher la date la plus récente dans l'historique
-                    if data.get("historique"):
-                        derniere = data["historique"][-1]
-                        data["derniere_partie"] = derniere.get("date", "Inconnue")
-                        data["timestamp"] = derniere.get("timestamp", 0)
-                    else:
-                        data["derniere_partie"] = "Inconnue"
-                        data["timestamp"] = 0
-                
-                # S'assurer que tous les historiques ont un timestamp
-                if "historique" in data:
-                    for entree in data["historique"]:
-                        if "timestamp" not in entree:
-                            try:
-                                date_obj = datetime.strptime(entree["date"], "%Y-%m-%d %H:%M:%S")
-                                entree["timestamp"] = date_obj.timestamp()
-                            except:
-                                entree["timestamp"] = 0
-            
-            return scores
+                donnees = json.load(f)
         except (json.JSONDecodeError, IOError):
             return {}
+        
+        # Dernière partie du journal déjà incluse dans le fichier
+        self.sequence = donnees.get("sequence", 0) if isinstance(donnees.get("version"), int) else 0
+        
+        # Fichier au schéma courant : aucune vérification par joueur
+        if donnees.get("version") == VERSION_SCHEMA and "joueurs" in donnees:
+            return donnees["joueurs"]
+        
+        # Ancien fichier : migration en mémoire (sauvegardée au prochain enregistrement)
+        from migrer_scores import migrer_joueur
+        
+        if isinstance(donnees.get("version"), int) and "joueurs" in donnees:
+            version, scores = donnees["version"], donnees["joueurs"]
+        else:
+            version, scores = 1, donnees
+        
+        if not scores:
+            return scores
+        for data in scores.values():
+            migrer_joueur(data, version)
+        
+        # Conseil affiché une seule fois par fichier (recharger() repasse par ici)
+        if self.fichier not in _MIGRATIONS_SIGNALEES:
+            _MIGRATIONS_SIGNALEES.add(self.fichier)
+            print(f"💡 {self.fichier.name} au format v{version}, migration en mémoire "
+                  f"(lancez 'python migrer_scores.py' pour la rendre définitive)")
+        return scores
     
-    def _sauvegarder_scores(self):
-        """Sauvegarde les scores dans le fichier JSON"""
+    def _construire_distributions(self):
+        """Construit les distributions globales en une passe sur les joueurs"""
+        comptes_parties = {}
+        comptes_records = {}
+        for data in self.scores.values():
+            if data["parties_jouees"] == 0:
+                continue
+            indice = indice_seau(data["meilleur_score"])
+            comptes_records[indice] = comptes_records.get(indice, 0) + 1
+            for seau, nb in data["agregats"]["histogramme"].items():
+                comptes_parties[int(seau)] = comptes_parties.get(int(seau), 0) + nb
+        
+        self.distribution_parties = DistributionScores.depuis_comptes(comptes_parties)
+        self.distribution_records = DistributionScores.depuis_comptes(comptes_records)
+    
+    def _sauvegarder_scores(self) -> bool:
+        """Sauvegarde les scores dans le fichier JSON (remplacement atomique)"""
         try:
-            with open(self.fichier, 'w', encoding='utf-8') as f:
-                json.dump(self.scores, f, indent=2, ensure_ascii=False)
+            # JSON compact : seul l'encodeur C de json est assez rapide pour de gros fichiers.
+            # Un lecteur concurrent (serveur_web) ne voit jamais de fichier à moitié écrit.
+            with self.verrou, self.verrou_fichier:
+                # Un autre processus a pu écrire depuis : ne pas l'écraser avec des scores périmés
+                self.recharger_si_modifie()
+                document = json.dumps(
+                    {"version": VERSION_SCHEMA, "sequence": self.sequence, "joueurs": self.scores},
+                    ensure_ascii=False, separators=(',', ':'), default=encoder_json
+                )
+                _ecrire_atomique(str(self.fichier), [document])
+                self.signature_fichier = self._lire_signature()
+                
+                # Toutes les parties du journal, de tous les processus, viennent d'être
+                # relues et sont maintenant dans scores.json (aucun ajout possible sous le verrou)
+                if self.position_journal or self._taille_journal():
+                    open(self.fichier_journal, 'w').close()
+                self.entrees_journal = 0
+                self.position_journal = 0
+            return True
         except IOError as e:
             print(f"Erreur lors de la sauvegarde des scores: {e}")
+            return False
+    
+    def sauvegarder(self) -> bool:
+        """
+        Réécrit scores.json et vide le journal des parties (voir enregistrer_lot)
+        """
+        return self._sauvegarder_scores()
+    
+    def remplacer_scores(self, scores: dict):
+        """Remplace tous les joueurs (import, répartition en partitions) et sauvegarde"""
+        with self.verrou, self.verrou_fichier:
+            # Relire d'abord : les parties des autres processus sont remplacées elles aussi
+            self.recharger_si_modifie()
+            self.scores = scores
+            self._construire_distributions()
+            self.index = IndexClassement(self.scores)
+            self.version_donnees += 1
+            self._sauvegarder_scores()
     
     def enregistrer_score(self, joueur: str, score: int) -> bool:
         """
@@ -88,52 +288,157 @@ class ScoreManager:
             bool : True si c'est un nouveau record personnel, False sinon
         
         Note:
-            L'historique conserve les 10 dernières parties
+            L'historique garde les parties selon self.retention (voir historique.py)
         """
-        try:
-            ancien_record = self.obtenir_meilleur_score(joueur)
-            nouveau_record = score > ancien_record
+        with self.verrou:
+            try:
+                with self.verrou_fichier:
+                    self.recharger_si_modifie()
+                    nouveau_record = self._appliquer_partie(joueur, score, datetime.now().timestamp())
+                    self._sauvegarder_scores()
+                if self.verbeux:
+                    print(f"✅ Score enregistré: {joueur} - {score} pts")
+                self._notifier_partie(joueur, score, nouveau_record)
+                return nouveau_record
+            except Exception as e:
+                print(f"❌ Erreur lors de l'enregistrement du score: {e}")
+                return False
+    
+    def enregistrer_lot(self, parties: List[Tuple[str, int]]) -> List[bool]:
+        """
+        Enregistre plusieurs parties avec une seule écriture disque (group commit)
+        
+        Les parties sont ajoutées au journal (scores.json.journal) avec un seul
+        fsync ; scores.json n'est réécrit que lorsque le journal dépasse
+        ENTREES_JOURNAL_MAX entrées ou quand sauvegarder() est appelé.
+        
+        Le journal est partagé entre processus : les parties sont numérotées
+        à la suite de celles des autres processus, relues juste avant sous
+        le verrou de fichier.
+        
+        Args:
+            parties (List[Tuple[str, int]]) : Couples (joueur, score)
+        
+        Returns:
+            List[bool] : Nouveau record personnel ou non, pour chaque partie
+        
+        Raises:
+            IOError : Si le journal n'a pas pu être écrit (aucune partie enregistrée)
+        """
+        with self.verrou, self.verrou_fichier:
+            self.recharger_si_modifie()
+            if self._taille_journal() > self.position_journal:
+                # Fin de ligne d'un processus arrêté pendant l'écriture (jamais confirmée) :
+                # la retirer pour que les parties suivantes restent lisibles
+                os.truncate(self.fichier_journal, self.position_journal)
             
-            date_actuelle = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             timestamp = datetime.now().timestamp()
+            lignes = [
+                json.dumps([self.sequence + n, joueur, score, timestamp], ensure_ascii=False)
+                for n, (joueur, score) in enumerate(parties, 1)
+            ]
+            with open(self.fichier_journal, 'ab') as f:
+                f.write(("\n".join(lignes) + "\n").encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+                self.position_journal = f.tell()
+            self.sequence += len(parties)
+            self.entrees_journal += len(parties)
             
-            # Initialiser le joueur s'il n'existe pas
-            if joueur not in self.scores:
-                self.scores[joueur] = {
-                    "meilleur_score": 0,
-                    "parties_jouees": 0,
-                    "score_total": 0,
-                    "derniere_partie": date_actuelle,
-                    "timestamp": timestamp,
-                    "historique": []
-                }
-            
-            # Mettre à jour les statistiques
-            self.scores[joueur]["parties_jouees"] += 1
-            self.scores[joueur]["score_total"] += score
-            self.scores[joueur]["derniere_partie"] = date_actuelle
-            self.scores[joueur]["timestamp"] = timestamp
-            
-            if score > self.scores[joueur]["meilleur_score"]:
-                self.scores[joueur]["meilleur_score"] = score
-            
-            # Ajouter à l'historique
-            self.scores[joueur]["historique"].append({
-                "score": score,
-                "date": date_actuelle,
-                "timestamp": timestamp
-            })
-            
-            # Garder seulement les 10 dernières parties dans l'historique
-            if len(self.scores[joueur]["historique"]) > 10:
-                self.scores[joueur]["historique"] = self.scores[joueur]["historique"][-10:]
-            
-            self._sauvegarder_scores()
-            print(f"✅ Score enregistré: {joueur} - {score} pts")
-            return nouveau_record
-        except Exception as e:
-            print(f"❌ Erreur lors de l'enregistrement du score: {e}")
-            return False
+            resultats = [self._appliquer_partie(joueur, score, timestamp) for joueur, score in parties]
+            if self.entrees_journal >= ENTREES_JOURNAL_MAX:
+                self._sauvegarder_scores()
+            for (joueur, score), nouveau_record in zip(parties, resultats):
+                self._notifier_partie(joueur, score, nouveau_record)
+            return resultats
+    
+    def _rejouer_journal(self, position: int = 0) -> int:
+        """
+        Applique les parties du journal plus récentes que scores.json
+        
+        Args:
+            position (int) : Octet où reprendre la lecture (0 : tout le journal)
+        
+        Returns:
+            int : Nombre de parties appliquées
+        """
+        if position == 0:
+            self.entrees_journal = 0
+        self.position_journal = position
+        try:
+            f = open(self.fichier_journal, 'rb')
+        except FileNotFoundError:
+            return 0
+        
+        appliquees = 0
+        with f:
+            f.seek(position)
+            for ligne in f:
+                if not ligne.endswith(b"\n"):
+                    break  # Ligne en cours d'écriture par un autre processus
+                try:
+                    sequence, joueur, score, timestamp = json.loads(ligne)
+                except (ValueError, TypeError):
+                    break  # Ligne incomplète (arrêt pendant l'écriture)
+                self.entrees_journal += 1
+                self.position_journal += len(ligne)
+                if sequence > self.sequence:
+                    self._appliquer_partie(joueur, score, timestamp)
+                    self.sequence = sequence
+                    appliquees += 1
+        return appliquees
+    
+    def _notifier_partie(self, joueur: str, score: int, nouveau_record: bool):
+        """Prévient les abonnés d'une partie enregistrée"""
+        self._notifier({
+            "joueur": joueur,
+            "score": score,
+            "nouveau_record": nouveau_record,
+            "version": self.version_donnees,
+        })
+    
+    def _appliquer_partie(self, joueur: str, score: int, timestamp: float) -> bool:
+        """Met à jour les données en mémoire (verrou tenu), retourne True si nouveau record"""
+        ancien_record = self.obtenir_meilleur_score(joueur)
+        nouveau_record = score > ancien_record
+        
+        date_actuelle = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Initialiser le joueur s'il n'existe pas
+        if joueur not in self.scores:
+            self.scores[joueur] = {
+                "meilleur_score": 0,
+                "parties_jouees": 0,
+                "score_total": 0,
+                "derniere_partie": date_actuelle,
+                "timestamp": timestamp,
+                "historique": nouvel_historique(),
+                "agregats": nouveaux_agregats()
+            }
+        
+        # Mettre à jour les distributions globales
+        if self.scores[joueur]["parties_jouees"] > 0:
+            self.distribution_records.retirer(ancien_record)
+        self.distribution_records.ajouter(max(score, ancien_record))
+        self.distribution_parties.ajouter(score)
+        
+        # Mettre à jour les statistiques
+        self.scores[joueur]["parties_jouees"] += 1
+        self.scores[joueur]["score_total"] += score
+        self.scores[joueur]["derniere_partie"] = date_actuelle
+        self.scores[joueur]["timestamp"] = timestamp
+        
+        if score > self.scores[joueur]["meilleur_score"]:
+            self.scores[joueur]["meilleur_score"] = score
+        
+        ajouter_partie(self.scores[joueur]["agregats"], score, timestamp)
+        
+        # Ajouter à l'historique compact (les plus anciennes parties selon la rétention)
+        ajouter_au_historique(self.scores[joueur]["historique"], score, timestamp, self.retention)
+        
+        self.index.mettre_a_jour(joueur, self.scores[joueur])
+        self.version_donnees += 1
+        return nouveau_record
     
     def obtenir_meilleur_score(self, joueur: str) -> int:
         """Retourne le meilleur score d'un joueur"""
@@ -141,67 +446,212 @@ class ScoreManager:
             return self.scores[joueur]["meilleur_score"]
         return 0
     
-    def obtenir_classement(self, limite: int = 10, tri: str = "score", ordre: str = "desc") -> List[Tuple]:
+    def obtenir_percentile(self, score: int) -> float:
+        """Retourne le pourcentage des parties enregistrées battues par `score`"""
+        with self.verrou:
+            return round(self.distribution_parties.percentile(score), 1)
+    
+    def nombre_joueurs_devant(self, score: int) -> int:
+        """Retourne le nombre de joueurs dont le record dépasse `score`"""
+        with self.verrou:
+            return self.distribution_records.nb_superieurs(score)
+    
+    def obtenir_rang(self, score: int) -> Tuple[int, int]:
+        """
+        Retourne la position qu'occuperait `score` au classement des records
+        
+        Returns:
+            Tuple[int, int] : (rang, nombre_de_joueurs_classés)
+        """
+        with self.verrou:
+            return self.nombre_joueurs_devant(score) + 1, self.distribution_records.total
+    
+    def obtenir_classement(self, limite: int = 10, tri: str = "score", ordre: str = "desc",
+                           offset: int = 0) -> List[Tuple]:
         """
         Retourne le classement des meilleurs joueurs
         
+        Les joueurs sont lus dans l'index trié : seules les lignes demandées
+        sont construites (les égalités sont départagées par pseudo).
+        
         Args:
             limite (int) : Nombre maximum de joueurs à retourner (défaut: 10)
             tri (str) : Mode de tri ('score', 'date', 'pseudo') (défaut: 'score')
             ordre (str) : Ordre de tri ('asc' ou 'desc') (défaut: 'desc')
+            offset (int) : Nombre de joueurs à sauter (défaut: 0)
         
         Returns:
             List[Tuple] : Liste de tuples (nom_joueur, meilleur_score, date, timestamp)
                          triée selon le mode choisi
         """
-        classement = [
-            (joueur, 
-             data["meilleur_score"],
-             data.get("derniere_partie", "Inconnue"),
-             data.get("timestamp", 0))
-            for joueur, data in self.scores.items()
-        ]
-        
-        # Déterminer si reverse (True = décroissant, False = croissant)
-        reverse = (ordre == "desc")
-        
-        # Trier selon le mode choisi
-        if tri == "score":
-            # Trier par score
-            classement.sort(key=lambda x: x[1], reverse=reverse)
-        elif tri == "date":
-            # Trier par date (timestamp)
-            classement.sort(key=lambda x: x[3], reverse=reverse)
-        elif tri == "pseudo":
-            # Trier par ordre alphabétique
-            classement.sort(key=lambda x: x[0].lower(), reverse=reverse)
-        else:
-            # Par défaut: tri par score décroissant
-            classement.sort(key=lambda x: x[1], reverse=reverse)
+        with self.verrou:
+            return [
+                self._ligne_classement(joueur)
+                for joueur in islice(self.index.parcourir(tri, ordre, offset=offset), limite)
+            ]
+    
+    def obtenir_page(self, limite: int = 10, tri: str = "score", ordre: str = "desc",
+                     curseur: Optional[str] = None, offset: int = 0) -> Tuple[List[Tuple], Optional[str]]:
+        """
+        Retourne une page du classement et le curseur de la page suivante
         
-        return classement[:limite]
+        Avec un curseur, la page reprend juste après la dernière ligne de la
+        page précédente (pagination par clé) : elle coûte O(log n + limite)
+        quelle que soit sa profondeur, et un joueur qui change de place entre
+        deux pages ne décale pas les lignes suivantes.
+        
+        Args:
+            limite (int) : Nombre maximum de joueurs de la page (défaut: 10)
+            tri (str) : Mode de tri ('score', 'date', 'pseudo') (défaut: 'score')
+            ordre (str) : Ordre de tri ('asc' ou 'desc') (défaut: 'desc')
+            curseur (str) : Curseur retourné avec la page précédente (défaut: première page)
+            offset (int) : Sans curseur, nombre de joueurs à sauter (défaut: 0)
+        
+        Returns:
+            Tuple[List[Tuple], Optional[str]] : (lignes comme obtenir_classement,
+                                                 curseur suivant ou None si dernière page)
+        
+        Raises:
+            ValueError : Si le curseur est invalide ou a été créé pour un autre tri/ordre
+        """
+        if tri not in TRIS:
+            tri = "score"
+        apres = None
+        if curseur is not None:
+            tri_curseur, ordre_curseur, apres = decoder_curseur(curseur)
+            if (tri_curseur, ordre_curseur) != (tri, ordre):
+                raise ValueError("le curseur a été créé pour un autre tri")
+        
+        with self.verrou:
+            cles = list(islice(self.index.parcourir_cles(tri, ordre, offset=offset, apres=apres), limite + 1))
+            lignes = [self._ligne_classement(cle[-1]) for cle in cles[:limite]]
+        
+        suivant = None
+        if 0 < limite < len(cles):
+            suivant = encoder_curseur(tri, ordre, cles[limite - 1])
+        return lignes, suivant
+    
+    def obtenir_position(self, joueur: str, tri: str = "score", ordre: str = "desc") -> Optional[int]:
+        """Retourne le rang (à partir de 1) d'un joueur au classement, None s'il est inconnu"""
+        if tri not in TRIS:
+            tri = "score"
+        with self.verrou:
+            cle = self.index.cle(tri, joueur)
+            return self.index.rang(tri, ordre, cle) if cle is not None else None
+    
+    def obtenir_voisinage(self, joueur: str, rayon: int = 5, tri: str = "score",
+                          ordre: str = "desc") -> List[Tuple[int, Tuple]]:
+        """
+        Retourne un joueur entouré de ses voisins au classement, en O(log n + rayon)
+        
+        Args:
+            joueur (str) : Nom du joueur
+            rayon (int) : Nombre maximum de voisins de chaque côté (défaut: 5)
+            tri (str) : Mode de tri ('score', 'date', 'pseudo') (défaut: 'score')
+            ordre (str) : Ordre de tri ('asc' ou 'desc') (défaut: 'desc')
+        
+        Returns:
+            List[Tuple[int, Tuple]] : Couples (rang, ligne comme obtenir_classement),
+                                      liste vide si le joueur est inconnu
+        """
+        if tri not in TRIS:
+            tri = "score"
+        ordre_inverse = "asc" if ordre == "desc" else "desc"
+        
+        with self.verrou:
+            cle = self.index.cle(tri, joueur)
+            if cle is None:
+                return []
+            rang = self.index.rang(tri, ordre, cle)
+            avant = list(islice(self.index.parcourir_cles(tri, ordre_inverse, apres=cle), rayon))
+            apres = list(islice(self.index.parcourir_cles(tri, ordre, apres=cle), rayon))
+            
+            cles = avant[::-1] + [cle] + apres
+            premier = rang - len(avant)
+            return [(premier + n, self._ligne_classement(c[-1])) for n, c in enumerate(cles)]
+    
+    def rechercher_joueurs(self, nom: str) -> List[str]:
+        """Retourne les joueurs nommés `nom` sans tenir compte de la casse"""
+        with self.verrou:
+            return self.index.rechercher(nom)
+    
+    def completer_pseudo(self, prefixe: str, limite: int = 10) -> List[str]:
+        """Retourne les joueurs dont le pseudo commence par `prefixe` (sans casse), en O(log n + limite)"""
+        with self.verrou:
+            return self.index.completer(prefixe, limite)
+    
+    def suggerer_pseudos(self, nom: str, limite: int = 5) -> List[str]:
+        """
+        Retourne les joueurs existants que `nom` désignait peut-être
+        
+        Les pseudos identiques à la casse près viennent d'abord, puis ceux
+        à une faute de frappe près ; à égalité, les joueurs ayant le plus
+        de parties passent devant. Liste vide si `nom` est un joueur connu.
+        
+        Args:
+            nom (str) : Pseudo saisi
+            limite (int) : Nombre maximum de suggestions (défaut: 5)
+        """
+        with self.verrou:
+            if nom in self.scores:
+                return []
+            suggestions = []
+            for groupe in (self.index.rechercher(nom), self.index.proches(nom)):
+                groupe.sort(key=lambda joueur: -self.scores[joueur]["parties_jouees"])
+                suggestions.extend(groupe)
+            return suggestions[:limite]
+    
+    def obtenir_historique(self, joueur: str) -> List[dict]:
+        """
+        Retourne les parties détaillées d'un joueur, de la plus ancienne à la plus récente
+        
+        Returns:
+            List[dict] : Parties {score, date, timestamp} (les parties plus
+                         anciennes sont résumées dans data["historique"]["jours"])
+        """
+        with self.verrou:
+            if joueur not in self.scores:
+                return []
+            return parties_en_dictionnaires(self.scores[joueur]["historique"])
+    
+    def _ligne_classement(self, joueur: str) -> Tuple:
+        """Ligne (nom_joueur, meilleur_score, date, timestamp) d'un joueur"""
+        data = self.scores[joueur]
+        return (joueur,
+                data["meilleur_score"],
+                data.get("derniere_partie", "Inconnue"),
+                data.get("timestamp", 0))
     
     def obtenir_statistiques(self, joueur: str) -> dict:
-        """Retourne les statistiques d'un joueur"""
-        if joueur not in self.scores:
+        """
+        Retourne les statistiques d'un joueur
+        
+        En plus des totaux, le dictionnaire contient les statistiques
+        calculées à partir des agrégats (voir statistiques.resumer_agregats) :
+        min/max, écart-type, séries, moyennes sur 7 et 30 jours, percentiles.
+        """
+        with self.verrou:
+            if joueur not in self.scores:
+                return {
+                    "meilleur_score": 0,
+                    "parties_jouees": 0,
+                    "score_moyen": 0,
+                    "score_total": 0,
+                    **resumer_agregats(nouveaux_agregats())
+                }
+            
+            data = self.scores[joueur]
+            score_moyen = 0
+            if data["parties_jouees"] > 0:
+                score_moyen = data["score_total"] / data["parties_jouees"]
+            
             return {
-                "meilleur_score": 0,
-                "parties_jouees": 0,
-                "score_moyen": 0,
-                "score_total": 0
+                "meilleur_score": data["meilleur_score"],
+                "parties_jouees": data["parties_jouees"],
+                "score_moyen": round(score_moyen, 1),
+                "score_total": data["score_total"],
+                **resumer_agregats(data["agregats"])
             }
-        
-        data = self.scores[joueur]
-        score_moyen = 0
-        if data["parties_jouees"] > 0:
-            score_moyen = data["score_total"] / data["parties_jouees"]
-        
-        return {
-            "meilleur_score": data["meilleur_score"],
-            "parties_jouees": data["parties_jouees"],
-            "score_moyen": round(score_moyen, 1),
-            "score_total": data["score_total"]
-        }
     
     def afficher_classement(self, tri: str = "score", ordre: str = "desc"):
         """Affiche le classement dans la console"""
@@ -237,588 +687,126 @@ class ScoreManager:
         
         print("="*70 + "\n")
     
-    def exporter_html(self, fichier_sortie: str = "index.html"):
-        """Exporte le classement en HTML pour affichage web avec tri interactif"""
-        # Utiliser un chemin absolu basé sur l'emplacement du script
-        if not Path(fichier_sortie).is_absolute():
-            script_dir = Path(__file__).parent
-            fichier_sortie = str(script_dir / fichier_sortie)
-        
-        try:
-            # Récupérer tous les classements (avec les deux ordres)
-            classement_score_desc = self.obtenir_classement(20, tri="score", ordre="desc")
-            classement_score_asc = self.obtenir_classement(20, tri="score", ordre="asc")
-            classement_date_desc = self.obtenir_classement(20, tri="date", ordre="desc")
-            classement_date_asc = self.obtenir_classement(20, tri="date", ordre="asc")
-            classement_pseudo_desc = self.obtenir_classement(20, tri="pseudo", ordre="desc")
-            classement_pseudo_asc = self.obtenir_classement(20, tri="pseudo", ordre="asc")
-        except Exception as e:
-            print(f"❌ Erreur lors de la récupération du classement: {e}")
-            classement_score_desc = []
-            classement_score_asc = []
-            classement_date_desc = []
-            classement_date_asc = []
-            classement_pseudo_desc = []
-            classement_pseudo_asc = []
-        
-        html = """<!DOCTYPE html>
-<html lang="fr">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Shooter Spatial - Leaderboard 🚀</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: 'Courier New', monospace;
-            background: #0a0a1e;
-            color: #fff;
-            min-height: 100vh;
-            overflow-x: hidden;
-            position: relative;
-        }
-        
-        /* Animation d'étoiles en arrière-plan */
-        .stars {
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            pointer-events: none;
-            z-index: 0;
-        }
-        
-        .star {
-            position: absolute;
-            width: 2px;
-            height: 2px;
-            background: white;
-            border-radius: 50%;
-            animation: twinkle 3s infinite;
-        }
-        
-        @keyframes twinkle {
-            0%, 100% { opacity: 0.3; }
-            50% { opacity: 1; }
-        }
-        
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 20px;
-            position: relative;
-            z-index: 1;
-        }
-        
-        /* Header du projet */
-        .header {
-            text-align: center;
-            padding: 40px 20px;
-            background: linear-gradient(135deg, rgba(26, 26, 46, 0.95) 0%, rgba(22, 33, 62, 0.95) 100%);
-            border-radius: 20px;
-            margin-bottom: 30px;
-            box-shadow: 0 10px 50px rgba(0, 255, 136, 0.2);
-            border: 2px solid rgba(0, 255, 136, 0.3);
-        }
-        
-        h1 {
-            font-size: 3.5em;
-            text-shadow: 0 0 30px #00ff88, 0 0 60px #00ff88;
-            color: #00ff88;
-            animation: glow 2s ease-in-out infinite alternate;
-            margin-bottom: 10px;
-        }
-        
-        @keyframes glow {
-            from { text-shadow: 0 0 20px #00ff88, 0 0 40px #00ff88; }
-            to { text-shadow: 0 0 30px #00ff88, 0 0 70px #00ff88; }
-        }
-        
-        .subtitle {
-            font-size: 1.2em;
-            color: #888;
-            margin-bottom: 20px;
-        }
-        
-        .badges {
-            display: flex;
-            justify-content: center;
-            gap: 10px;
-            flex-wrap: wrap;
-            margin-top: 15px;
-        }
-        
-        .badge {
-            background: rgba(0, 255, 136, 0.2);
-            color: #00ff88;
-            padding: 8px 15px;
-            border-radius: 20px;
-            font-size: 0.9em;
-            border: 1px solid #00ff88;
-        }
-        
-        /* Section info du jeu */
-        .game-info {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        
-        .info-card {
-            background: rgba(0, 0, 0, 0.5);
-            padding: 20px;
-            border-radius: 15px;
-            border: 2px solid rgba(0, 255, 136, 0.2);
-            transition: all 0.3s;
-        }
-        
-        .info-card:hover {
-            border-color: #00ff88;
-            transform: translateY(-5px);
-            box-shadow: 0 10px 30px rgba(0, 255, 136, 0.3);
-        }
-        
-        .info-card h3 {
-            color: #00ff88;
-            margin-bottom: 10px;
-            font-size: 1.3em;
-        }
-        
-        .info-card p {
-            color: #ccc;
-            line-height: 1.6;
-            font-size: 0.95em;
-        }
-        
-        .info-card ul {
-            list-style: none;
-            padding-left: 0;
-            color: #ccc;
-        }
-        
-        .info-card ul li {
-            padding: 5px 0;
-            padding-left: 20px;
-            position: relative;
-        }
-        
-        .info-card ul li::before {
-            content: "▸";
-            position: absolute;
-            left: 0;
-            color: #00ff88;
-        }
-        
-        /* Section leaderboard */
-        .leaderboard-section {
-            background: rgba(0, 0, 0, 0.5);
-            border-radius: 20px;
-            padding: 30px;
-            border: 2px solid rgba(0, 255, 136, 0.3);
-        }
-        
-        .section-title {
-            text-align: center;
-            font-size: 2em;
-            color: #ffd700;
-            margin-bottom: 25px;
-            text-shadow: 0 0 20px #ffd700;
-        }
-        
-        .sort-buttons {
-            display: flex;
-            justify-content: center;
-            gap: 15px;
-            margin-bottom: 30px;
-            flex-wrap: wrap;
-        }
-        
-        .sort-group {
-            display: flex;
-            align-items: center;
-            gap: 5px;
-            background: rgba(0, 0, 0, 0.3);
-            padding: 5px;
-            border-radius: 10px;
-        }
-        
-        .sort-btn {
-            padding: 10px 20px;
-            background: rgba(0, 255, 136, 0.2);
-            color: #00ff88;
-            border: 2px solid #00ff88;
-            border-radius: 8px;
-            font-size: 0.95em;
-            font-weight: bold;
-            cursor: pointer;
-            transition: all 0.3s;
-            font-family: 'Courier New', monospace;
-        }
-        
-        .sort-btn:hover {
-            background: rgba(0, 255, 136, 0.4);
-            transform: translateY(-2px);
-        }
-        
-        .sort-btn.active {
-            background: #00ff88;
-            color: #1a1a2e;
-        }
-        
-        .order-icon {
-            font-size: 0.8em;
-            opacity: 0.7;
-        }
-        
-        .leaderboard {
-            background: rgba(0, 0, 0, 0.3);
-            border-radius: 15px;
-            padding: 20px;
-        }
-        
-        .score-entry {
-            display: grid;
-            grid-template-columns: 60px 1fr auto auto;
-            gap: 15px;
-            padding: 15px 20px;
-            margin: 8px 0;
-            background: rgba(255, 255, 255, 0.05);
-            border-radius: 10px;
-            transition: all 0.3s;
-            border-left: 4px solid transparent;
-            align-items: center;
-        }
-        
-        .score-entry:hover {
-            background: rgba(255, 255, 255, 0.1);
-            transform: translateX(10px);
-        }
-        
-        .score-entry.top1 {
-            border-left-color: #ffd700;
-            background: rgba(255, 215, 0, 0.15);
-        }
-        
-        .score-entry.top2 {
-            border-left-color: #c0c0c0;
-            background: rgba(192, 192, 192, 0.15);
-        }
-        
-        .score-entry.top3 {
-            border-left-color: #cd7f32;
-            background: rgba(205, 127, 50, 0.15);
-        }
-        
-        .rank {
-            font-size: 1.5em;
-            font-weight: bold;
-            text-align: center;
-        }
-        
-        .top1 .rank { color: #ffd700; }
-        .top2 .rank { color: #c0c0c0; }
-        .top3 .rank { color: #cd7f32; }
-        
-        .player {
-            font-size: 1.2em;
-            font-weight: bold;
-        }
-        
-        .score {
-            font-size: 1.3em;
-            font-weight: bold;
-            color: #00ff88;
-            text-align: right;
-            min-width: 120px;
-        }
+    def obtenir_document_leaderboard(self, limite: int) -> Tuple[str, str]:
+        """
+        Construit le document JSON du leaderboard (mis en cache par version des données)
         
-        .date {
-            font-size: 0.85em;
-            color: #888;
-            min-width: 150px;
-            text-align: right;
-        }
+        Le document contient une seule liste de lignes [pseudo, score, date, timestamp] :
+        l'union des `limite` premiers de chacune des 6 vues (3 tris × 2 ordres).
+        La page web trie et pagine cette liste côté client. Une ligne a un
+        5e champ, la clé de tri du pseudo (voir index_classement.normaliser_nom),
+        quand elle diffère de sa mise en minuscules (ß → ss...).
         
-        .no-scores {
-            text-align: center;
-            padding: 60px 20px;
-            font-size: 1.3em;
-            color: #888;
-        }
+        Returns:
+            Tuple[str, str] : (empreinte des données, document JSON)
+        """
+        with self.verrou:
+            cle = (self.version_donnees, limite)
+            if self._cle_document == cle:
+                return self._document_cache
+            
+            lignes = {}
+            try:
+                for tri, ordre in VUES_CLASSEMENT:
+                    for ligne in self.obtenir_classement(limite, tri=tri, ordre=ordre):
+                        lignes[ligne[0]] = list(ligne)
+                for ligne in lignes.values():
+                    cle_pseudo = normaliser_nom(ligne[0])
+                    if cle_pseudo != ligne[0].lower():
+                        ligne.append(cle_pseudo)
+            except Exception as e:
+                print(f"❌ Erreur lors de la récupération du classement: {e}")
+                lignes = {}
+            
+            joueurs = json.dumps(list(lignes.values()), ensure_ascii=False, separators=(',', ':'))
+            empreinte = hashlib.sha1(f"{limite}:{joueurs}".encode("utf-8")).hexdigest()[:16]
+            
+            try:
+                now = datetime.now().strftime("%d/%m/%Y à %H:%M:%S")
+            except ValueError:
+                now = "Inconnu"
+            
+            document = (
+                f'{{"empreinte":"{empreinte}","genere":{json.dumps(now, ensure_ascii=False)},'
+                f'"limite":{limite},"champs":["pseudo","score","date","timestamp","cle_pseudo"],'
+                f'"joueurs":{joueurs}}}'
+            )
+            self._document_cache = (empreinte, document)
+            self._cle_document = cle
+            return self._document_cache
+    
+    def _doit_exporter(self, fichier: str, empreinte: str, motif: str) -> bool:
+        """Indique si `fichier` doit être réécrit (données changées depuis son export)"""
+        if self._derniers_exports.get(fichier) == empreinte and Path(fichier).exists():
+            return False
+        if _lire_empreinte(fichier, motif) == empreinte:
+            self._derniers_exports[fichier] = empreinte
+            return False
+        return True
+    
+    def exporter_json(self, fichier_sortie: str = "leaderboard.json", limite: int = LIMITE_LEADERBOARD) -> bool:
+        """
+        Exporte le classement en JSON compact (servi par serveur_web.py)
         
-        .footer {
-            text-align: center;
-            margin-top: 50px;
-            padding: 30px;
-            background: rgba(0, 0, 0, 0.5);
-            border-radius: 15px;
-            border: 2px solid rgba(0, 255, 136, 0.2);
-        }
+        Le fichier n'est pas réécrit si les données n'ont pas changé.
+        """
+        if not Path(fichier_sortie).is_absolute():
+            fichier_sortie = str(Path(__file__).parent / fichier_sortie)
         
-        .footer h3 {
-            color: #00ff88;
-            margin-bottom: 15px;
-        }
+        empreinte, document = self.obtenir_document_leaderboard(limite)
+        if not self._doit_exporter(fichier_sortie, empreinte, MOTIF_EMPREINTE_JSON):
+            return True
         
-        .footer p {
-            color: #888;
-            margin: 8px 0;
-        }
+        try:
+            _ecrire_atomique(fichier_sortie, [document])
+            self._derniers_exports[fichier_sortie] = empreinte
+            return True
+        except IOError as e:
+            print(f"❌ Erreur lors de l'export JSON: {e}")
+            return False
+    
+    def exporter_html(self, fichier_sortie: str = "index.html", limite: int = LIMITE_LEADERBOARD):
+        """
+        Exporte le classement en HTML pour affichage web avec tri interactif
         
-        .update-time {
-            text-align: center;
-            margin-top: 20px;
-            color: #666;
-            font-size: 0.9em;
-        }
+        La page embarque les données au format JSON (voir exporter_json, qui est
+        aussi appelé pour écrire leaderboard.json à côté de la page) ; le tri et
+        la pagination sont faits par le navigateur. Les fichiers ne sont pas
+        réécrits si ni les scores ni le gabarit n'ont changé depuis le dernier export.
+        """
+        # Utiliser un chemin absolu basé sur l'emplacement du script
+        if not Path(fichier_sortie).is_absolute():
+            script_dir = Path(__file__).parent
+            fichier_sortie = str(script_dir / fichier_sortie)
         
-        .refresh-btn {
-            display: block;
-            margin: 30px auto;
-            padding: 15px 40px;
-            background: linear-gradient(135deg, #00ff88, #00dd77);
-            color: #1a1a2e;
-            border: none;
-            border-radius: 10px;
-            font-size: 1.1em;
-            font-weight: bold;
-            cursor: pointer;
-            transition: all 0.3s;
-            box-shadow: 0 5px 20px rgba(0, 255, 136, 0.4);
-        }
+        self.exporter_json(str(Path(fichier_sortie).with_name("leaderboard.json")), limite)
         
-        .refresh-btn:hover {
-            transform: scale(1.05);
-            box-shadow: 0 8px 30px rgba(0, 255, 136, 0.6);
-        }
+        empreinte, document = self.obtenir_document_leaderboard(limite)
+        try:
+            empreinte_gabarit, gabarit = _compiler_gabarit()
+        except IOError as e:
+            print(f"❌ Erreur lors de la lecture du gabarit HTML: {e}")
+            return False
         
-        .hidden {
-            display: none;
-        }
+        # La page dépend aussi du gabarit : le modifier doit la faire réécrire
+        empreinte_page = empreinte + empreinte_gabarit
+        if not self._doit_exporter(fichier_sortie, empreinte_page, MOTIF_EMPREINTE_HTML):
+            return True
         
-        @media (max-width: 768px) {
-            h1 { font-size: 2em; }
-            .section-title { font-size: 1.5em; }
-            .game-info { grid-template-columns: 1fr; }
-            .score-entry {
-                grid-template-columns: 50px 1fr;
-                gap: 10px;
-            }
-            .score, .date {
-                grid-column: 2;
-                text-align: left;
-            }
+        valeurs = {
+            "empreinte": empreinte_page,
+            "mise_a_jour": json.loads(document)["genere"],
+            # Empêcher un pseudo de fermer la balise <script>
+            "donnees": document.replace("</", "<\\/"),
         }
-    </style>
-</head>
-<body>
-    <div class="stars" id="stars"></div>
-    
-    <div class="container">
-        <!-- Header du projet -->
-        <div class="header">
-            <h1>🚀 SHOOTER SPATIAL 🌌</h1>
-            <p class="subtitle">Un jeu de tir spatial développé en Python</p>
-            <div class="badges">
-                <span class="badge">🐍 Python 3.7+</span>
-                <span class="badge">🎮 POO + Événementiel</span>
-                <span class="badge">🎓 Projet Licence Info</span>
-                <span class="badge">🏆 Leaderboard en temps réel</span>
-            </div>
-        </div>
-        
-        <!-- Section Leaderboard -->
-        <div class="leaderboard-section">
-            <h2 class="section-title">🏆 LEADERBOARD MONDIAL</h2>
-            
-            <div class="sort-buttons">
-                <div class="sort-group">
-                    <button class="sort-btn active" onclick="changeTri('score', 'desc')" id="btn-score-desc">🏆 Score <span class="order-icon">↓</span></button>
-                    <button class="sort-btn" onclick="changeTri('score', 'asc')" id="btn-score-asc">🏆 Score <span class="order-icon">↑</span></button>
-                </div>
-                <div class="sort-group">
-                    <button class="sort-btn" onclick="changeTri('date', 'desc')" id="btn-date-desc">📅 Date <span class="order-icon">↓</span></button>
-                    <button class="sort-btn" onclick="changeTri('date', 'asc')" id="btn-date-asc">📅 Date <span class="order-icon">↑</span></button>
-                </div>
-                <div class="sort-group">
-                    <button class="sort-btn" onclick="changeTri('pseudo', 'desc')" id="btn-pseudo-desc">👤 Pseudo <span class="order-icon">Z→A</span></button>
-                    <button class="sort-btn" onclick="changeTri('pseudo', 'asc')" id="btn-pseudo-asc">👤 Pseudo <span class="order-icon">A→Z</span></button>
-                </div>
-            </div>
-            
-            <div class="leaderboard">
-"""
-        
-        # Fonction pour générer les entrées de score
-        def generer_entrees(classement, tri_actif, ordre):
-            if not classement:
-                return '<div class="no-scores">Aucun score enregistré pour le moment.<br><br>Lancez le jeu et faites votre meilleur score !</div>'
-            
-            entrees = ""
-            for i, (joueur, score, date, _) in enumerate(classement, 1):
-                classe = ""
-                if tri_actif == "score" and ordre == "desc":
-                    if i == 1:
-                        classe = "top1"
-                        medaille = "🥇"
-                    elif i == 2:
-                        classe = "top2"
-                        medaille = "🥈"
-                    elif i == 3:
-                        classe = "top3"
-                        medaille = "🥉"
-                    else:
-                        medaille = f"{i}."
-                else:
-                    medaille = f"{i}."
-                
-                # Échapper les caractères HTML dans le nom du joueur
-                joueur_safe = joueur.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                
-                # Formater la date
-                date_affichage = date if date != "Inconnue" else "-"
-                
-                entrees += f'''
-            <div class="score-entry {classe}">
-                <div class="rank">{medaille}</div>
-                <div class="player">{joueur_safe}</div>
-                <div class="score">{score:,} pts</div>
-                <div class="date">{date_affichage}</div>
-            </div>
-'''
-            return entrees
-        
-        # Générer les 6 vues (3 tris × 2 ordres)
-        html += f'''
-            <div id="classement-score-desc" class="classement-vue">
-                {generer_entrees(classement_score_desc, "score", "desc")}
-            </div>
-            <div id="classement-score-asc" class="classement-vue hidden">
-                {generer_entrees(classement_score_asc, "score", "asc")}
-            </div>
-            <div id="classement-date-desc" class="classement-vue hidden">
-                {generer_entrees(classement_date_desc, "date", "desc")}
-            </div>
-            <div id="classement-date-asc" class="classement-vue hidden">
-                {generer_entrees(classement_date_asc, "date", "asc")}
-            </div>
-            <div id="classement-pseudo-desc" class="classement-vue hidden">
-                {generer_entrees(classement_pseudo_desc, "pseudo", "desc")}
-            </div>
-            <div id="classement-pseudo-asc" class="classement-vue hidden">
-                {generer_entrees(classement_pseudo_asc, "pseudo", "asc")}
-            </div>
-'''
         
         try:
-            now = datetime.now().strftime("%d/%m/%Y à %H:%M:%S")
-        except:
-            now = "Inconnu"
-        
-        html += f"""
-            </div>
-            
-            <button class="refresh-btn" onclick="location.reload()">🔄 Actualiser les scores</button>
-            
-            <div class="update-time">
-                Dernière mise à jour : {now}
-            </div>
-        </div>
-        
-        <!-- Informations sur le jeu -->
-        <div class="game-info" style="margin-top: 30px;">
-            <div class="info-card">
-                <h3>🎯 Objectif</h3>
-                <p>Survie spatiale : détruisez un maximum d'ennemis, collectez des bonus et battez les records !</p>
-            </div>
-            
-            <div class="info-card">
-                <h3>💎 5 Types de Bonus</h3>
-                <ul>
-                    <li>💚 Vie +1 (max 5)</li>
-                    <li>⚡ Vitesse +50%</li>
-                    <li>🔫 Tir Double</li>
-                    <li>🔥 Tir Triple</li>
-                    <li>⚡ Tir Rapide</li>
-                </ul>
-            </div>
-            
-            <div class="info-card">
-                <h3>📈 Gameplay</h3>
-                <ul>
-                    <li>Difficulté progressive</li>
-                    <li>+10 points par ennemi</li>
-                    <li>3 vies de départ</li>
-                    <li>Invincibilité temporaire</li>
-                </ul>
-            </div>
-            
-            <div class="info-card">
-                <h3>🕹️ Commandes</h3>
-                <ul>
-                    <li>← → ↑ ↓ ou ZQSD : Déplacement</li>
-                    <li>Espace : Tirer</li>
-                    <li>P : Pause musique</li>
-                    <li>ESC : Quitter</li>
-                </ul>
-            </div>
-        </div>
-    </div>
-    
-    <script>
-        // Génération des étoiles animées
-        function createStars() {{
-            const starsContainer = document.getElementById('stars');
-            const starCount = 150;
-            
-            for (let i = 0; i < starCount; i++) {{
-                const star = document.createElement('div');
-                star.className = 'star';
-                star.style.left = Math.random() * 100 + '%';
-                star.style.top = Math.random() * 100 + '%';
-                star.style.animationDelay = Math.random() * 3 + 's';
-                star.style.animationDuration = (Math.random() * 2 + 2) + 's';
-                starsContainer.appendChild(star);
-            }}
-        }}
-        
-        createStars();
-        
-        // Gestion du tri
-        function changeTri(type, ordre) {{
-            // Masquer tous les classements
-            document.querySelectorAll('.classement-vue').forEach(el => {{
-                el.classList.add('hidden');
-            }});
-            
-            // Retirer la classe active de tous les boutons
-            document.querySelectorAll('.sort-btn').forEach(btn => {{
-                btn.classList.remove('active');
-            }});
-            
-            // Afficher le classement sélectionné
-            const classementId = 'classement-' + type + '-' + ordre;
-            document.getElementById(classementId).classList.remove('hidden');
-            
-            // Activer le bouton correspondant
-            const btnId = 'btn-' + type + '-' + ordre;
-            document.getElementById(btnId).classList.add('active');
-        }}
-    </script>
-</body>
-</html>
-"""
-        
-        try:
-            with open(fichier_sortie, 'w', encoding='utf-8') as f:
-                f.write(html)
+            _ecrire_atomique(fichier_sortie, (
+                morceau
+                for texte, nom in gabarit
+                for morceau in (texte, valeurs[nom] if nom is not None else "")
+            ))
+            self._derniers_exports[fichier_sortie] = empreinte_page
             print(f"✅ Leaderboard exporté dans {fichier_sortie}")
             return True
         except IOError as e:
@@ -827,3 +815,138 @@ class ScoreManager:
         except Exception as e:
             print(f"❌ Erreur inattendue lors de l'export HTML: {e}")
             return False
+
+
+# ==============================================================================
+# GABARIT HTML DU LEADERBOARD
+# ==============================================================================
+
+FICHIER_GABARIT = Path(__file__).parent / "gabarit_leaderboard.html"
+
+# Les 6 vues du leaderboard (3 tris × 2 ordres)
+VUES_CLASSEMENT = [
+    (tri, ordre) for tri in ("score", "date", "pseudo") for ordre in ("desc", "asc")
+]
+
+MOTIF_EMPREINTE_HTML = r"<!-- empreinte: (\w+) -->"
+MOTIF_EMPREINTE_JSON = r'"empreinte":"(\w+)"'
+
+_gabarit_compile: Optional[Tuple[str, List[Tuple[str, Optional[str]]]]] = None
+_signature_gabarit = None
+
+
+def _compiler_gabarit() -> Tuple[str, List[Tuple[str, Optional[str]]]]:
+    """
+    Découpe le gabarit en morceaux (texte_fixe, variable), relu seulement s'il a changé
+    
+    Les variables sont notées {{nom}} dans gabarit_leaderboard.html.
+    
+    Returns:
+        Tuple[str, list] : (empreinte du contenu du gabarit, morceaux)
+    """
+    global _gabarit_compile, _signature_gabarit
+    statistiques = os.stat(FICHIER_GABARIT)
+    signature = (statistiques.st_mtime_ns, statistiques.st_size)
+    if _gabarit_compile is None or signature != _signature_gabarit:
+        with open(FICHIER_GABARIT, 'r', encoding='utf-8') as f:
+            texte = f.read()
+        morceaux = re.split(r"\{\{\s*([\w-]+)\s*\}\}", texte)
+        # re.split alterne texte fixe et noms de variables
+        textes, noms = morceaux[0::2], morceaux[1::2] + [None]
+        empreinte = hashlib.sha1(texte.encode("utf-8")).hexdigest()[:8]
+        _gabarit_compile = (empreinte, list(zip(textes, noms)))
+        _signature_gabarit = signature
+    return _gabarit_compile
+
+
+def _lire_empreinte(fichier: str, motif: str) -> Optional[str]:
+    """Retourne l'empreinte des données d'un export existant (None si absent)"""
+    try:
+        with open(fichier, 'r', encoding='utf-8') as f:
+            debut = f.read(256)
+    except (IOError, UnicodeDecodeError):
+        return None
+    trouve = re.search(motif, debut)
+    return trouve.group(1) if trouve else None
+
+
+# ==============================================================================
+# VERROU ENTRE PROCESSUS
+# ==============================================================================
+
+class VerrouFichier:
+    """
+    Verrou exclusif entre processus posé sur un fichier (flock, msvcrt sous Windows)
+    
+    Réentrant dans un même processus : seul le premier `with` pose le verrou
+    et seul le dernier le libère. Le fichier est créé au premier usage.
+    """
+    
+    def __init__(self, chemin: Path):
+        self.chemin = chemin
+        self.profondeur = 0
+        self._fd = None
+        self._verrou = threading.RLock()
+    
+    def __enter__(self):
+        self._verrou.acquire()
+        if self.profondeur == 0:
+            try:
+                fd = os.open(self.chemin, os.O_RDWR | os.O_CREAT, 0o644)
+            except BaseException:
+                self._verrou.release()
+                raise
+            try:
+                if sys.platform == 'win32':
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                else:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                os.close(fd)
+                self._verrou.release()
+                raise
+            self._fd = fd
+        self.profondeur += 1
+        return self
+    
+    def __exit__(self, *exc):
+        self.profondeur -= 1
+        if self.profondeur == 0:
+            if sys.platform == 'win32':
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            os.close(self._fd)  # Libère aussi le flock
+            self._fd = None
+        self._verrou.release()
+        return False
+
+
+# Masque de création des fichiers du processus (lu une fois : os.umask le modifie pour le lire)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _ecrire_atomique(fichier: str, morceaux):
+    """
+    Écrit les morceaux en flux dans un fichier temporaire puis le renomme
+    
+    Le fichier garde les droits de celui qu'il remplace (sinon ceux d'un
+    fichier ordinaire selon l'umask), et non le 0600 de mkstemp.
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(fichier).st_mode)
+    except OSError:
+        mode = 0o666 & ~_UMASK
+    descripteur, chemin_temp = tempfile.mkstemp(
+        prefix=f".{Path(fichier).name}.", suffix=".tmp", dir=os.path.dirname(fichier)
+    )
+    try:
+        with os.fdopen(descripteur, 'w', encoding='utf-8') as f:
+            for morceau in morceaux:
+                f.write(morceau)
+        os.chmod(chemin_temp, mode)
+        os.replace(chemin_temp, fichier)
+    except BaseException:
+        if os.path.exists(chemin_temp):
+            os.remove(chemin_temp)
+        raise
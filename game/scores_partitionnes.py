@@ -0,0 +1,346 @@
+"""
+Scores répartis en partitions pour le Shooter Spatial
+
+Pour de très grandes bases de joueurs, ScoreManagerPartitionne répartit
+les joueurs entre N fichiers (scores.0sur4.json, scores.1sur4.json...)
+selon un hachage stable de leur pseudo. Chaque partition est un
+ScoreManager complet, avec son verrou et son journal : deux parties de
+joueurs de partitions différentes s'écrivent en parallèle.
+
+Les classements sont obtenus par fusion (heapq.merge) des têtes de
+l'index trié de chaque partition ; les partitions sont chargées en
+parallèle au démarrage (sur un Python sans GIL). L'API est celle de
+ScoreManager.
+"""
+
+import heapq
+import sys
+import threading
+import zlib
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from score_manager import ScoreManager
+from index_classement import TRIS, encoder_curseur, decoder_curseur, normaliser_nom
+from historique import Retention, RETENTION_PAR_DEFAUT
+
+
+NB_PARTITIONS = 4
+
+# Décodage JSON et construction des index gardent le GIL : charger ou réécrire
+# les partitions dans des threads n'est plus rapide que sans GIL (mesuré sur
+# 200 000 joueurs et 4 partitions : 5,1 s en série, 6,9 s avec 4 threads).
+# Les écritures du journal (fsync) sont, elles, toujours faites en parallèle.
+GIL_ACTIF = getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+class ScoreManagerPartitionne(ScoreManager):
+    """
+    ScoreManager dont les joueurs sont répartis entre plusieurs fichiers
+    
+    Remplace ScoreManager sans changer l'API. Au premier lancement, si
+    aucune partition n'existe encore, les joueurs du fichier unique sont
+    répartis entre les partitions (le fichier d'origine est conservé).
+    
+    Attributs :
+        fichier (Path) : Fichier unique dont dérivent les noms des partitions
+        partitions (List[ScoreManager]) : Une partition par fichier
+        verrou (RLock) : Ne protège que les exports ; chaque partition a son propre verrou
+    """
+    
+    def __init__(self, fichier: str = "scores.json", nb_partitions: int = NB_PARTITIONS,
+                 verbeux: bool = True, retention: Retention = RETENTION_PAR_DEFAUT):
+        """Charge les partitions (en parallèle si le GIL est désactivé)"""
+        if not Path(fichier).is_absolute():
+            self.fichier = Path(__file__).parent / fichier
+        else:
+            self.fichier = Path(fichier)
+        self.verbeux = verbeux
+        self.retention = retention
+        self.verrou = threading.RLock()
+        
+        # Détection des changements pour l'export HTML (voir ScoreManager)
+        self._document_cache = None
+        self._cle_document = None
+        self._derniers_exports = {}
+        self._abonnes = []
+        
+        fichiers = [
+            self.fichier.with_name(f"{self.fichier.stem}.{i}sur{nb_partitions}{self.fichier.suffix}")
+            for i in range(nb_partitions)
+        ]
+        a_repartir = self.fichier.exists() and not any(f.exists() for f in fichiers)
+        
+        self.executeur = ThreadPoolExecutor(max_workers=nb_partitions, thread_name_prefix="partition")
+        self.partitions: List[ScoreManager] = self._pour_chaque(
+            lambda f: ScoreManager(str(f), verbeux=verbeux, retention=retention), fichiers
+        )
+        for partition in self.partitions:
+            partition.abonner(self._relayer)
+        
+        if a_repartir:
+            self._repartir_fichier_unique()
+    
+    def _repartir_fichier_unique(self):
+        """Répartit les joueurs de self.fichier entre les partitions (vides)"""
+        source = ScoreManager(str(self.fichier), verbeux=False, retention=self.retention)
+        self.remplacer_scores(source.scores)
+        print(f"💡 {len(source.scores)} joueurs de {self.fichier.name} "
+              f"répartis en {len(self.partitions)} partitions")
+    
+    def _pour_chaque(self, fonction, elements) -> list:
+        """Applique `fonction` à chaque élément, dans les threads des partitions si le GIL est désactivé"""
+        if GIL_ACTIF:
+            return [fonction(element) for element in elements]
+        return list(self.executeur.map(fonction, elements))
+    
+    def _numero(self, joueur: str) -> int:
+        """Numéro de la partition d'un joueur (hachage stable d'un lancement à l'autre)"""
+        return zlib.crc32(joueur.encode('utf-8')) % len(self.partitions)
+    
+    def _partition(self, joueur: str) -> ScoreManager:
+        """Partition contenant (ou qui contiendra) un joueur"""
+        return self.partitions[self._numero(joueur)]
+    
+    def _relayer(self, evenement: dict):
+        """Transmet aux abonnés une partie enregistrée dans une partition"""
+        self._notifier({**evenement, "version": self.version_donnees})
+    
+    # ==========================================================================
+    # ÉTAT GLOBAL (somme des partitions)
+    # ==========================================================================
+    
+    @property
+    def scores(self) -> ChainMap:
+        """Vue en lecture de tous les joueurs (len() parcourt toutes les partitions)"""
+        return ChainMap(*(partition.scores for partition in self.partitions))
+    
+    @property
+    def version_donnees(self) -> int:
+        """Change à chaque partie enregistrée dans n'importe quelle partition"""
+        return sum(partition.version_donnees for partition in self.partitions)
+    
+    @property
+    def entrees_journal(self) -> int:
+        """Parties journalisées pas encore sauvegardées, toutes partitions confondues"""
+        return sum(partition.entrees_journal for partition in self.partitions)
+    
+    @property
+    def signature_fichier(self) -> tuple:
+        """Signatures (mtime, taille) des fichiers des partitions"""
+        return tuple(partition.signature_fichier for partition in self.partitions)
+    
+    def recharger(self):
+        """Relit toutes les partitions"""
+        for partition in self.partitions:
+            partition.recharger()
+    
+    def recharger_si_modifie(self) -> bool:
+        """Relit les partitions modifiées par un autre processus"""
+        return any([partition.recharger_si_modifie() for partition in self.partitions])
+    
+    def sauvegarder(self) -> bool:
+        """Réécrit toutes les partitions"""
+        return all(self._pour_chaque(ScoreManager.sauvegarder, self.partitions))
+    
+    def remplacer_scores(self, scores: dict):
+        """Remplace tous les joueurs, répartis entre les partitions, et sauvegarde chaque partition"""
+        repartition = [{} for _ in self.partitions]
+        for joueur, data in scores.items():
+            repartition[self._numero(joueur)][joueur] = data
+        self._pour_chaque(
+            lambda args: args[0].remplacer_scores(args[1]), list(zip(self.partitions, repartition))
+        )
+    
+    # ==========================================================================
+    # ENREGISTREMENT
+    # ==========================================================================
+    
+    def enregistrer_score(self, joueur: str, score: int) -> bool:
+        """Enregistre un score (seule la partition du joueur est verrouillée et réécrite)"""
+        return self._partition(joueur).enregistrer_score(joueur, score)
+    
+    def enregistrer_lot(self, parties: List[Tuple[str, int]]) -> List[bool]:
+        """
+        Enregistre plusieurs parties, un lot par partition écrit en parallèle
+        
+        Raises:
+            IOError : Si le journal d'une partition n'a pas pu être écrit
+                      (les lots des autres partitions ont pu l'être)
+        """
+        lots = [[] for _ in self.partitions]
+        for position, (joueur, score) in enumerate(parties):
+            lots[self._numero(joueur)].append((position, joueur, score))
+        
+        def ecrire(numero: int) -> List[bool]:
+            lot = lots[numero]
+            return self.partitions[numero].enregistrer_lot([(j, s) for _, j, s in lot]) if lot else []
+        
+        resultats = [False] * len(parties)
+        for numero, reponses in enumerate(self.executeur.map(ecrire, range(len(self.partitions)))):
+            for (position, _, _), nouveau_record in zip(lots[numero], reponses):
+                resultats[position] = nouveau_record
+        return resultats
+    
+    # ==========================================================================
+    # LECTURE D'UN JOUEUR
+    # ==========================================================================
+    
+    def obtenir_meilleur_score(self, joueur: str) -> int:
+        """Retourne le meilleur score d'un joueur (lu dans sa partition)"""
+        return self._partition(joueur).obtenir_meilleur_score(joueur)
+    
+    def obtenir_statistiques(self, joueur: str) -> dict:
+        """Retourne les statistiques d'un joueur (voir ScoreManager.obtenir_statistiques)"""
+        return self._partition(joueur).obtenir_statistiques(joueur)
+    
+    def obtenir_historique(self, joueur: str) -> List[dict]:
+        """Retourne les parties détaillées d'un joueur (voir ScoreManager.obtenir_historique)"""
+        return self._partition(joueur).obtenir_historique(joueur)
+    
+    def _ligne_classement(self, joueur: str) -> Tuple:
+        """Ligne (nom_joueur, meilleur_score, date, timestamp) d'un joueur"""
+        partition = self._partition(joueur)
+        with partition.verrou:
+            return partition._ligne_classement(joueur)
+    
+    # ==========================================================================
+    # DISTRIBUTIONS
+    # ==========================================================================
+    
+    def obtenir_percentile(self, score: int) -> float:
+        """Retourne le pourcentage des parties (de toutes les partitions) battues par `score`"""
+        inferieurs = total = 0
+        for partition in self.partitions:
+            with partition.verrou:
+                inferieurs += partition.distribution_parties.nb_inferieurs(score)
+                total += partition.distribution_parties.total
+        return round(100.0 * inferieurs / total, 1) if total else 0.0
+    
+    def nombre_joueurs_devant(self, score: int) -> int:
+        """Retourne le nombre de joueurs dont le record dépasse `score`"""
+        return sum(partition.nombre_joueurs_devant(score) for partition in self.partitions)
+    
+    def obtenir_rang(self, score: int) -> Tuple[int, int]:
+        """Retourne (rang, nombre_de_joueurs_classés) qu'occuperait `score`"""
+        devant = total = 0
+        for partition in self.partitions:
+            with partition.verrou:
+                devant += partition.distribution_records.nb_superieurs(score)
+                total += partition.distribution_records.total
+        return devant + 1, total
+    
+    # ==========================================================================
+    # CLASSEMENTS (fusion des partitions)
+    # ==========================================================================
+    
+    def _fusionner(self, tri: str, ordre: str, limite: int, offset: int = 0,
+                   apres: Optional[tuple] = None) -> List[tuple]:
+        """
+        Clés des joueurs de la page demandée, tous partitions confondues
+        
+        Chaque partition fournit ses offset + limite premières clés (lues
+        sous son verrou), puis les têtes sont fusionnées : O(k × (offset + limite)).
+        """
+        if apres is not None:
+            offset = 0
+        tetes = []
+        for partition in self.partitions:
+            with partition.verrou:
+                tetes.append(list(islice(
+                    partition.index.parcourir_cles(tri, ordre, apres=apres), offset + limite
+                )))
+        return list(islice(heapq.merge(*tetes, reverse=(ordre == "desc")), offset, offset + limite))
+    
+    def obtenir_classement(self, limite: int = 10, tri: str = "score", ordre: str = "desc",
+                           offset: int = 0) -> List[Tuple]:
+        """Retourne une page du classement (voir ScoreManager.obtenir_classement)"""
+        if tri not in TRIS:
+            tri = "score"
+        return [self._ligne_classement(cle[-1]) for cle in self._fusionner(tri, ordre, limite, offset)]
+    
+    def obtenir_page(self, limite: int = 10, tri: str = "score", ordre: str = "desc",
+                     curseur: Optional[str] = None, offset: int = 0) -> Tuple[List[Tuple], Optional[str]]:
+        """Retourne une page et le curseur de la suivante (voir ScoreManager.obtenir_page)"""
+        if tri not in TRIS:
+            tri = "score"
+        apres = None
+        if curseur is not None:
+            tri_curseur, ordre_curseur, apres = decoder_curseur(curseur)
+            if (tri_curseur, ordre_curseur) != (tri, ordre):
+                raise ValueError("le curseur a été créé pour un autre tri")
+        
+        cles = self._fusionner(tri, ordre, limite + 1, offset, apres)
+        lignes = [self._ligne_classement(cle[-1]) for cle in cles[:limite]]
+        suivant = None
+        if 0 < limite < len(cles):
+            suivant = encoder_curseur(tri, ordre, cles[limite - 1])
+        return lignes, suivant
+    
+    def obtenir_position(self, joueur: str, tri: str = "score", ordre: str = "desc") -> Optional[int]:
+        """Retourne le rang (à partir de 1) d'un joueur au classement, None s'il est inconnu"""
+        if tri not in TRIS:
+            tri = "score"
+        partition = self._partition(joueur)
+        with partition.verrou:
+            cle = partition.index.cle(tri, joueur)
+        if cle is None:
+            return None
+        
+        # Nombre de clés inférieures et nombre total, partition par partition
+        avant = total = 0
+        for partition in self.partitions:
+            with partition.verrou:
+                avant += partition.index.listes[tri].position(cle)
+                total += len(partition.index)
+        return total - avant if ordre == "desc" else avant + 1
+    
+    def obtenir_voisinage(self, joueur: str, rayon: int = 5, tri: str = "score",
+                          ordre: str = "desc") -> List[Tuple[int, Tuple]]:
+        """Retourne un joueur entouré de ses voisins (voir ScoreManager.obtenir_voisinage)"""
+        if tri not in TRIS:
+            tri = "score"
+        rang = self.obtenir_position(joueur, tri, ordre)
+        if rang is None:
+            return []
+        cle = self._partition(joueur).index.cle(tri, joueur)
+        ordre_inverse = "asc" if ordre == "desc" else "desc"
+        avant = self._fusionner(tri, ordre_inverse, rayon, apres=cle)
+        apres = self._fusionner(tri, ordre, rayon, apres=cle)
+        
+        cles = avant[::-1] + [cle] + apres
+        premier = rang - len(avant)
+        return [(premier + n, self._ligne_classement(c[-1])) for n, c in enumerate(cles)]
+    
+    # ==========================================================================
+    # RECHERCHE DE JOUEURS
+    # ==========================================================================
+    
+    def _chercher(self, methode: str, *args) -> List[str]:
+        """Appelle une recherche de l'index sur chaque partition, résultats par ordre alphabétique"""
+        joueurs = []
+        for partition in self.partitions:
+            with partition.verrou:
+                joueurs.extend(getattr(partition.index, methode)(*args))
+        return sorted(joueurs, key=lambda joueur: (normaliser_nom(joueur), joueur))
+    
+    def rechercher_joueurs(self, nom: str) -> List[str]:
+        """Retourne les joueurs nommés `nom` sans tenir compte de la casse"""
+        return self._chercher("rechercher", nom)
+    
+    def completer_pseudo(self, prefixe: str, limite: int = 10) -> List[str]:
+        """Retourne les joueurs dont le pseudo commence par `prefixe` (sans casse)"""
+        return self._chercher("completer", prefixe, limite)[:limite]
+    
+    def suggerer_pseudos(self, nom: str, limite: int = 5) -> List[str]:
+        """Retourne les joueurs que `nom` désignait peut-être (voir ScoreManager.suggerer_pseudos)"""
+        if nom in self._partition(nom).scores:
+            return []
+        suggestions = []
+        for groupe in (self._chercher("rechercher", nom), self._chercher("proches", nom)):
+            groupe.sort(key=lambda joueur: -self._partition(joueur).scores[joueur]["parties_jouees"])
+            suggestions.extend(groupe)
+        return suggestions[:limite]
@@ -0,0 +1,400 @@
+"""
+Serveur de parties multi-sessions du Shooter Spatial (asyncio, TCP)
+
+Chaque connexion joue sa propre partie : le serveur fait tourner un
+GameEngine par session (il fait autorité), cadencé par une tâche asyncio
+à la fréquence demandée ; toutes les sessions partagent une seule boucle
+d'événements, donc un seul cœur.
+
+Protocole : un objet JSON par ligne dans chaque sens.
+
+Client → serveur (clés combinables) :
+    {"ack": 120}                  dernier tick reçu et appliqué
+    {"actions": ["gauche", "tir"]}   actions tenues jusqu'au prochain changement
+    {"nouvelle": true}            nouvelle partie après une fin de partie
+
+Serveur → client, à chaque tick :
+    {"t": 121, "base": 120, "maj": [[id, canal, qx, qy], ...], "suppr": [id, ...],
+     "etat": {"score": 40, "vies": 2, "bonus": ["vitesse"]}, "fin": true}
+
+Un message ne contient que la différence avec l'état du tick `base`, le
+dernier acquitté par le client : objets apparus ou déplacés (maj), objets
+disparus (suppr), état de la partie s'il a changé. Les positions sont
+quantifiées (qx = round(x × QUANTIFICATION)) et canal est l'index dans
+game_classes.CANAUX ; le vaisseau a l'id -1. Sans acquittement utilisable,
+"base" vaut null : le message est un état complet (avec "config").
+Comme la base est toujours un état acquitté, un message perdu ou sauté
+(client trop lent) ne demande aucune reprise.
+
+Usage :
+    python serveur_parties.py --port 8765 --frequence 20
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from game_classes import CANAL_BONUS, CANAUX, GameEngine
+
+
+# Configuration
+HOTE = "127.0.0.1"
+PORT = 8765
+FREQUENCE = 20                 # ticks par seconde (50 ms, comme la version graphique)
+SESSIONS_MAX = 10000
+
+# Règles des parties hébergées (apparitions régulières, sans progression)
+LARGEUR = 40
+HAUTEUR = 20
+INTERVALLE = 40
+VITESSE = 0.3
+CHANCE_BONUS = 0.1
+
+# Protocole
+QUANTIFICATION = 8             # positions envoyées en 1/8 de cellule
+HISTORIQUE = 64                # états gardés par session pour servir de base
+TAMPON_MAX = 64 * 1024         # octets en attente d'envoi avant de sauter des ticks
+INTERVALLE_STATISTIQUES = 10   # secondes entre deux affichages des statistiques
+
+ACTIONS = ("gauche", "droite", "haut", "bas", "tir")
+ID_VAISSEAU = -1
+
+
+def encoder(message: dict) -> bytes:
+    """Ligne JSON compacte"""
+    return json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+class SessionPartie:
+    """
+    Une partie hébergée et l'état de sa diffusion (sans entrées/sorties)
+    
+    Attributs :
+        engine (GameEngine) : Partie en cours
+        tick (int) : Ticks joués depuis l'ouverture de la session (toutes parties confondues)
+        actions (frozenset) : Actions tenues par le joueur
+        ack (int) : Dernier tick acquitté encore dans l'historique (None : aucun)
+        fin (bool) : La partie est terminée, en attente de {"nouvelle": true}
+    """
+    
+    def __init__(self, largeur: int = LARGEUR, hauteur: int = HAUTEUR, intervalle: int = INTERVALLE,
+                 vitesse: float = VITESSE, chance_bonus: float = CHANCE_BONUS,
+                 graine: Optional[int] = None):
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.intervalle = intervalle
+        self.vitesse = vitesse
+        self.chance_bonus = chance_bonus
+        self.graine = graine
+        self.tick = 0
+        self.actions = frozenset()
+        # tick → (entités, état), du plus ancien au plus récent
+        self.historique = OrderedDict()
+        self.nouvelle_partie()
+    
+    def nouvelle_partie(self):
+        """Recommence la partie ; le prochain message sera un état complet"""
+        self.engine = GameEngine(self.largeur, self.hauteur, graine=self.graine)
+        self.engine.programmer_apparitions(self.intervalle, self.vitesse, self.chance_bonus, premiere=0)
+        self.fin = False
+        # Les numéros des objets repartent de zéro : les anciens états ne peuvent plus servir de base
+        self.historique.clear()
+        self.ack = None
+    
+    def recevoir(self, message: dict):
+        """Applique un message du client"""
+        ack = message.get("ack")
+        if isinstance(ack, int) and ack in self.historique and (self.ack is None or ack > self.ack):
+            self.ack = ack
+            # Les états plus anciens que l'acquittement ne serviront plus
+            while next(iter(self.historique)) < ack:
+                self.historique.popitem(last=False)
+        
+        actions = message.get("actions")
+        if isinstance(actions, list):
+            self.actions = frozenset(action for action in actions if action in ACTIONS)
+        
+        if message.get("nouvelle") and self.fin:
+            self.nouvelle_partie()
+    
+    def avancer(self) -> Optional[bytes]:
+        """Joue un tick, retourne le message à envoyer (None si la partie est finie)"""
+        if self.fin:
+            return None
+        
+        engine = self.engine
+        vaisseau = engine.vaisseau
+        for deplacement in ACTIONS[:4]:
+            if deplacement in self.actions:
+                getattr(vaisseau, "deplacer_" + deplacement)()
+        if "tir" in self.actions:
+            engine.tirer()
+        engine.mettre_a_jour()
+        engine.evenements.clear()
+        self.tick += 1
+        
+        etat = self.instantane()
+        message = self._difference(*etat)
+        self.historique[self.tick] = etat
+        if len(self.historique) > HISTORIQUE:
+            ancien, _ = self.historique.popitem(last=False)
+            if ancien == self.ack:
+                self.ack = None
+        
+        if engine.jeu_termine:
+            self.fin = True
+            message["fin"] = True
+        return encoder(message)
+    
+    def instantane(self) -> tuple:
+        """(entités, état) quantifiés : {id: (canal, qx, qy)} et (score, vies, bonus actifs)"""
+        engine = self.engine
+        vaisseau = engine.vaisseau
+        q = QUANTIFICATION
+        entites = {ID_VAISSEAU: (0, round(vaisseau.x * q), round(vaisseau.y * q))}
+        for canal, objets in ((1, engine.ennemis), (2, engine.projectiles)):
+            for objet in objets:
+                if objet.actif:
+                    entites[objet.numero] = (canal, round(objet.x * q), round(objet.y * q))
+        for bonus_obj in engine.bonus:
+            if bonus_obj.actif:
+                entites[bonus_obj.numero] = (CANAL_BONUS[bonus_obj.type],
+                                             round(bonus_obj.x * q), round(bonus_obj.y * q))
+        return entites, (engine.score, vaisseau.vies, tuple(sorted(vaisseau.bonus_actif_jusqu_a)))
+    
+    def _difference(self, entites: dict, etat: tuple) -> dict:
+        """Message du tick courant par rapport au dernier état acquitté"""
+        message = {"t": self.tick}
+        if self.ack is None:
+            entites_base, etat_base = {}, None
+            message["base"] = None
+            message["config"] = {"largeur": self.largeur, "hauteur": self.hauteur,
+                                 "quantification": QUANTIFICATION, "canaux": CANAUX}
+        else:
+            entites_base, etat_base = self.historique[self.ack]
+            message["base"] = self.ack
+        
+        maj = [[numero, *valeur] for numero, valeur in entites.items() if entites_base.get(numero) != valeur]
+        suppr = [numero for numero in entites_base if numero not in entites]
+        if maj:
+            message["maj"] = maj
+        if suppr:
+            message["suppr"] = suppr
+        if etat != etat_base:
+            score, vies, bonus = etat
+            message["etat"] = {"score": score, "vies": vies, "bonus": list(bonus)}
+        return message
+
+
+class ClientPartie:
+    """
+    Reconstruit l'état d'une partie à partir des messages du serveur
+    
+    Attributs :
+        tick (int) : Dernier tick appliqué (à acquitter)
+        entites (dict) : {id: (canal, qx, qy)} au dernier tick
+        etat (dict) : Score, vies et bonus actifs
+        config (dict) : Taille de la grille, quantification, canaux
+    """
+    
+    def __init__(self):
+        self.tick: Optional[int] = None
+        self.entites: Dict[int, tuple] = {}
+        self.etat: Optional[dict] = None
+        self.config: Optional[dict] = None
+        self.fin = False
+        self._recus = {}
+    
+    def appliquer(self, message: dict) -> int:
+        """Applique un message de tick, retourne le tick à acquitter"""
+        base = message["base"]
+        if base is None:
+            entites, etat = {}, None
+            self.config = message["config"]
+        else:
+            entites_base, etat = self._recus[base]
+            entites = dict(entites_base)
+        
+        # Le serveur n'utilisera plus de base antérieure à celle-ci, ni hors de son historique
+        plus_ancien = message["t"] - HISTORIQUE if base is None else base
+        for tick in [tick for tick in self._recus if tick < plus_ancien]:
+            del self._recus[tick]
+        
+        for numero, canal, qx, qy in message.get("maj", ()):
+            entites[numero] = (canal, qx, qy)
+        for numero in message.get("suppr", ()):
+            del entites[numero]
+        etat = message.get("etat", etat)
+        
+        self.tick = message["t"]
+        self._recus[self.tick] = (entites, etat)
+        self.entites, self.etat = entites, etat
+        self.fin = message.get("fin", False)
+        return self.tick
+    
+    def position(self, numero: int) -> tuple:
+        """Position (x, y) d'un objet en cellules"""
+        _, qx, qy = self.entites[numero]
+        q = self.config["quantification"]
+        return qx / q, qy / q
+
+
+class ServeurParties:
+    """
+    Serveur asyncio : une session par connexion, une tâche de ticks par session
+    
+    Chaque session a ses propres échéances (son premier tick part de sa
+    connexion). Quand la boucle prend plus d'un tick de retard sur une
+    session, celle-ci repart de maintenant : la partie ralentit au lieu
+    d'enchaîner les ticks en rafale (compté dans ticks_en_retard). Un
+    client qui ne lit plus assez vite ne reçoit plus de ticks tant que son
+    tampon d'envoi dépasse TAMPON_MAX (compté dans messages_sautes).
+    
+    Attributs :
+        sessions (set) : Sessions connectées
+    """
+    
+    def __init__(self, frequence: float = FREQUENCE, sessions_max: int = SESSIONS_MAX, **regles):
+        self.frequence = frequence
+        self.sessions_max = sessions_max
+        self.regles = regles
+        self.sessions = set()
+        self.compteurs = {"connexions": 0, "refus": 0, "ticks": 0, "ticks_en_retard": 0,
+                          "messages_sautes": 0, "octets": 0}
+        self._serveur: Optional[asyncio.AbstractServer] = None
+    
+    async def demarrer(self, hote: str = HOTE, port: int = PORT) -> int:
+        """Ouvre le port d'écoute, retourne le port effectif (utile avec port=0)"""
+        self._serveur = await asyncio.start_server(self._connexion, hote, port)
+        return self._serveur.sockets[0].getsockname()[1]
+    
+    async def servir(self):
+        """Sert jusqu'à l'annulation"""
+        async with self._serveur:
+            await self._serveur.serve_forever()
+    
+    def statistiques(self) -> dict:
+        """Compteurs depuis le démarrage et sessions en cours"""
+        return dict(self.compteurs, sessions=len(self.sessions))
+    
+    async def _connexion(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Une connexion : lit les messages du client pendant que sa partie tourne"""
+        if len(self.sessions) >= self.sessions_max:
+            self.compteurs["refus"] += 1
+            writer.write(encoder({"erreur": "serveur complet"}))
+            writer.close()
+            return
+        
+        session = SessionPartie(**self.regles)
+        self.sessions.add(session)
+        self.compteurs["connexions"] += 1
+        animation = asyncio.create_task(self._animer(session, writer))
+        try:
+            while True:
+                ligne = await reader.readline()
+                if not ligne:
+                    break
+                try:
+                    message = json.loads(ligne)
+                except ValueError:
+                    continue
+                if isinstance(message, dict):
+                    session.recevoir(message)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            animation.cancel()
+            self.sessions.discard(session)
+            writer.close()
+    
+    async def _animer(self, session: SessionPartie, writer: asyncio.StreamWriter):
+        """Tâche de ticks d'une session (échéances absolues, sans dérive)"""
+        boucle = asyncio.get_running_loop()
+        periode = 1 / self.frequence
+        compteurs = self.compteurs
+        echeance = boucle.time()
+        
+        while not writer.is_closing():
+            # Toujours rendre la main, même en retard, pour lire les clients
+            await asyncio.sleep(max(0.0, echeance - boucle.time()))
+            if boucle.time() - echeance > periode:
+                compteurs["ticks_en_retard"] += 1
+                echeance = boucle.time()
+            echeance += periode
+            
+            message = session.avancer()
+            if message is None:
+                continue
+            compteurs["ticks"] += 1
+            if writer.transport.get_write_buffer_size() > TAMPON_MAX:
+                compteurs["messages_sautes"] += 1
+                continue
+            writer.write(message)
+            compteurs["octets"] += len(message)
+
+
+# ==============================================================================
+# LIGNE DE COMMANDE
+# ==============================================================================
+
+async def executer(args):
+    """Démarre le serveur et affiche ses statistiques régulièrement"""
+    serveur = ServeurParties(args.frequence, args.sessions_max, largeur=args.largeur,
+                             hauteur=args.hauteur, intervalle=args.intervalle,
+                             vitesse=args.vitesse, chance_bonus=args.chance_bonus)
+    port = await serveur.demarrer(args.hote, args.port)
+    print(f"🚀 Serveur de parties sur {args.hote}:{port} ({args.frequence:g} ticks/s)", flush=True)
+    
+    tache = asyncio.create_task(serveur.servir())
+    if args.silencieux:
+        await tache
+        return
+    
+    precedent, debut = serveur.statistiques(), time.perf_counter()
+    while not tache.done():
+        await asyncio.sleep(INTERVALLE_STATISTIQUES)
+        stats, fin = serveur.statistiques(), time.perf_counter()
+        duree = fin - debut
+        print(f"📊 {stats['sessions']} session(s) | "
+              f"{(stats['ticks'] - precedent['ticks']) / duree:,.0f} ticks/s | "
+              f"{(stats['octets'] - precedent['octets']) / duree / 1024:,.1f} Ko/s | "
+              f"retards: {stats['ticks_en_retard'] - precedent['ticks_en_retard']} | "
+              f"sautés: {stats['messages_sautes'] - precedent['messages_sautes']}", flush=True)
+        precedent, debut = stats, fin
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Serveur de parties multi-sessions du Shooter Spatial")
+    parser.add_argument("--hote", default=HOTE, help=f"Adresse d'écoute (défaut: {HOTE})")
+    parser.add_argument("--port", type=int, default=PORT, help=f"Port (défaut: {PORT}, 0 : au hasard)")
+    parser.add_argument("--frequence", type=float, default=FREQUENCE,
+                        help=f"Ticks par seconde de chaque partie (défaut: {FREQUENCE})")
+    parser.add_argument("--sessions-max", type=int, default=SESSIONS_MAX,
+                        help=f"Sessions simultanées maximum (défaut: {SESSIONS_MAX})")
+    parser.add_argument("--largeur", type=int, default=LARGEUR, help=f"Largeur de la grille (défaut: {LARGEUR})")
+    parser.add_argument("--hauteur", type=int, default=HAUTEUR, help=f"Hauteur de la grille (défaut: {HAUTEUR})")
+    parser.add_argument("--intervalle", type=int, default=INTERVALLE,
+                        help=f"Frames entre deux apparitions d'ennemi (défaut: {INTERVALLE})")
+    parser.add_argument("--vitesse", type=float, default=VITESSE, help=f"Vitesse des ennemis (défaut: {VITESSE})")
+    parser.add_argument("--chance-bonus", type=float, default=CHANCE_BONUS,
+                        help=f"Probabilité d'un bonus à chaque apparition (défaut: {CHANCE_BONUS})")
+    parser.add_argument("--silencieux", action="store_true", help="Ne pas afficher les statistiques")
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(executer(args))
+    except KeyboardInterrupt:
+        print("\n🛑 Serveur arrêté")
+    except OSError as e:
+        print(f"❌ ERREUR : {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
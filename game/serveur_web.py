@@ -2,18 +2,366 @@
 Serveur HTTP local pour afficher le site web des scores
 """
 
+import email.utils
+import gzip
+import hashlib
 import http.server
-import socketserver
-import webbrowser
+import json
+import mimetypes
 import os
+import queue
+import threading
+import time
+import urllib.parse
+import webbrowser
+from collections import OrderedDict
 from pathlib import Path
+from typing import Dict, Optional, Set
+
+from persistance import EcrivainGroupe
+from score_manager import ScoreManager, LIMITE_LEADERBOARD
+
+# Compression brotli (optionnelle)
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
 
 # Configuration
 PORT = 8000
 DOSSIER = Path(__file__).parent
 
+# Types de fichiers compressés à l'avance
+TYPES_COMPRESSIBLES = ('text/', 'application/json', 'application/javascript')
+
+# Cache des fichiers servis
+TAILLE_MAX_CACHE = 32 * 1024 * 1024  # octets
+INTERVALLE_SURVEILLANCE = 0.2        # secondes entre deux vérifications des fichiers
+CHEMIN_METRIQUES = '/metrics'
+
+# API des scores
+CHEMIN_SCORES = '/scores'
+CHEMIN_LEADERBOARD = '/leaderboard'
+CHEMIN_JOUEURS = '/joueurs'
+LIMITE_PAGE_MAX = 500          # joueurs par page de /leaderboard
+LONGUEUR_PSEUDO_MAX = 50
+TAILLE_MAX_REQUETE = 4096      # octets du corps d'un POST /scores
+DELAI_ECRITURE = 10            # secondes d'attente de l'écriture d'un score
+
+# Flux d'événements (Server-Sent Events) du classement en direct
+CHEMIN_EVENEMENTS = '/evenements'
+INTERVALLE_BATTEMENT = 15      # secondes entre deux commentaires de maintien
+TAILLE_FILE_CLIENT = 64        # événements en attente avant resynchronisation
+
+
+class FichierStatique:
+    """
+    Fichier servi depuis la mémoire, avec ses versions compressées
+    
+    Attributs :
+        contenus (dict) : Corps de la réponse par encodage ('identity', 'gzip', 'br')
+        etag (str) : Empreinte forte du contenu (suffixée par encodage)
+        last_modified (str) : Date de modification au format HTTP
+        mtime (float) : Date de modification du fichier sur disque
+        taille_memoire (int) : Octets occupés en mémoire (toutes versions)
+    """
+    
+    def __init__(self, chemin: Path):
+        statistiques = chemin.stat()
+        with open(chemin, 'rb') as f:
+            brut = f.read()
+        
+        self.mtime = statistiques.st_mtime
+        self.taille_disque = statistiques.st_size
+        self.type_mime = mimetypes.guess_type(str(chemin))[0] or 'application/octet-stream'
+        if self.type_mime.startswith('text/') or self.type_mime == 'application/json':
+            self.type_mime += '; charset=utf-8'
+        self.etag = hashlib.sha1(brut).hexdigest()[:20]
+        self.last_modified = email.utils.formatdate(self.mtime, usegmt=True)
+        
+        self.contenus = {'identity': brut}
+        if self.type_mime.startswith(TYPES_COMPRESSIBLES) and len(brut) > 256:
+            self.contenus['gzip'] = gzip.compress(brut, compresslevel=9, mtime=0)
+            if BROTLI_AVAILABLE:
+                self.contenus['br'] = brotli.compress(brut)
+        self.taille_memoire = sum(len(contenu) for contenu in self.contenus.values())
+    
+    def choisir_encodage(self, accept_encoding: str) -> str:
+        """Choisit le meilleur encodage disponible accepté par le client"""
+        acceptes = {
+            morceau.split(';')[0].strip().lower()
+            for morceau in accept_encoding.split(',')
+            if 'q=0' not in morceau.replace(' ', '').split(';', 1)[-1]
+        }
+        for encodage in ('br', 'gzip'):
+            if encodage in self.contenus and encodage in acceptes:
+                return encodage
+        return 'identity'
+    
+    def etag_pour(self, encodage: str) -> str:
+        """ETag fort propre à chaque représentation"""
+        if encodage == 'identity':
+            return f'"{self.etag}"'
+        return f'"{self.etag}-{encodage}"'
+
+
+class CacheFichiers:
+    """
+    Fichiers statiques gardés en mémoire (LRU limitée en octets)
+    
+    Un fichier en cache est servi sans accès disque. Un thread de surveillance
+    compare régulièrement la date et la taille des fichiers en cache
+    (index.html, scores.json, leaderboard.json...) à celles du disque et
+    invalide les entrées modifiées.
+    
+    Attributs :
+        fichiers (OrderedDict) : Chemin -> FichierStatique, du moins au plus récemment utilisé
+        taille_max (int) : Nombre maximal d'octets en mémoire (toutes versions comprises)
+        taille (int) : Nombre d'octets actuellement en mémoire
+        compteurs (dict) : succes, echecs, evictions, invalidations, trop_gros
+    """
+    
+    def __init__(self, taille_max: int = TAILLE_MAX_CACHE, intervalle: float = INTERVALLE_SURVEILLANCE):
+        self.fichiers: "OrderedDict[str, FichierStatique]" = OrderedDict()
+        self.taille_max = taille_max
+        self.taille = 0
+        self.intervalle = intervalle
+        self.compteurs = {"succes": 0, "echecs": 0, "evictions": 0, "invalidations": 0, "trop_gros": 0}
+        self.verrou = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def obtenir(self, chemin: str) -> Optional[FichierStatique]:
+        """Retourne le fichier en mémoire (None s'il n'existe pas ou dépasse la taille du cache)"""
+        with self.verrou:
+            fichier = self.fichiers.get(chemin)
+            if fichier is not None:
+                self.fichiers.move_to_end(chemin)
+                self.compteurs["succes"] += 1
+                return fichier
+            self.compteurs["echecs"] += 1
+        
+        if not os.path.isfile(chemin):
+            return None
+        try:
+            fichier = FichierStatique(Path(chemin))
+        except OSError:
+            return None
+        if fichier.taille_memoire > self.taille_max:
+            with self.verrou:
+                self.compteurs["trop_gros"] += 1
+            return None
+        
+        with self.verrou:
+            ancien = self.fichiers.pop(chemin, None)
+            if ancien is not None:
+                self.taille -= ancien.taille_memoire
+            self.fichiers[chemin] = fichier
+            self.taille += fichier.taille_memoire
+            while self.taille > self.taille_max:
+                _, evince = self.fichiers.popitem(last=False)
+                self.taille -= evince.taille_memoire
+                self.compteurs["evictions"] += 1
+            self._demarrer_surveillance()
+        return fichier
+    
+    def invalider(self, chemin: str):
+        """Retire un fichier du cache"""
+        with self.verrou:
+            fichier = self.fichiers.pop(chemin, None)
+            if fichier is not None:
+                self.taille -= fichier.taille_memoire
+                self.compteurs["invalidations"] += 1
+    
+    def _demarrer_surveillance(self):
+        """Lance le thread de surveillance au premier fichier mis en cache (verrou tenu)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._surveiller, daemon=True)
+            self._thread.start()
+    
+    def _surveiller(self):
+        """Invalide les entrées dont le fichier a changé sur le disque"""
+        while True:
+            time.sleep(self.intervalle)
+            with self.verrou:
+                entrees = list(self.fichiers.items())
+            for chemin, fichier in entrees:
+                try:
+                    statistiques = os.stat(chemin)
+                    modifie = (statistiques.st_mtime != fichier.mtime
+                               or statistiques.st_size != fichier.taille_disque)
+                except OSError:
+                    modifie = True
+                if modifie:
+                    self.invalider(chemin)
+    
+    def metriques(self) -> Dict[str, int]:
+        """Compteurs et occupation du cache"""
+        with self.verrou:
+            return dict(self.compteurs, entrees=len(self.fichiers), octets=self.taille, octets_max=self.taille_max)
+
+
+CACHE = CacheFichiers()
+
+
+class DiffuseurClassement:
+    """
+    Diffuse les changements du classement aux clients connectés à /evenements
+    
+    Les parties enregistrées par le serveur sont signalées par
+    ScoreManager.abonner() ; scores.json est aussi surveillé et relu s'il est
+    modifié par un autre processus (le jeu). Dans les deux cas seules les
+    lignes modifiées sont envoyées (événement "diff") ; un client qui a manqué
+    un événement reçoit le classement complet (événement "classement").
+    
+    Attributs :
+        manager (ScoreManager) : Scores servis
+        empreinte (str) : Empreinte du dernier classement diffusé
+        abonnes (set) : Files d'attente des clients connectés
+    """
+    
+    def __init__(self, manager: ScoreManager, limite: int = LIMITE_LEADERBOARD):
+        self.manager = manager
+        self.limite = limite
+        self.empreinte: Optional[str] = None
+        self.document: Optional[str] = None
+        self.lignes: Dict[str, list] = {}
+        self.abonnes: Set[queue.Queue] = set()
+        self.verrou = threading.Lock()
+        self.reveil = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def demarrer(self):
+        """Lance la surveillance (sans effet si déjà lancée)"""
+        with self.verrou:
+            if self._thread is not None:
+                return
+            self._publier_changements()
+            self.manager.abonner(self._sur_nouvelle_partie)
+            self._thread = threading.Thread(target=self._surveiller, daemon=True)
+            self._thread.start()
+    
+    def _sur_nouvelle_partie(self, evenement: dict):
+        """Partie enregistrée dans ce processus"""
+        self.reveil.set()
+    
+    def _surveiller(self):
+        """Boucle du thread de surveillance"""
+        while True:
+            self.reveil.wait(INTERVALLE_SURVEILLANCE)
+            self.reveil.clear()
+            try:
+                self.manager.recharger_si_modifie()
+                with self.verrou:
+                    self._publier_changements()
+            except Exception as e:
+                print(f"⚠️  Erreur de mise à jour du classement en direct: {e}")
+    
+    def _publier_changements(self):
+        """Compare le classement au dernier diffusé et envoie les lignes modifiées"""
+        empreinte, document = self.manager.obtenir_document_leaderboard(self.limite)
+        if empreinte == self.empreinte:
+            return
+        
+        donnees = json.loads(document)
+        lignes = {ligne[0]: ligne for ligne in donnees["joueurs"]}
+        diff = {
+            "depuis": self.empreinte,
+            "empreinte": empreinte,
+            "genere": donnees["genere"],
+            "maj": [ligne for pseudo, ligne in lignes.items() if self.lignes.get(pseudo) != ligne],
+            "suppr": [pseudo for pseudo in self.lignes if pseudo not in lignes],
+        }
+        self.empreinte, self.document, self.lignes = empreinte, document, lignes
+        
+        # Encodé une seule fois pour tous les clients
+        message = formater_evenement("diff", json.dumps(diff, ensure_ascii=False, separators=(',', ':')), empreinte)
+        for file in list(self.abonnes):
+            try:
+                file.put_nowait(message)
+            except queue.Full:
+                # Client trop lent : on vide sa file et on lui renverra tout
+                vider_file(file)
+                file.put_nowait(None)
+    
+    def message_complet(self) -> bytes:
+        """Événement "classement" contenant tout le document"""
+        with self.verrou:
+            return formater_evenement("classement", self.document, self.empreinte)
+    
+    def abonner(self, empreinte_client: Optional[str]) -> queue.Queue:
+        """Inscrit un client ; il reçoit tout le classement s'il n'est pas à jour"""
+        file = queue.Queue(maxsize=TAILLE_FILE_CLIENT)
+        with self.verrou:
+            if empreinte_client != self.empreinte:
+                file.put_nowait(None)
+            self.abonnes.add(file)
+        return file
+    
+    def desabonner(self, file: queue.Queue):
+        """Retire un client déconnecté"""
+        with self.verrou:
+            self.abonnes.discard(file)
+
+
+def formater_evenement(nom: str, donnees: str, identifiant: Optional[str] = None) -> bytes:
+    """Formate un événement Server-Sent Events"""
+    entete = f"id: {identifiant}\n" if identifiant else ""
+    return f"{entete}event: {nom}\ndata: {donnees}\n\n".encode('utf-8')
+
+
+def vider_file(file: queue.Queue):
+    """Retire tous les éléments en attente d'une file"""
+    try:
+        while True:
+            file.get_nowait()
+    except queue.Empty:
+        pass
+
+
+class ServiceScores:
+    """
+    ScoreManager partagé par toutes les requêtes du serveur
+    
+    - POST /scores : les scores sont écrits par lots (persistance.EcrivainGroupe)
+    - GET /leaderboard : les pages sont lues dans l'index trié en mémoire
+    - GET /evenements : les changements sont diffusés (DiffuseurClassement)
+    
+    Le ScoreManager est créé à la première utilisation.
+    """
+    
+    def __init__(self, fichier_scores: Path = DOSSIER / "scores.json"):
+        self.fichier_scores = Path(fichier_scores)
+        self.manager: Optional[ScoreManager] = None
+        self.ecrivain: Optional[EcrivainGroupe] = None
+        self.diffuseur: Optional[DiffuseurClassement] = None
+        self._verrou = threading.Lock()
+    
+    def demarrer(self) -> 'ServiceScores':
+        """Charge les scores et lance les threads (sans effet si déjà fait)"""
+        with self._verrou:
+            if self.manager is None:
+                manager = ScoreManager(str(self.fichier_scores), verbeux=False)
+                self.ecrivain = EcrivainGroupe(manager)
+                self.ecrivain.demarrer()
+                self.diffuseur = DiffuseurClassement(manager)
+                self.diffuseur.demarrer()
+                self.manager = manager
+        return self
+    
+    def arreter(self):
+        """Écrit les scores en attente"""
+        if self.ecrivain is not None:
+            self.ecrivain.arreter()
+
+
+SERVICE = ServiceScores()
+
+
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    """Handler HTTP personnalisé"""
+    """Handler HTTP personnalisé : fichiers en mémoire, compression et requêtes conditionnelles"""
+    
+    protocol_version = "HTTP/1.1"
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(DOSSIER), **kwargs)
@@ -21,14 +369,312 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     def end_headers(self):
         # Ajouter les headers CORS
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
         super().end_headers()
     
+    def do_GET(self):
+        chemin = urllib.parse.urlsplit(self.path).path
+        if chemin == CHEMIN_EVENEMENTS:
+            self._servir_evenements()
+        elif chemin == CHEMIN_METRIQUES:
+            self._servir_metriques()
+        elif chemin == CHEMIN_LEADERBOARD:
+            self._servir_leaderboard()
+        elif chemin == CHEMIN_JOUEURS:
+            self._servir_joueurs()
+        elif not self._servir_depuis_cache(avec_corps=True):
+            super().do_GET()
+    
+    def do_POST(self):
+        if urllib.parse.urlsplit(self.path).path == CHEMIN_SCORES:
+            self._recevoir_score()
+        else:
+            self._envoyer_json(404, {"erreur": "ressource inconnue"})
+    
+    def do_OPTIONS(self):
+        # Pré-requête CORS d'un navigateur avant un POST JSON
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def do_HEAD(self):
+        if not self._servir_depuis_cache(avec_corps=False):
+            super().do_HEAD()
+    
+    def _servir_depuis_cache(self, avec_corps: bool) -> bool:
+        """Sert un fichier depuis la mémoire, retourne False s'il faut déléguer"""
+        chemin = self.translate_path(self.path)
+        if urllib.parse.urlsplit(self.path).path.endswith('/'):
+            # Dossier : sa page index.html, comme SimpleHTTPRequestHandler (sans elle, liste déléguée)
+            chemin = os.path.join(chemin, 'index.html')
+        fichier = CACHE.obtenir(chemin)
+        if fichier is None:
+            return False
+        
+        encodage = fichier.choisir_encodage(self.headers.get('Accept-Encoding', ''))
+        etag = fichier.etag_pour(encodage)
+        
+        if self._non_modifie(fichier, etag):
+            self.send_response(304)
+            self._envoyer_entetes_cache(fichier, etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return True
+        
+        corps = fichier.contenus[encodage]
+        self.send_response(200)
+        self.send_header('Content-Type', fichier.type_mime)
+        self.send_header('Content-Length', str(len(corps)))
+        if encodage != 'identity':
+            self.send_header('Content-Encoding', encodage)
+        self._envoyer_entetes_cache(fichier, etag)
+        self.end_headers()
+        if avec_corps:
+            self.wfile.write(corps)
+        return True
+    
+    def _servir_evenements(self):
+        """Flux Server-Sent Events du classement (reste ouvert jusqu'à la déconnexion)"""
+        parametres = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        # Après une coupure, EventSource renvoie l'id du dernier événement reçu
+        empreinte_client = self.headers.get('Last-Event-ID') or parametres.get('empreinte', [None])[0]
+        diffuseur = SERVICE.demarrer().diffuseur
+        file = diffuseur.abonner(empreinte_client)
+        
+        try:
+            self.close_connection = True
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.send_header('X-Accel-Buffering', 'no')
+            self.end_headers()
+            self.wfile.write(b"retry: 2000\n\n")
+            self.wfile.flush()
+            
+            while True:
+                try:
+                    message = file.get(timeout=INTERVALLE_BATTEMENT)
+                except queue.Empty:
+                    message = b": battement\n\n"
+                if message is None:
+                    message = diffuseur.message_complet()
+                self.wfile.write(message)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass
+        finally:
+            diffuseur.desabonner(file)
+    
+    def _envoyer_json(self, statut: int, objet):
+        """Envoie une réponse JSON compacte"""
+        corps = json.dumps(objet, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.send_response(statut)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corps)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(corps)
+    
+    def _recevoir_score(self):
+        """POST /scores : {"joueur": str, "score": int}, répond une fois le score écrit"""
+        try:
+            taille = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            taille = -1
+        if not 0 < taille <= TAILLE_MAX_REQUETE:
+            self.close_connection = True
+            self._envoyer_json(400, {"erreur": "corps JSON attendu"})
+            return
+        
+        try:
+            donnees = json.loads(self.rfile.read(taille))
+            joueur = donnees["joueur"].strip()
+            score = donnees["score"]
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self._envoyer_json(400, {"erreur": "format attendu : joueur (texte) et score (entier)"})
+            return
+        if not 0 < len(joueur) <= LONGUEUR_PSEUDO_MAX:
+            self._envoyer_json(400, {"erreur": f"pseudo de 1 à {LONGUEUR_PSEUDO_MAX} caractères"})
+            return
+        if isinstance(score, bool) or not isinstance(score, int) or score < 0:
+            self._envoyer_json(400, {"erreur": "le score doit être un entier positif"})
+            return
+        
+        service = SERVICE.demarrer()
+        try:
+            nouveau_record = service.ecrivain.soumettre(joueur, score).result(DELAI_ECRITURE)
+        except Exception as e:
+            self._envoyer_json(503, {"erreur": f"score non enregistré : {e}"})
+            return
+        
+        manager = service.manager
+        with manager.verrou:
+            meilleur_score = manager.obtenir_meilleur_score(joueur)
+            rang, total = manager.obtenir_rang(meilleur_score)
+        self._envoyer_json(201, {
+            "joueur": joueur,
+            "score": score,
+            "nouveau_record": nouveau_record,
+            "meilleur_score": meilleur_score,
+            "rang": rang,
+            "joueurs_classes": total,
+        })
+    
+    def _servir_leaderboard(self):
+        """
+        GET /leaderboard lu dans l'index trié
+        
+        Paramètres : tri, ordre, limite, puis au choix offset (position),
+        apres (curseur "suivant" de la page précédente) ou autour (pseudo
+        d'un joueur, avec rayon voisins de chaque côté).
+        """
+        parametres = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        tri = parametres.get('tri', ['score'])[0]
+        ordre = parametres.get('ordre', ['desc'])[0]
+        curseur = parametres.get('apres', [None])[0]
+        autour = parametres.get('autour', [None])[0]
+        try:
+            limite = int(parametres.get('limite', ['10'])[0])
+            offset = int(parametres.get('offset', ['0'])[0])
+            rayon = int(parametres.get('rayon', ['5'])[0])
+        except ValueError:
+            self._envoyer_json(400, {"erreur": "limite, offset et rayon doivent être des entiers"})
+            return
+        if tri not in ('score', 'date', 'pseudo') or ordre not in ('asc', 'desc'):
+            self._envoyer_json(400, {"erreur": "tri : score|date|pseudo, ordre : asc|desc"})
+            return
+        if not 1 <= limite <= LIMITE_PAGE_MAX or offset < 0 or not 0 <= rayon <= LIMITE_PAGE_MAX:
+            self._envoyer_json(400, {"erreur": f"limite et rayon jusqu'à {LIMITE_PAGE_MAX}, offset positif"})
+            return
+        
+        manager = SERVICE.demarrer().manager
+        reponse = {"tri": tri, "ordre": ordre}
+        if autour is not None:
+            voisins = manager.obtenir_voisinage(autour, rayon, tri=tri, ordre=ordre)
+            if not voisins:
+                self._envoyer_json(404, {
+                    "erreur": f"joueur inconnu : {autour}",
+                    "suggestions": manager.suggerer_pseudos(autour),
+                })
+                return
+            reponse.update({
+                "joueur": autour,
+                "rayon": rayon,
+                "champs": ["rang", "pseudo", "score", "date", "timestamp"],
+                "joueurs": [[rang, *ligne] for rang, ligne in voisins],
+            })
+        else:
+            with manager.verrou:
+                try:
+                    joueurs, suivant = manager.obtenir_page(limite, tri=tri, ordre=ordre,
+                                                            curseur=curseur, offset=offset)
+                except ValueError as e:
+                    self._envoyer_json(400, {"erreur": str(e)})
+                    return
+                premier_rang = manager.obtenir_position(joueurs[0][0], tri, ordre) if joueurs else None
+                total = len(manager.scores)
+            reponse.update({
+                "limite": limite,
+                "total": total,
+                "rang": premier_rang,
+                "suivant": suivant,
+                "champs": ["pseudo", "score", "date", "timestamp"],
+                "joueurs": joueurs,
+            })
+        self._envoyer_json(200, reponse)
+    
+    def _servir_joueurs(self):
+        """
+        GET /joueurs : recherche de joueurs
+        
+        Paramètres : prefixe (complétion, sans casse) et limite, ou nom
+        (joueurs de ce nom à la casse près, et suggestions s'il est inconnu).
+        """
+        parametres = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        prefixe = parametres.get('prefixe', [None])[0]
+        nom = parametres.get('nom', [None])[0]
+        try:
+            limite = int(parametres.get('limite', ['10'])[0])
+        except ValueError:
+            self._envoyer_json(400, {"erreur": "limite doit être un entier"})
+            return
+        if (prefixe is None) == (nom is None) or not 1 <= limite <= LIMITE_PAGE_MAX:
+            self._envoyer_json(400, {"erreur": f"prefixe ou nom attendu, limite jusqu'à {LIMITE_PAGE_MAX}"})
+            return
+        
+        manager = SERVICE.demarrer().manager
+        if prefixe is not None:
+            self._envoyer_json(200, {"prefixe": prefixe, "joueurs": manager.completer_pseudo(prefixe, limite)})
+            return
+        self._envoyer_json(200, {
+            "nom": nom,
+            "existe": manager.obtenir_position(nom) is not None,
+            "joueurs": manager.rechercher_joueurs(nom)[:limite],
+            "suggestions": manager.suggerer_pseudos(nom, limite),
+        })
+    
+    def _servir_metriques(self):
+        """Compteurs du serveur au format texte Prometheus"""
+        metriques = CACHE.metriques()
+        lignes = [f"serveur_web_cache_{nom} {valeur}" for nom, valeur in metriques.items()]
+        if SERVICE.manager is not None:
+            lignes.append(f"serveur_web_clients_evenements {len(SERVICE.diffuseur.abonnes)}")
+            lignes.append(f"serveur_web_scores_ecrits {SERVICE.ecrivain.nb_scores}")
+            lignes.append(f"serveur_web_lots_ecrits {SERVICE.ecrivain.nb_lots}")
+            lignes.append(f"serveur_web_scores_en_attente {SERVICE.ecrivain.file.qsize()}")
+        corps = ("\n".join(lignes) + "\n").encode('utf-8')
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(corps)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(corps)
+    
+    def _non_modifie(self, fichier: FichierStatique, etag: str) -> bool:
+        """Évalue If-None-Match (prioritaire) puis If-Modified-Since"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            candidats = [e.strip() for e in if_none_match.split(',')]
+            return '*' in candidats or etag in [c[2:] if c.startswith('W/') else c for c in candidats]
+        
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                date = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return int(fichier.mtime) <= date
+        return False
+    
+    def _envoyer_entetes_cache(self, fichier: FichierStatique, etag: str):
+        """Entêtes de validation : le navigateur revalide à chaque affichage (réponse 304)"""
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', fichier.last_modified)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+    
     def log_message(self, format, *args):
         """Personnalise les messages de log"""
-        print(f"[{self.address_string()}] {format % args}")
+        if self.server.journal_actif:
+            print(f"[{self.address_string()}] {format % args}")
+
 
-def demarrer_serveur():
+class ServeurHTTP(http.server.ThreadingHTTPServer):
+    """Serveur HTTP multi-thread (un thread par connexion)"""
+    
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+    
+    def __init__(self, adresse, handler=MyHTTPRequestHandler, journal_actif: bool = True):
+        self.journal_actif = journal_actif
+        super().__init__(adresse, handler)
+
+
+def demarrer_serveur(port: int = PORT, ouvrir_navigateur: bool = True, journal_actif: bool = True):
     """Démarre le serveur HTTP"""
     
     print("="*60)
@@ -51,27 +697,33 @@ def demarrer_serveur():
         print()
     
     print(f"📂 Dossier : {DOSSIER}")
-    print(f"🌐 Port    : {PORT}")
+    print(f"🌐 Port    : {port}")
+    print(f"🗜️  Compression : gzip{' + brotli' if BROTLI_AVAILABLE else ''}")
+    print(f"📡 Scores en direct : {CHEMIN_EVENEMENTS}")
     print()
     
+    SERVICE.demarrer()
+    
     # Créer le serveur
     try:
-        with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
-            url = f"http://localhost:{PORT}/index.html"
+        with ServeurHTTP(("", port), journal_actif=journal_actif) as httpd:
+            url = f"http://localhost:{port}/index.html"
             
             print(f"✅ Serveur démarré avec succès !")
             print()
             print(f"🌍 Ouvrez votre navigateur à l'adresse :")
             print(f"   {url}")
             print()
-            print("💡 Le navigateur devrait s'ouvrir automatiquement...")
-            print()
+            if ouvrir_navigateur:
+                print("💡 Le navigateur devrait s'ouvrir automatiquement...")
+                print()
             print("⚠️  Pour arrêter le serveur : Ctrl+C")
             print("="*60)
             print()
             
             # Ouvrir automatiquement le navigateur
-            webbrowser.open(url)
+            if ouvrir_navigateur:
+                webbrowser.open(url)
             
             # Démarrer le serveur
             httpd.serve_forever()
@@ -83,13 +735,16 @@ def demarrer_serveur():
         print("="*60)
     except OSError as e:
         if e.errno == 10048 or e.errno == 98:  # Port déjà utilisé
-            print(f"❌ ERREUR : Le port {PORT} est déjà utilisé !")
+            print(f"❌ ERREUR : Le port {port} est déjà utilisé !")
             print()
             print("💡 Solutions :")
-            print(f"   1. Changez le PORT dans le script (actuellement {PORT})")
-            print(f"   2. Ou fermez l'application qui utilise le port {PORT}")
+            print(f"   1. Changez le PORT dans le script (actuellement {port})")
+            print(f"   2. Ou fermez l'application qui utilise le port {port}")
         else:
             print(f"❌ ERREUR : {e}")
+    finally:
+        # Écrire les scores reçus encore en file d'attente
+        SERVICE.arreter()
 
 if __name__ == "__main__":
-    demarrer_serveur()
\ No newline at end of file
+    demarrer_serveur()
@@ -3,14 +3,17 @@ Shooter Spatial - Version Console Optimisée
 Version avec affichage fluide et adaptation automatique de la taille
 """
 
+import argparse
 import os
+import stat
 import sys
 import time
-import random
 import threading
 import shutil
+from concurrent.futures import TimeoutError as FuturTimeoutError
 from pathlib import Path
 from io import StringIO
+from typing import Optional
 
 # Import pour la gestion du clavier selon le système
 if sys.platform == 'win32':
@@ -29,8 +32,10 @@ try:
 except ImportError:
     PYGAME_AVAILABLE = False
 
-from game_classes import GameEngine, Bonus
+from game_classes import GameEngine, Bonus, ENNEMI_DETRUIT
 from score_manager import ScoreManager
+from persistance import EcrivainGroupe
+from spectateurs import DiffuseurSpectateurs
 
 
 # ==============================================================================
@@ -40,47 +45,13 @@ from score_manager import ScoreManager
 class GameEngineConsole(GameEngine):
     """Version console du moteur de jeu avec collisions plus permissives"""
     
-    def _verifier_collisions(self):
-        """Vérifie toutes les collisions (version console avec marges augmentées)"""
-        # Collision vaisseau-ennemi (avec invincibilité)
-        if self.frame_count > self.vaisseau.invincible_jusqu_a:
-            for ennemi in self.ennemis:
-                if not ennemi.actif:
-                    continue
-                
-                # Marge réduite à 0.2 pour être moins punitif en console
-                if self.vaisseau.collision_avec(ennemi, marge=0.2):
-                    ennemi.actif = False
-                    if self.vaisseau.perdre_vie():
-                        self.jeu_termine = True
-        
-        # Collision projectile-ennemi
-        for projectile in self.projectiles:
-            if not projectile.actif:
-                continue
-            
-            for ennemi in self.ennemis:
-                if not ennemi.actif:
-                    continue
-                
-                # Marge augmentée à 1.5 pour faciliter les tirs en console
-                if projectile.collision_avec(ennemi, marge=1.5):
-                    projectile.actif = False
-                    ennemi.actif = False
-                    self.score += ennemi.points
-                    break
-        
-        # Collision vaisseau-bonus
-        for bonus_obj in self.bonus:
-            if not bonus_obj.actif:
-                continue
-            
-            # Marge augmentée à 1.0 pour faciliter la collecte en console
-            if self.vaisseau.collision_avec(bonus_obj, marge=1.0):
-                bonus_obj.actif = False
-                # Appliquer le bonus seulement s'il peut être ramassé
-                if self._peut_ramasser_bonus(bonus_obj.type):
-                    self._appliquer_bonus(bonus_obj.type)
+    # Marge réduite pour le vaisseau (moins punitif), augmentées pour les tirs et les bonus
+    MARGE_VAISSEAU_ENNEMI = 0.2
+    MARGE_PROJECTILE_ENNEMI = 1.5
+    MARGE_BONUS = 1.0
+    
+    # Pas d'invincibilité après une collision en console
+    INVINCIBILITE_COLLISION = 0
 
 
 # ==============================================================================
@@ -187,6 +158,7 @@ class ConfigDifficulte:
     FPS_CIBLE = 30
     VITESSE_MAJ = 1.0 / FPS_CIBLE
     VITESSE_INPUT = 0.01
+    ATTENTE_SCORE_MAX = 2.0  # secondes avant d'afficher la fin de partie sans le classement
 
 
 # ==============================================================================
@@ -268,6 +240,127 @@ class ClavierNonBloquant:
         return None
 
 
+# ==============================================================================
+# SORTIE DU TERMINAL SANS BLOCAGE
+# ==============================================================================
+
+class EcranNonBloquant:
+    """
+    Écriture des images sur le terminal sans jamais bloquer la boucle de jeu
+    
+    Les images sont écrites par un descripteur non bloquant ouvert à part
+    (terminal ou tube rouvert) : ce que le terminal (ou le lien SSH)
+    n'accepte pas tout de suite reste « en vol » et part aux appels
+    suivants. Tant qu'une image est en vol, les nouvelles ne sont ni
+    rendues ni mises en file : elles sont sautées, et la prochaine image
+    affichée est la plus récente.
+    
+    Le descripteur de sys.stdout n'est jamais modifié : les autres
+    écritures (print) restent bloquantes.
+    
+    Sous Windows la console n'a pas de mode non bloquant : les images y
+    sont écrites par print, en bloquant. Une sortie qui ne peut pas être
+    rouverte (fichier, socket) est écrite en bloquant elle aussi.
+    
+    Attributs :
+        images (int) : Images écrites
+        sautees (int) : Images sautées (image précédente encore en vol)
+        octets (int) : Octets écrits
+    """
+    
+    def __init__(self, fd: Optional[int] = None):
+        self.is_windows = sys.platform == 'win32'
+        self.fd = sys.stdout.fileno() if fd is None else fd
+        self.images = 0
+        self.sautees = 0
+        self.octets = 0
+        self._en_vol = memoryview(b"")
+        self._fd_ecriture = self.fd
+    
+    def __enter__(self):
+        """Ouvre le descripteur non bloquant des images"""
+        sys.stdout.flush()
+        if not self.is_windows:
+            self._fd_ecriture = self._ouvrir_non_bloquant()
+        return self
+    
+    def _ouvrir_non_bloquant(self) -> int:
+        """
+        Rouvre la sortie dans une nouvelle description de fichier non bloquante
+        
+        O_NONBLOCK est porté par la description de fichier, partagée par
+        os.dup et par les processus qui ont hérité de la sortie (ou de
+        l'entrée, souvent le même terminal) : la poser sur sys.stdout
+        ferait échouer leurs écritures. Retourne self.fd si la sortie ne
+        peut pas être rouverte.
+        """
+        try:
+            return os.open(os.ttyname(self.fd), os.O_WRONLY | os.O_NOCTTY | os.O_NONBLOCK)
+        except OSError:
+            pass
+        try:
+            if not stat.S_ISFIFO(os.fstat(self.fd).st_mode):
+                return self.fd
+            # Tube : /proc/self/fd (Linux) en ouvre une nouvelle description
+            bloquant = os.get_blocking(self.fd)
+            fd = os.open(f"/proc/self/fd/{self.fd}", os.O_WRONLY | os.O_NONBLOCK)
+        except OSError:
+            return self.fd
+        if bloquant and not os.get_blocking(self.fd):
+            # Description partagée malgré tout (/proc émulé) : rétablir et écrire en bloquant
+            os.set_blocking(self.fd, True)
+            os.close(fd)
+            return self.fd
+        return fd
+    
+    def __exit__(self, *args):
+        """Termine l'image en vol puis ferme le descripteur des images"""
+        if self._fd_ecriture == self.fd:
+            return
+        os.set_blocking(self._fd_ecriture, True)
+        while self._en_vol:
+            self._en_vol = self._en_vol[os.write(self._fd_ecriture, self._en_vol):]
+        os.close(self._fd_ecriture)
+        self._fd_ecriture = self.fd
+    
+    @property
+    def octets_en_vol(self) -> int:
+        return len(self._en_vol)
+    
+    def poursuivre(self) -> int:
+        """Écrit ce que le terminal accepte de l'image en vol, retourne les octets restants"""
+        while self._en_vol:
+            try:
+                ecrits = os.write(self._fd_ecriture, self._en_vol)
+            except BlockingIOError:
+                break
+            self.octets += ecrits
+            self._en_vol = self._en_vol[ecrits:]
+        return len(self._en_vol)
+    
+    def pret(self) -> bool:
+        """Vrai si l'image précédente est entièrement partie"""
+        return self.poursuivre() == 0
+    
+    def afficher(self, texte: str) -> bool:
+        """Écrit une image, ou la saute si la précédente est encore en vol"""
+        if self.is_windows:
+            print(texte, end='', flush=True)
+            self.images += 1
+            return True
+        if not self.pret():
+            self.sauter()
+            return False
+        self._en_vol = memoryview(texte.encode(sys.stdout.encoding or "utf-8", errors="replace"))
+        self.images += 1
+        self.poursuivre()
+        return True
+    
+    def sauter(self):
+        """Compte une image non rendue"""
+        self.sautees += 1
+
+
 # ==============================================================================
 # THREADS POUR L'ANIMATION ET LA MUSIQUE
 # ==============================================================================
@@ -360,22 +453,37 @@ class MusiqueThread(threading.Thread):
             return self.notes[self.index]
 
 
-class SpawnerThread(threading.Thread):
-    """Thread pour faire apparaître les ennemis"""
+def secondes_en_frames(secondes: float) -> int:
+    """Durée en secondes convertie en frames du moteur (au moins 1)"""
+    return max(1, round(secondes / ConfigDifficulte.VITESSE_MAJ))
+
+
+class Apparitions:
+    """Apparitions d'ennemis et de bonus, programmées dans les minuteries du moteur"""
     
     def __init__(self, game_engine: GameEngine):
-        super().__init__(daemon=True)
         self.game_engine = game_engine
-        self.actif = True
-        self.intervalle = ConfigDifficulte.SPAWN_INITIAL
-        self.vitesse = ConfigDifficulte.VITESSE_INITIALE
+        game_engine.programmer_apparitions(
+            secondes_en_frames(ConfigDifficulte.SPAWN_INITIAL),
+            ConfigDifficulte.VITESSE_INITIALE
+        )
+        self._programmer_bonus()
     
-    def run(self):
-        """Fait apparaître des ennemis périodiquement"""
-        while self.actif and not self.game_engine.jeu_termine:
-            time.sleep(self.intervalle)
-            if not self.game_engine.jeu_termine:
-                self.game_engine.ajouter_ennemi(self.vitesse)
+    def _programmer_bonus(self):
+        """Programme la prochaine chance de bonus après un intervalle aléatoire"""
+        temps_attente = self.game_engine.aleatoire.uniform(
+            ConfigDifficulte.INTERVALLE_BONUS_MIN,
+            ConfigDifficulte.INTERVALLE_BONUS_MAX
+        )
+        self.game_engine.minuteries.programmer(
+            self.game_engine.frame_count + secondes_en_frames(temps_attente), self._apparition_bonus
+        )
+    
+    def _apparition_bonus(self):
+        """Fait peut-être apparaître un bonus, puis programme la chance suivante"""
+        if self.game_engine.aleatoire.random() < ConfigDifficulte.CHANCE_BONUS:
+            self.game_engine.ajouter_bonus()
+        self._programmer_bonus()
     
     def ajuster_difficulte(self, ennemis_detruits):
         """Ajuste la difficulté en fonction du nombre d'ennemis détruits"""
@@ -384,49 +492,17 @@ class SpawnerThread(threading.Thread):
         # Augmenter la vitesse progressivement
         palier = ennemis_detruits // ConfigDifficulte.ENNEMIS_PAR_PALIER
         multiplicateur = 1.0 + (palier * 0.08)
-        self.vitesse = min(
+        self.game_engine.vitesse_apparition = min(
             ConfigDifficulte.VITESSE_INITIALE * multiplicateur, 
             ConfigDifficulte.VITESSE_MAX
         )
         
         # Réduire l'intervalle de spawn
         reduction = (niveau - 1) * 0.3
-        self.intervalle = max(
+        self.game_engine.intervalle_apparition = secondes_en_frames(max(
             ConfigDifficulte.SPAWN_MIN, 
             ConfigDifficulte.SPAWN_INITIAL - reduction
-        )
-    
-    def arreter(self):
-        """Arrête le spawner"""
-        self.actif = False
-
-
-class BonusSpawnerThread(threading.Thread):
-    """Thread pour faire apparaître les bonus"""
-    
-    def __init__(self, game_engine: GameEngine):
-        super().__init__(daemon=True)
-        self.game_engine = game_engine
-        self.actif = True
-    
-    def run(self):
-        """Fait apparaître des bonus aléatoirement"""
-        while self.actif and not self.game_engine.jeu_termine:
-            # Attendre un intervalle aléatoire
-            temps_attente = random.uniform(
-                ConfigDifficulte.INTERVALLE_BONUS_MIN,
-                ConfigDifficulte.INTERVALLE_BONUS_MAX
-            )
-            time.sleep(temps_attente)
-            
-            if not self.game_engine.jeu_termine:
-                # Chance de faire apparaître un bonus
-                if random.random() < ConfigDifficulte.CHANCE_BONUS:
-                    self.game_engine.ajouter_bonus()
-    
-    def arreter(self):
-        """Arrête le spawner de bonus"""
-        self.actif = False
+        ))
 
 
 # ==============================================================================
@@ -455,6 +531,15 @@ class Couleur:
     BG_BLUE = '\033[44m'
 
 
+# Cellules colorées de la grille (la couleur du vaisseau change à chaque image, voir rendre_grille)
+CELLULES = {
+    'O': f"{Couleur.RED}{Couleur.BOLD}O{Couleur.RESET}",                        # Ennemi
+    '|': f"{Couleur.YELLOW}{Couleur.BOLD}|{Couleur.RESET}",                     # Projectile
+    **dict.fromkeys(['+', '>', '=', '≡', '!'], f"{Couleur.CYAN}{Couleur.BOLD}*{Couleur.RESET}"),  # Bonus
+}
+BORD_GRILLE = f"{Couleur.CYAN}|{Couleur.RESET}"
+
+
 def nettoyer_ecran():
     """Nettoie l'écran du terminal"""
     if sys.platform == 'win32':
@@ -464,8 +549,9 @@ def nettoyer_ecran():
         print('\033[2J\033[H', end='', flush=True)
 
 
-def afficher_grille(game_engine: GameEngine, musique: MusiqueThread, ennemis_detruits: int, temps_debut: float):
-    """Affiche la grille de jeu - version optimisée avec buffer pour éviter le clignotement"""
+def rendre_grille(game_engine: GameEngine, musique: Optional[MusiqueThread], ennemis_detruits: int,
+                  temps_debut: float) -> str:
+    """Construit l'image complète de la grille de jeu (sans l'afficher)"""
     
     # Construire tout l'affichage dans un buffer
     buffer = StringIO()
@@ -481,33 +567,23 @@ def afficher_grille(game_engine: GameEngine, musique: MusiqueThread, ennemis_det
     # Vaisseau invincible ?
     invincible = game_engine.frame_count <= game_engine.vaisseau.invincible_jusqu_a
     
-    # Grille
+    # Vaisseau (clignote pendant l'invincibilité)
+    if invincible and (game_engine.frame_count % 4) < 2:
+        vaisseau = f"{Couleur.YELLOW}{Couleur.BOLD}^{Couleur.RESET}"
+    else:
+        couleur = Couleur.CYAN
+        if game_engine.vaisseau.tir_triple:
+            couleur = Couleur.RED
+        elif game_engine.vaisseau.tir_double:
+            couleur = Couleur.YELLOW
+        vaisseau = f"{couleur}{Couleur.BOLD}^{Couleur.RESET}"
+    cellules = {**CELLULES, '^': vaisseau}
+    
+    # Grille : une ligne par jointure, les cases vides restent des espaces
     for ligne in grille:
-        buffer.write(f"{Couleur.CYAN}|{Couleur.RESET}")
-        for char in ligne:
-            if char == '^':
-                # Vaisseau
-                if invincible and (game_engine.frame_count % 4) < 2:
-                    buffer.write(f"{Couleur.YELLOW}{Couleur.BOLD}^{Couleur.RESET}")
-                else:
-                    couleur = Couleur.CYAN
-                    if game_engine.vaisseau.tir_triple:
-                        couleur = Couleur.RED
-                    elif game_engine.vaisseau.tir_double:
-                        couleur = Couleur.YELLOW
-                    buffer.write(f"{couleur}{Couleur.BOLD}^{Couleur.RESET}")
-            elif char == 'O':
-                # Ennemi
-                buffer.write(f"{Couleur.RED}{Couleur.BOLD}O{Couleur.RESET}")
-            elif char == '|':
-                # Projectile
-                buffer.write(f"{Couleur.YELLOW}{Couleur.BOLD}|{Couleur.RESET}")
-            elif char in ['+', '>', '=', '≡', '!']:
-                # Bonus
-                buffer.write(f"{Couleur.CYAN}{Couleur.BOLD}*{Couleur.RESET}")
-            else:
-                buffer.write(' ')
-        buffer.write(f"{Couleur.CYAN}|{Couleur.RESET}\n")
+        buffer.write(BORD_GRILLE)
+        buffer.write("".join([cellules.get(char, ' ') for char in ligne]))
+        buffer.write(BORD_GRILLE + "\n")
     
     # Bordure inférieure
     buffer.write(f"{Couleur.CYAN}+{'─' * game_engine.largeur}+{Couleur.RESET}\n")
@@ -535,7 +611,7 @@ def afficher_grille(game_engine: GameEngine, musique: MusiqueThread, ennemis_det
         buffer.write(f"{Couleur.MAGENTA}Bonus: {', '.join(bonus_actifs)}{Couleur.RESET} | ")
     
     # Musique
-    if PYGAME_AVAILABLE:
+    if PYGAME_AVAILABLE and musique is not None:
         note = "♪" if not musique.en_pause else "X"
         buffer.write(f"Musique: {note}")
     
@@ -548,32 +624,108 @@ def afficher_grille(game_engine: GameEngine, musique: MusiqueThread, ennemis_det
     if invincible:
         buffer.write(f"{Couleur.YELLOW}*** INVINCIBLE ***{Couleur.RESET}\n")
     
+    return buffer.getvalue()
+
+
+def afficher_grille(game_engine: GameEngine, musique: MusiqueThread, ennemis_detruits: int, temps_debut: float,
+                    ecran: Optional[EcranNonBloquant] = None) -> str:
+    """Affiche la grille de jeu - version optimisée avec buffer pour éviter le clignotement"""
+    
     # Afficher tout d'un coup (évite le clignotement)
-    output = buffer.getvalue()
+    output = rendre_grille(game_engine, musique, ennemis_detruits, temps_debut)
     
     # Utiliser les codes ANSI pour repositionner le curseur (plus rapide que cls)
     # \033[H repositionne en haut à gauche, \033[2J efface l'écran si nécessaire
-    print('\033[H' + output, end='', flush=True)
+    if ecran is not None:
+        ecran.afficher('\033[H' + output)
+    else:
+        print('\033[H' + output, end='', flush=True)
+    return output
+
+
+def rendre_bilan(game_engine: GameEngine, nom_joueur: str, ennemis_detruits: int, temps_debut: float) -> str:
+    """Construit le bilan de fin de partie (sans l'afficher)"""
+    temps_total = int(time.time() - temps_debut)
+    minutes = temps_total // 60
+    secondes = temps_total % 60
+    
+    buffer = StringIO()
+    buffer.write("\n")
+    buffer.write(f"  {Couleur.BOLD}{Couleur.CYAN}╔{'═' * 50}╗{Couleur.RESET}\n")
+    if game_engine.vaisseau.vies > 0:
+        buffer.write(f"  {Couleur.BOLD}{Couleur.CYAN}║{Couleur.YELLOW}          PARTIE TERMINÉE - VICTOIRE ! 🎉          {Couleur.CYAN}║{Couleur.RESET}\n")
+    else:
+        buffer.write(f"  {Couleur.BOLD}{Couleur.CYAN}║{Couleur.RED}            GAME OVER - DÉFAITE 💀               {Couleur.CYAN}║{Couleur.RESET}\n")
+    buffer.write(f"  {Couleur.BOLD}{Couleur.CYAN}╚{'═' * 50}╝{Couleur.RESET}\n")
+    buffer.write("\n")
+    buffer.write(f"  {Couleur.GREEN}Joueur:{Couleur.RESET} {Couleur.BOLD}{nom_joueur}{Couleur.RESET}\n")
+    buffer.write(f"  {Couleur.GREEN}Score final:{Couleur.RESET} {Couleur.BOLD}{game_engine.score}{Couleur.RESET} points\n")
+    buffer.write(f"  {Couleur.MAGENTA}Niveau atteint:{Couleur.RESET} {Couleur.BOLD}{1 + (ennemis_detruits // ConfigDifficulte.ENNEMIS_PAR_NIVEAU)}{Couleur.RESET}\n")
+    buffer.write(f"  {Couleur.YELLOW}Temps de jeu:{Couleur.RESET} {Couleur.BOLD}{minutes:02d}:{secondes:02d}{Couleur.RESET}\n")
+    buffer.write(f"  {Couleur.BLUE}Ennemis détruits:{Couleur.RESET} {Couleur.BOLD}{ennemis_detruits}{Couleur.RESET}\n")
+    buffer.write("\n")
+    return buffer.getvalue()
 
 
 # ==============================================================================
 # BOUCLE PRINCIPALE
 # ==============================================================================
 
-def boucle_jeu(game_engine: GameEngine, nom_joueur: str):
-    """Boucle principale du jeu - version optimisée"""
-    
-    # Appliquer les paramètres de configuration au vaisseau
+def preparer_partie(game_engine: GameEngine) -> Apparitions:
+    """Réglages console du vaisseau, programme les apparitions ; retourne le gestionnaire d'apparitions"""
     game_engine.vaisseau.cooldown_tir = ConfigDifficulte.COOLDOWN_TIR_NORMAL
     
-    # Threads
+    # Augmenter la vitesse du vaisseau pour une meilleure jouabilité console
+    game_engine.vaisseau.vitesse_base = min(3.5, game_engine.vaisseau.vitesse_base * 1.5)
+    return Apparitions(game_engine)
+
+
+def avancer_frame(game_engine: GameEngine, spawner: Apparitions, ennemis_detruits: int) -> int:
+    """Une frame de jeu (cadence de tir selon les bonus, difficulté), retourne le total d'ennemis détruits"""
+    
+    # Mise à jour du jeu
+    game_engine.mettre_a_jour()
+    
+    # Ajuster le cooldown de tir selon les bonus actifs
+    if "tir_rapide" in game_engine.vaisseau.bonus_actif_jusqu_a:
+        game_engine.vaisseau.cooldown_tir = ConfigDifficulte.COOLDOWN_TIR_RAPIDE
+    else:
+        game_engine.vaisseau.cooldown_tir = ConfigDifficulte.COOLDOWN_TIR_NORMAL
+    
+    ennemis_tues = sum(1 for evenement in game_engine.vider_evenements()
+                       if evenement.type == ENNEMI_DETRUIT)
+    
+    if ennemis_tues:
+        ennemis_detruits += ennemis_tues
+        spawner.ajuster_difficulte(ennemis_detruits)
+    return ennemis_detruits
+
+
+def appliquer_touche(game_engine: GameEngine, touche: str) -> bool:
+    """Déplacement (ZQSD ou flèches) ou tir ; retourne False si la touche n'en est pas un"""
+    if touche == 'q' or touche == 'LEFT':
+        game_engine.vaisseau.deplacer_gauche()
+    elif touche == 'd' or touche == 'RIGHT':
+        game_engine.vaisseau.deplacer_droite()
+    elif touche == 'z' or touche == 'UP':
+        game_engine.vaisseau.deplacer_haut()
+    elif touche == 's' or touche == 'DOWN':
+        game_engine.vaisseau.deplacer_bas()
+    elif touche == ' ':
+        game_engine.tirer()
+    else:
+        return False
+    return True
+
+
+def boucle_jeu(game_engine: GameEngine, nom_joueur: str, diffuseur: Optional[DiffuseurSpectateurs] = None):
+    """Boucle principale du jeu - version optimisée (diffusée aux spectateurs si diffuseur est fourni)"""
+    
+    # Paramètres de configuration du vaisseau ; musique en thread, apparitions dans les minuteries du moteur
     musique = MusiqueThread()
-    spawner = SpawnerThread(game_engine)
-    bonus_spawner = BonusSpawnerThread(game_engine)
+    spawner = preparer_partie(game_engine)
     
     musique.start()
-    spawner.start()
-    bonus_spawner.start()
     
     temps_debut = time.time()
     ennemis_detruits = 0
@@ -583,6 +735,8 @@ def boucle_jeu(game_engine: GameEngine, nom_joueur: str):
     nettoyer_ecran()
     print(f"\n  {Couleur.GREEN}{Couleur.BOLD}Bienvenue {nom_joueur} !{Couleur.RESET}")
     print(f"  {Couleur.YELLOW}Taille du jeu: {game_engine.largeur}×{game_engine.hauteur}{Couleur.RESET}")
+    if diffuseur is not None:
+        print(f"  {Couleur.CYAN}📡 Spectateurs : nc localhost {diffuseur.port}{Couleur.RESET}")
     print()
     print(f"  {Couleur.YELLOW}💡 CONSEIL:{Couleur.RESET} {Couleur.CYAN}Mettez votre terminal en PLEIN ÉCRAN maintenant !{Couleur.RESET}")
     print(f"  {Couleur.GRAY}(F11 ou clic sur le bouton maximiser){Couleur.RESET}")
@@ -592,8 +746,9 @@ def boucle_jeu(game_engine: GameEngine, nom_joueur: str):
     # Effacer l'écran une seule fois au début
     nettoyer_ecran()
     
-    # Clavier non-bloquant
-    with ClavierNonBloquant() as clavier:
+    # Clavier et écran non-bloquants
+    with ClavierNonBloquant() as clavier, EcranNonBloquant() as ecran:
+        debut_boucle = time.time()
         derniere_update = time.time()
         derniere_frame = time.time()
         derniere_affichage = time.time()
@@ -606,47 +761,29 @@ def boucle_jeu(game_engine: GameEngine, nom_joueur: str):
             # Contrôler le framerate
             if delta >= ConfigDifficulte.VITESSE_MAJ:
                 derniere_frame = maintenant
-                
-                # Mise à jour du jeu
-                ennemis_avant = len([e for e in game_engine.ennemis if e.actif])
-                game_engine.mettre_a_jour()
-                
-                # Ajuster le cooldown de tir selon les bonus actifs
-                if "tir_rapide" in game_engine.vaisseau.bonus_actif_jusqu_a:
-                    game_engine.vaisseau.cooldown_tir = ConfigDifficulte.COOLDOWN_TIR_RAPIDE
-                else:
-                    game_engine.vaisseau.cooldown_tir = ConfigDifficulte.COOLDOWN_TIR_NORMAL
-                
-                ennemis_apres = len([e for e in game_engine.ennemis if e.actif])
-                
-                if ennemis_apres < ennemis_avant:
-                    ennemis_tues = ennemis_avant - ennemis_apres
-                    ennemis_detruits += ennemis_tues
-                    spawner.ajuster_difficulte(ennemis_detruits)
+                ennemis_detruits = avancer_frame(game_engine, spawner, ennemis_detruits)
             
             # Afficher moins souvent pour éviter le clignotement (15 FPS au lieu de 30)
             if delta_affichage >= 0.067:  # environ 15 FPS
                 derniere_affichage = maintenant
-                afficher_grille(game_engine, musique, ennemis_detruits, temps_debut)
+                # Rendre seulement si l'image précédente a quitté le terminal (ou pour les spectateurs)
+                if ecran.pret() or diffuseur is not None:
+                    image = afficher_grille(game_engine, musique, ennemis_detruits, temps_debut, ecran)
+                    if diffuseur is not None:
+                        diffuseur.publier(image)
+                else:
+                    ecran.sauter()
+            else:
+                # Continuer l'image en vol sans attendre le terminal
+                ecran.poursuivre()
             
             # Lire les touches (sans bloquer)
             touche = clavier.lire_touche()
             
-            if touche:
-                # Déplacements (ZQSD ou flèches)
-                if touche == 'q' or touche == 'LEFT':
-                    game_engine.vaisseau.deplacer_gauche()
-                elif touche == 'd' or touche == 'RIGHT':
-                    game_engine.vaisseau.deplacer_droite()
-                elif touche == 'z' or touche == 'UP':
-                    game_engine.vaisseau.deplacer_haut()
-                elif touche == 's' or touche == 'DOWN':
-                    game_engine.vaisseau.deplacer_bas()
-                # Tir
-                elif touche == ' ':
-                    game_engine.tirer()
+            # Déplacements et tir, puis touches propres à la version locale
+            if touche and not appliquer_touche(game_engine, touche):
                 # Musique
-                elif touche == 'p':
+                if touche == 'p':
                     musique_en_pause = not musique_en_pause
                     if musique_en_pause:
                         musique.pause()
@@ -659,33 +796,21 @@ def boucle_jeu(game_engine: GameEngine, nom_joueur: str):
             
             # Petit délai pour éviter de surcharger le CPU
             time.sleep(ConfigDifficulte.VITESSE_INPUT)
+        
+        duree_boucle = max(time.time() - debut_boucle, 1e-6)
     
     # Arrêter les threads
     musique.arreter()
-    spawner.arreter()
-    bonus_spawner.arreter()
     
     # Affichage final
     nettoyer_ecran()
     afficher_grille(game_engine, musique, ennemis_detruits, temps_debut)
+    print(rendre_bilan(game_engine, nom_joueur, ennemis_detruits, temps_debut), end='')
     
-    temps_total = int(time.time() - temps_debut)
-    minutes = temps_total // 60
-    secondes = temps_total % 60
-    
-    print()
-    print(f"  {Couleur.BOLD}{Couleur.CYAN}╔{'═' * 50}╗{Couleur.RESET}")
-    if game_engine.vaisseau.vies > 0:
-        print(f"  {Couleur.BOLD}{Couleur.CYAN}║{Couleur.YELLOW}          PARTIE TERMINÉE - VICTOIRE ! 🎉          {Couleur.CYAN}║{Couleur.RESET}")
-    else:
-        print(f"  {Couleur.BOLD}{Couleur.CYAN}║{Couleur.RED}            GAME OVER - DÉFAITE 💀               {Couleur.CYAN}║{Couleur.RESET}")
-    print(f"  {Couleur.BOLD}{Couleur.CYAN}╚{'═' * 50}╝{Couleur.RESET}")
-    print()
-    print(f"  {Couleur.GREEN}Joueur:{Couleur.RESET} {Couleur.BOLD}{nom_joueur}{Couleur.RESET}")
-    print(f"  {Couleur.GREEN}Score final:{Couleur.RESET} {Couleur.BOLD}{game_engine.score}{Couleur.RESET} points")
-    print(f"  {Couleur.MAGENTA}Niveau atteint:{Couleur.RESET} {Couleur.BOLD}{1 + (ennemis_detruits // ConfigDifficulte.ENNEMIS_PAR_NIVEAU)}{Couleur.RESET}")
-    print(f"  {Couleur.YELLOW}Temps de jeu:{Couleur.RESET} {Couleur.BOLD}{minutes:02d}:{secondes:02d}{Couleur.RESET}")
-    print(f"  {Couleur.BLUE}Ennemis détruits:{Couleur.RESET} {Couleur.BOLD}{ennemis_detruits}{Couleur.RESET}")
+    # Cadences mesurées : simulation et affichage sont indépendants
+    print(f"  {Couleur.GRAY}Jeu : {game_engine.frame_count / duree_boucle:.1f} frames/s  │  "
+          f"Affichage : {ecran.images / duree_boucle:.1f} images/s "
+          f"({ecran.sautees} sautée(s) en attendant le terminal){Couleur.RESET}")
     print()
 
 
@@ -696,6 +821,11 @@ def boucle_jeu(game_engine: GameEngine, nom_joueur: str):
 def main():
     """Fonction principale"""
     
+    parser = argparse.ArgumentParser(description="Shooter Spatial - version console")
+    parser.add_argument("--spectateurs", type=int, metavar="PORT",
+                        help="Diffuser la partie aux spectateurs sur ce port (nc localhost PORT)")
+    args = parser.parse_args()
+    
     # Configurer le terminal Windows (plein écran)
     configurer_terminal_windows()
     
@@ -727,14 +857,24 @@ def main():
     if not nom_joueur:
         nom_joueur = "Joueur"
     
+    # Charger les scores (écrits en arrière-plan avec l'export HTML, voir persistance.py)
+    score_manager = ScoreManager()
+    ecrivain = EcrivainGroupe(score_manager, apres_lot=score_manager.exporter_html)
+    
+    # Pseudo inconnu mais proche d'un joueur existant (casse, faute de frappe)
+    suggestions = score_manager.suggerer_pseudos(nom_joueur, limite=1)
+    if suggestions:
+        reponse = input(f"{Couleur.YELLOW}Vouliez-vous dire{Couleur.RESET} "
+                        f"{Couleur.BOLD}{suggestions[0]}{Couleur.RESET} ? (o/N) ").strip().lower()
+        if reponse in ("o", "oui", "y", "yes"):
+            nom_joueur = suggestions[0]
+    
     # Message conseil pour le plein écran
     print()
     print(f"{Couleur.YELLOW}💡 CONSEIL:{Couleur.RESET} {Couleur.CYAN}Mettez votre terminal en PLEIN ÉCRAN pour une meilleure expérience de jeu !{Couleur.RESET}")
     print(f"{Couleur.GRAY}   (F11 ou clic sur le bouton maximiser){Couleur.RESET}")
     print()
     
-    # Charger les scores
-    score_manager = ScoreManager()
     meilleur_score = score_manager.obtenir_meilleur_score(nom_joueur)
     
     if meilleur_score > 0:
@@ -743,19 +883,37 @@ def main():
     # Créer le jeu avec adaptation automatique de la taille (version console facilitée)
     game_engine = GameEngineConsole(largeur=largeur, hauteur=hauteur)
     
-    # Augmenter la vitesse du vaisseau pour une meilleure jouabilité console
-    game_engine.vaisseau.vitesse_base = min(3.5, game_engine.vaisseau.vitesse_base * 1.5)
+    # Diffusion aux spectateurs (optionnelle)
+    diffuseur = None
+    if args.spectateurs is not None:
+        diffuseur = DiffuseurSpectateurs(port=args.spectateurs)
+        try:
+            diffuseur.demarrer()
+        except OSError as e:
+            print(f"\n{Couleur.RED}⚠️  Diffusion impossible sur le port {args.spectateurs}: {e}{Couleur.RESET}")
+            diffuseur = None
     
     # Lancer le jeu
-    boucle_jeu(game_engine, nom_joueur)
+    boucle_jeu(game_engine, nom_joueur, diffuseur)
+    if diffuseur is not None:
+        diffuseur.arreter()
     
-    # Enregistrer le score
+    # Enregistrer le score : on n'attend que l'ajout au journal, pas la réécriture de scores.json
     try:
-        nouveau_record = score_manager.enregistrer_score(nom_joueur, game_engine.score)
+        nouveau_record = ecrivain.soumettre(nom_joueur, game_engine.score).result(
+            timeout=ConfigDifficulte.ATTENTE_SCORE_MAX)
         
         if nouveau_record:
             print(f"  {Couleur.BOLD}{Couleur.YELLOW}🏆 NOUVEAU RECORD PERSONNEL ! 🏆{Couleur.RESET}")
             print()
+        
+        rang, nb_joueurs = score_manager.obtenir_rang(game_engine.score)
+        percentile = score_manager.obtenir_percentile(game_engine.score)
+        print(f"  {Couleur.CYAN}Classement:{Couleur.RESET} {Couleur.BOLD}#{rang}{Couleur.RESET} sur {nb_joueurs} joueur(s)"
+              f"  │  meilleur que {Couleur.BOLD}{percentile}%{Couleur.RESET} des parties")
+        print()
+    except FuturTimeoutError:
+        print(f"  {Couleur.YELLOW}⚠️  Score toujours en cours d'écriture, classement indisponible{Couleur.RESET}")
     except Exception as e:
         print(f"  {Couleur.RED}Erreur lors de l'enregistrement du score: {e}{Couleur.RESET}")
     
@@ -795,12 +953,9 @@ def main():
     print(f"  {Couleur.BOLD}{Couleur.CYAN}╚{'═' * 50}╝{Couleur.RESET}")
     print()
     
-    # Exporter le leaderboard HTML
-    try:
-        score_manager.exporter_html()
-        print(f"  {Couleur.GREEN}✅ Leaderboard HTML mis à jour !{Couleur.RESET}")
-    except Exception as e:
-        print(f"  {Couleur.RED}⚠️  Erreur lors de l'export HTML: {e}{Couleur.RESET}")
+    # Réécrire scores.json avec la partie du journal avant de quitter
+    # (le leaderboard HTML est exporté par le thread d'écriture après le lot)
+    ecrivain.arreter()
     
     print()
     
@@ -12,10 +12,12 @@ import threading
 import time
 import random
 import webbrowser
+from concurrent.futures import TimeoutError as FuturTimeoutError
 from pathlib import Path
 from typing import Optional
-from game_classes import GameEngine
+from game_classes import GameEngine, ENNEMI_DETRUIT
 from score_manager import ScoreManager
+from persistance import EcrivainGroupe
 
 # Pour la musique
 try:
@@ -31,6 +33,8 @@ class Config:
     SPAWN_INITIAL = 3000
     SPAWN_MIN = 1200
     CHANCE_BONUS = 0.30
+    DUREE_FRAME = 50  # ms entre deux frames du moteur
+    ATTENTE_SCORE_MAX = 2.0  # secondes avant d'afficher la fin de partie sans le classement
 
 
 def obtenir_dimensions_ecran(root):
@@ -701,6 +705,8 @@ class ShooterGUI:
         )
         
         self.score_manager = ScoreManager()
+        # Scores et export HTML écrits en arrière-plan (vidé à la fermeture, voir main)
+        self.ecrivain = EcrivainGroupe(self.score_manager, apres_lot=self.score_manager.exporter_html)
         self.nom_joueur = ""
         self.jeu_en_cours = False
         
@@ -711,7 +717,6 @@ class ShooterGUI:
         
         self.musique = None
         self.timer_jeu = None
-        self.timer_spawn = None
         self.timer_chrono = None
         self.temps_debut = 0
         
@@ -824,10 +829,19 @@ class ShooterGUI:
             self.etoiles.append(EtoileAnimee(x, y, vitesse, taille, couleur, self.HAUTEUR_JEU, self.LARGEUR_PIXELS))
     
     def lancer_jeu(self):
-        self.nom_joueur = simpledialog.askstring(
+        nom = simpledialog.askstring(
             "Nom", "Votre nom:", parent=self.root
         ) or "Joueur"
         
+        # Pseudo inconnu mais proche d'un joueur existant (casse, faute de frappe)
+        suggestions = self.score_manager.suggerer_pseudos(nom, limite=1)
+        if suggestions and messagebox.askyesno(
+            "Nom", f"Vouliez-vous dire « {suggestions[0]} » ?\n\n"
+                   f"(Non : jouer sous le nom « {nom} »)", parent=self.root
+        ):
+            nom = suggestions[0]
+        self.nom_joueur = nom
+        
         self.menu.masquer()
         self.creer_interface_jeu()
         self.reinitialiser_jeu()
@@ -1036,8 +1050,11 @@ class ShooterGUI:
             except Exception as e:
                 print(f"⚠️ Impossible de démarrer la musique: {e}")
         
+        # Apparitions comptées en frames du moteur (la première tout de suite)
+        self.game_engine.programmer_apparitions(
+            self.intervalle_en_frames(), self.vitesse_actuelle, Config.CHANCE_BONUS, premiere=0
+        )
         self.boucle_jeu()
-        self.spawn_ennemis()
         self.mettre_a_jour_chrono()
     
     def toggle_musique(self):
@@ -1088,8 +1105,6 @@ class ShooterGUI:
         
         if self.timer_jeu:
             self.root.after_cancel(self.timer_jeu)
-        if self.timer_spawn:
-            self.root.after_cancel(self.timer_spawn)
         if self.timer_chrono:
             self.root.after_cancel(self.timer_chrono)
         
@@ -1107,16 +1122,9 @@ class ShooterGUI:
         self.label_temps.config(text=f"Temps: {temps}s")
         self.timer_chrono = self.root.after(1000, self.mettre_a_jour_chrono)
     
-    def spawn_ennemis(self):
-        if not self.jeu_en_cours:
-            return
-        
-        self.game_engine.ajouter_ennemi(self.vitesse_actuelle)
-        
-        if random.random() < Config.CHANCE_BONUS:
-            self.game_engine.ajouter_bonus()
-        
-        self.timer_spawn = self.root.after(self.intervalle_spawn, self.spawn_ennemis)
+    def intervalle_en_frames(self) -> int:
+        """Intervalle entre deux apparitions (ms) converti en frames du moteur"""
+        return max(1, round(self.intervalle_spawn / Config.DUREE_FRAME))
     
     def augmenter_difficulte(self):
         if self.ennemis_detruits % 10 == 0 and self.ennemis_detruits > 0:
@@ -1128,6 +1136,10 @@ class ShooterGUI:
             if self.intervalle_spawn > Config.SPAWN_MIN:
                 self.intervalle_spawn = max(Config.SPAWN_MIN, self.intervalle_spawn - 200)
             
+            # Pris en compte dès l'apparition suivante
+            self.game_engine.vitesse_apparition = self.vitesse_actuelle
+            self.game_engine.intervalle_apparition = self.intervalle_en_frames()
+            
             print(f"\n🔥 NIVEAU {self.niveau_difficulte} ! Vitesse: {self.vitesse_actuelle:.1f} | Spawn: {self.intervalle_spawn}ms\n")
     
     def boucle_jeu(self):
@@ -1145,12 +1157,11 @@ class ShooterGUI:
         if self.touches['space']:
             self.game_engine.tirer()
         
-        ennemis_avant = sum(1 for e in self.game_engine.ennemis if e.actif)
         self.game_engine.mettre_a_jour()
-        ennemis_apres = sum(1 for e in self.game_engine.ennemis if e.actif)
+        nb_tues = sum(1 for evenement in self.game_engine.vider_evenements()
+                      if evenement.type == ENNEMI_DETRUIT)
         
-        if ennemis_apres < ennemis_avant:
-            nb_tues = ennemis_avant - ennemis_apres
+        if nb_tues:
             self.ennemis_detruits += nb_tues
             print(f"💥 {nb_tues} ennemi(s) détruit(s) ! Total: {self.ennemis_detruits} | Score: {self.game_engine.score}")
             self.augmenter_difficulte()
@@ -1161,7 +1172,7 @@ class ShooterGUI:
         
         self.mettre_a_jour_interface()
         
-        self.timer_jeu = self.root.after(50, self.boucle_jeu)
+        self.timer_jeu = self.root.after(Config.DUREE_FRAME, self.boucle_jeu)
     
     def mettre_a_jour_interface(self):
         self.label_score.config(text=f"Score: {self.game_engine.score} | Niveau: {self.niveau_difficulte}")
@@ -1280,8 +1291,6 @@ class ShooterGUI:
         
         if self.timer_jeu:
             self.root.after_cancel(self.timer_jeu)
-        if self.timer_spawn:
-            self.root.after_cancel(self.timer_spawn)
         if self.timer_chrono:
             self.root.after_cancel(self.timer_chrono)
         
@@ -1290,16 +1299,35 @@ class ShooterGUI:
             self.musique = None
         
         temps = int(time.time() - self.temps_debut)
+        
+        # Le score part dans le thread d'écriture : la fenêtre reste réactive
+        # et l'écran de fin s'affiche dès que la partie est dans le journal
+        futur = self.ecrivain.soumettre(self.nom_joueur, self.game_engine.score)
+        self._attendre_score(futur, time.time() + Config.ATTENTE_SCORE_MAX,
+                             lambda: self._afficher_fin_de_partie(futur, temps))
+    
+    def _attendre_score(self, futur, limite, suite):
+        """Appelle `suite` quand le score est écrit (ou à `limite`), sans bloquer tkinter"""
+        if futur.done() or time.time() >= limite:
+            suite()
+        else:
+            self.root.after(10, self._attendre_score, futur, limite, suite)
+    
+    def _afficher_fin_de_partie(self, futur, temps):
         m, s = temps // 60, temps % 60
         
         try:
-            nouveau = self.score_manager.enregistrer_score(
-                self.nom_joueur, self.game_engine.score
-            )
-            self.score_manager.exporter_html()
+            nouveau = futur.result(timeout=0)
+            rang, nb_joueurs = self.score_manager.obtenir_rang(self.game_engine.score)
+            percentile = self.score_manager.obtenir_percentile(self.game_engine.score)
+        except FuturTimeoutError:
+            print("⚠️ Score toujours en cours d'écriture, classement indisponible")
+            nouveau = False
+            rang = None
         except Exception as e:
             print(f"⚠️ Erreur lors de l'enregistrement du score: {e}")
             nouveau = False
+            rang = None
         
         msg = (
             f"🎮 GAME OVER 🎮\n\n"
@@ -1310,6 +1338,12 @@ class ShooterGUI:
             f"Ennemis détruits: {self.ennemis_detruits}"
         )
         
+        if rang is not None:
+            msg += (
+                f"\n\nClassement: #{rang} sur {nb_joueurs} joueur(s)\n"
+                f"Meilleur que {percentile}% des parties"
+            )
+        
         if nouveau:
             msg += "\n\n🏆 NOUVEAU RECORD PERSONNEL ! 🏆"
         
@@ -1435,7 +1469,11 @@ class ShooterGUI:
 def main():
     root = tk.Tk()
     app = ShooterGUI(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        # Écrire les scores encore en attente avant de quitter
+        app.ecrivain.arreter()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,257 @@
+"""
+Simulation rapide (sans affichage) du Shooter Spatial
+
+Tous les objets du jeu bougent verticalement à vitesse constante : entre
+deux événements (action programmée, minuterie du moteur, collision, ennemi
+arrivé en bas, fin d'invincibilité suivie d'un contact), les positions se
+calculent d'un coup. SimulationRapide saute donc directement d'un
+événement à l'autre au lieu d'appeler mettre_a_jour() à chaque frame :
+utile pour vérifier un replay ou pour de longues parties d'équilibrage.
+
+Usage :
+    python simulation.py --frames 1000000 --intervalle 40 --vitesse 0.3 --vies 1000
+    python simulation.py --frames 100000 --comparer   # vérifie contre le frame par frame
+"""
+
+import argparse
+import heapq
+import itertools
+import math
+import sys
+import time
+from typing import Callable, Optional
+
+from game_classes import GameEngine, ObjetVolant
+
+
+def frames_avant(objet: ObjetVolant, seuil: float, strict: bool = False) -> Optional[int]:
+    """
+    Nombre de frames (>= 1) avant qu'un objet qui descend atteigne seuil
+    
+    Avec strict, l'objet doit dépasser le seuil. Retourne None si l'objet
+    ne descend pas et ne l'a pas déjà atteint.
+    """
+    def atteint(nb_frames):
+        y = objet.y_apres(nb_frames)
+        return y > seuil if strict else y >= seuil
+    
+    if atteint(1):
+        return 1
+    if objet.vitesse <= 0:
+        return None
+    
+    # Estimation linéaire, corrigée ensuite sur les positions exactes
+    nb_frames = max(2, math.ceil((seuil - objet.y) / objet.vitesse))
+    while nb_frames > 2 and atteint(nb_frames - 1):
+        nb_frames -= 1
+    while not atteint(nb_frames):
+        nb_frames += 1
+    return nb_frames
+
+
+class SimulationRapide:
+    """
+    Fait avancer un GameEngine d'événement en événement
+    
+    Les apparitions sont les minuteries du moteur (programmer_apparitions) ;
+    les actions du joueur sont programmées à l'avance (programmer,
+    programmer_periodique) : une action prévue à la frame N s'exécute quand
+    frame_count vaut N, comme le ferait une interface entre deux appels à
+    mettre_a_jour(). Le vaisseau ne bouge que dans ces actions.
+    
+    Attributs :
+        engine (GameEngine) : Moteur simulé (collisions planifiées obligatoires)
+        frames_calculees (int) : Frames passées par mettre_a_jour() (les autres ont été sautées)
+    
+    Usage :
+        engine = GameEngine(40, 20, graine=1)
+        engine.programmer_apparitions(30, vitesse=0.5)
+        simulation = SimulationRapide(engine)
+        simulation.programmer_periodique(10, lambda engine: engine.tirer())
+        simulation.avancer_jusqu_a(1_000_000)
+    """
+    
+    def __init__(self, engine: GameEngine):
+        if not engine.collisions_planifiees:
+            raise ValueError("La simulation rapide demande un moteur avec collisions_planifiees=True")
+        self.engine = engine
+        self.frames_calculees = 0
+        # Tas de (frame, ordre de programmation, action)
+        self._actions = []
+        self._ordre = itertools.count()
+    
+    def programmer(self, frame: int, action: Callable[[GameEngine], None]):
+        """Programme action(engine) pour la frame donnée"""
+        heapq.heappush(self._actions, (frame, next(self._ordre), action))
+    
+    def programmer_periodique(self, intervalle: int, action: Callable[[GameEngine], None],
+                              debut: Optional[int] = None):
+        """Programme action(engine) toutes les `intervalle` frames"""
+        def repeter(engine):
+            action(engine)
+            self.programmer(engine.frame_count + intervalle, repeter)
+        
+        self.programmer(self.engine.frame_count + intervalle if debut is None else debut, repeter)
+    
+    def _executer_actions(self):
+        """Exécute les actions prévues jusqu'à la frame courante"""
+        while self._actions and self._actions[0][0] <= self.engine.frame_count:
+            _, _, action = heapq.heappop(self._actions)
+            action(self.engine)
+    
+    def _contact_vaisseau(self, objet: ObjetVolant, marge: float, debut_min: int) -> Optional[int]:
+        """Première frame (>= debut_min) où objet touche le vaisseau immobile (None : jamais)"""
+        vaisseau = self.engine.vaisseau
+        if not (vaisseau.x - marge < objet.x + objet.largeur and
+                vaisseau.x + vaisseau.largeur + marge > objet.x):
+            return None
+        
+        entree = frames_avant(objet, vaisseau.y - marge - objet.hauteur, strict=True)
+        if entree is None:
+            return None
+        sortie = frames_avant(objet, vaisseau.y + vaisseau.hauteur + marge)
+        
+        frame = max(self.engine.frame_count + entree, debut_min)
+        if sortie is not None and frame >= self.engine.frame_count + sortie:
+            return None
+        return frame
+    
+    def prochain_evenement(self) -> Optional[int]:
+        """
+        Prochaine frame que mettre_a_jour() doit calculer (None : aucune)
+        
+        Une estimation trop tôt ne coûte qu'une frame calculée pour rien ;
+        aucune frame où il se passe quelque chose n'est jamais sautée.
+        """
+        engine = self.engine
+        engine._planifier_nouveaux()
+        frame_courante = engine.frame_count
+        candidates = []
+        
+        # Impact projectile-ennemi prévu par le moteur
+        if engine._impacts:
+            candidates.append(engine._impacts[0][0])
+        
+        # Minuterie du moteur (apparition, fin de bonus)
+        echeance = engine.minuteries.prochaine_echeance()
+        if echeance is not None:
+            candidates.append(echeance)
+        
+        # Ennemi arrivé en bas ou au contact du vaisseau (après son invincibilité)
+        fin_invincibilite = engine.vaisseau.invincible_jusqu_a + 1
+        for ennemi in engine.ennemis:
+            if not ennemi.actif:
+                continue
+            en_bas = frames_avant(ennemi, engine.hauteur - 1)
+            if en_bas is not None:
+                candidates.append(frame_courante + en_bas)
+            contact = self._contact_vaisseau(ennemi, engine.MARGE_VAISSEAU_ENNEMI, fin_invincibilite)
+            if contact is not None:
+                candidates.append(contact)
+        
+        # Bonus ramassé
+        for bonus_obj in engine.bonus:
+            if bonus_obj.actif:
+                contact = self._contact_vaisseau(bonus_obj, engine.MARGE_BONUS, frame_courante + 1)
+                if contact is not None:
+                    candidates.append(contact)
+        
+        return min(candidates) if candidates else None
+    
+    def avancer_jusqu_a(self, frame: int, sauter: bool = True):
+        """
+        Fait avancer le jeu jusqu'à la frame donnée (ou la fin de la partie)
+        
+        Avec sauter=False, chaque frame passe par mettre_a_jour() : même
+        résultat, sert de référence pour vérifier la simulation rapide.
+        """
+        engine = self.engine
+        self._executer_actions()
+        
+        while engine.frame_count < frame and not engine.jeu_termine:
+            cible = frame
+            if self._actions:
+                cible = min(cible, self._actions[0][0])
+            
+            prochain = self.prochain_evenement() if sauter else engine.frame_count + 1
+            if prochain is None or prochain > cible:
+                # Rien ne se passe d'ici la cible : un seul saut
+                engine.avancer_sans_collision(cible - engine.frame_count)
+            else:
+                if prochain - 1 > engine.frame_count:
+                    engine.avancer_sans_collision(prochain - 1 - engine.frame_count)
+                engine.mettre_a_jour()
+                self.frames_calculees += 1
+            
+            self._executer_actions()
+
+
+# ==============================================================================
+# LIGNE DE COMMANDE
+# ==============================================================================
+
+def creer_simulation(args) -> SimulationRapide:
+    """Partie d'équilibrage : apparitions régulières, vaisseau immobile qui tire"""
+    engine = GameEngine(args.largeur, args.hauteur, graine=args.graine)
+    engine.vaisseau.vies = args.vies
+    engine.programmer_apparitions(args.intervalle, args.vitesse, args.chance_bonus)
+    simulation = SimulationRapide(engine)
+    if args.tir:
+        simulation.programmer_periodique(args.tir, lambda engine: engine.tirer())
+    return simulation
+
+
+def etat(engine: GameEngine) -> tuple:
+    """Résumé comparable de l'état du jeu"""
+    return (
+        engine.frame_count, engine.score, engine.vaisseau.vies, engine.jeu_termine,
+        [(e.x, e.y) for e in engine.ennemis],
+        [(p.x, p.y) for p in engine.projectiles],
+        [(b.x, b.y, b.type) for b in engine.bonus],
+    )
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Simulation rapide du Shooter Spatial")
+    parser.add_argument("--frames", type=int, default=100000, help="Frames à simuler (défaut: 100000)")
+    parser.add_argument("--largeur", type=int, default=40, help="Largeur de la grille (défaut: 40)")
+    parser.add_argument("--hauteur", type=int, default=20, help="Hauteur de la grille (défaut: 20)")
+    parser.add_argument("--graine", type=int, default=42, help="Graine du hasard (défaut: 42)")
+    parser.add_argument("--vies", type=int, default=3, help="Vies du vaisseau (défaut: 3)")
+    parser.add_argument("--intervalle", type=int, default=60,
+                        help="Frames entre deux apparitions d'ennemi (défaut: 60)")
+    parser.add_argument("--vitesse", type=float, default=0.3, help="Vitesse des ennemis (défaut: 0.3)")
+    parser.add_argument("--chance-bonus", type=float, default=0.1,
+                        help="Probabilité d'un bonus à chaque apparition (défaut: 0.1)")
+    parser.add_argument("--tir", type=int, default=0,
+                        help="Tirer toutes les N frames (défaut: jamais)")
+    parser.add_argument("--comparer", action="store_true",
+                        help="Rejouer aussi la partie frame par frame et comparer")
+    args = parser.parse_args()
+    
+    debut = time.perf_counter()
+    simulation = creer_simulation(args)
+    simulation.avancer_jusqu_a(args.frames)
+    duree = time.perf_counter() - debut
+    
+    engine = simulation.engine
+    print(f"🎮 Frame {engine.frame_count:,} | Score: {engine.score} | Vies: {engine.vaisseau.vies}"
+          f"{' | Partie terminée' if engine.jeu_termine else ''}")
+    print(f"⏩ {simulation.frames_calculees:,} frame(s) calculée(s) en {duree:.2f}s")
+    
+    if args.comparer:
+        debut = time.perf_counter()
+        reference = creer_simulation(args)
+        reference.avancer_jusqu_a(args.frames, sauter=False)
+        duree = time.perf_counter() - debut
+        print(f"🐢 Frame par frame : {reference.frames_calculees:,} frame(s) en {duree:.2f}s")
+        if etat(reference.engine) != etat(engine):
+            print("❌ Les deux simulations divergent")
+            return 1
+        print("✅ États identiques")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
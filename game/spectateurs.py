@@ -0,0 +1,201 @@
+"""
+Diffusion d'une partie console en direct à des spectateurs (TCP)
+
+La boucle de jeu publie chaque image rendue (rendre_grille) ; l'image est
+encodée une seule fois, puis les mêmes octets partent vers tous les
+spectateurs. Le réseau tourne dans une boucle asyncio sur son propre
+thread : publier() ne fait que remplacer l'image courante et réveiller
+cette boucle, son coût ne dépend pas du nombre de spectateurs.
+
+Chaque spectateur n'a qu'une case « dernière image » : tant que son
+image précédente n'est pas partie, les nouvelles la remplacent (images
+sautées pour lui seul) ; un spectateur lent ne ralentit ni le jeu ni les
+autres spectateurs.
+
+Usage :
+    diffuseur = DiffuseurSpectateurs(port=8766)
+    diffuseur.demarrer()
+    diffuseur.publier(rendre_grille(game_engine, None, ennemis_detruits, temps_debut))
+    diffuseur.arreter()
+
+Pour regarder :  nc localhost 8766   (ou telnet localhost 8766)
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from typing import Optional
+
+HOTE = "127.0.0.1"
+PORT = 8766
+SPECTATEURS_MAX = 10000
+
+# Tampon d'envoi du noyau par spectateur : quelques images au plus, pour ne pas y empiler d'images périmées
+TAMPON_NOYAU = 32 * 1024
+
+# Début d'image : curseur en haut à gauche ; un nouveau spectateur reçoit aussi un effacement
+DEBUT_IMAGE = "\033[H"
+EFFACER_ECRAN = b"\033[2J"
+
+
+def encoder_image(texte: str) -> bytes:
+    """Image de terminal prête à envoyer : curseur en haut à gauche, fins de ligne réseau (CRLF)"""
+    return (DEBUT_IMAGE + texte).replace("\n", "\r\n").encode("utf-8")
+
+
+class DiffuseurSpectateurs:
+    """
+    Serveur de spectateurs alimenté par la boucle de jeu
+    
+    Attributs :
+        derniere_image (tuple) : (numéro, octets) de la dernière image publiée
+        spectateurs (int) : Spectateurs connectés
+        compteurs (dict) : Images publiées, envoyées et sautées, connexions, temps d'encodage
+            (thread du jeu) et de diffusion (thread réseau)
+    """
+    
+    def __init__(self, hote: str = HOTE, port: int = PORT, spectateurs_max: int = SPECTATEURS_MAX):
+        self.hote = hote
+        self.port = port
+        self.spectateurs_max = spectateurs_max
+        self.derniere_image = (0, b"")
+        self.compteurs = {"publiees": 0, "envoyees": 0, "sautees": 0, "connexions": 0,
+                          "refus": 0, "encodage_s": 0.0, "diffusion_s": 0.0}
+        self.spectateurs = 0
+        self._boucle: Optional[asyncio.AbstractEventLoop] = None
+        self._spectateurs = set()
+        self._serveur: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pret = threading.Event()
+        self._erreur: Optional[BaseException] = None
+    
+    # --------------------------------------------------------------------------
+    # Côté jeu (thread de la boucle de jeu)
+    # --------------------------------------------------------------------------
+    
+    def demarrer(self) -> int:
+        """Lance le thread réseau, retourne le port d'écoute (utile avec port=0)"""
+        self._thread = threading.Thread(target=self._executer, daemon=True)
+        self._thread.start()
+        self._pret.wait()
+        if self._erreur is not None:
+            raise self._erreur
+        return self.port
+    
+    def publier(self, texte: str):
+        """Nouvelle image : encodée ici une fois pour tous, envoyée par le thread réseau"""
+        debut = time.perf_counter()
+        octets = encoder_image(texte)
+        self.compteurs["encodage_s"] += time.perf_counter() - debut
+        self.compteurs["publiees"] += 1
+        # Un seul attribut remplacé : le thread réseau voit toujours un couple cohérent
+        self.derniere_image = (self.derniere_image[0] + 1, octets)
+        boucle = self._boucle
+        if boucle is not None and self.spectateurs:
+            boucle.call_soon_threadsafe(self._signaler)
+    
+    def arreter(self):
+        """Ferme les connexions et arrête le thread réseau"""
+        boucle = self._boucle
+        if boucle is not None and self._serveur is not None:
+            boucle.call_soon_threadsafe(self._serveur.close)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+    
+    def statistiques(self) -> dict:
+        """Compteurs depuis le démarrage et spectateurs connectés"""
+        return dict(self.compteurs, spectateurs=self.spectateurs)
+    
+    # --------------------------------------------------------------------------
+    # Côté réseau (thread asyncio)
+    # --------------------------------------------------------------------------
+    
+    def _executer(self):
+        """Boucle asyncio du thread réseau"""
+        try:
+            asyncio.run(self._servir())
+        except BaseException as e:
+            self._erreur = e
+            self._pret.set()
+    
+    async def _servir(self):
+        """Écoute jusqu'à arreter()"""
+        self._boucle = asyncio.get_running_loop()
+        self._serveur = await self._boucle.create_server(lambda: Spectateur(self), self.hote, self.port)
+        self.port = self._serveur.sockets[0].getsockname()[1]
+        self._pret.set()
+        try:
+            await self._serveur.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        for spectateur in list(self._spectateurs):
+            spectateur.transport.close()
+    
+    def _signaler(self):
+        """Nouvelle image : chaque spectateur prêt l'envoie, les autres la prendront en reprenant"""
+        debut = time.perf_counter()
+        for spectateur in self._spectateurs:
+            spectateur.envoyer()
+        self.compteurs["diffusion_s"] += time.perf_counter() - debut
+
+
+class Spectateur(asyncio.Protocol):
+    """
+    Connexion d'un spectateur (boucle du thread réseau)
+    
+    Le tampon d'envoi n'accepte qu'une image : dès qu'il n'est pas vide,
+    l'envoi est suspendu (pause_writing) ; à la reprise, seule la dernière
+    image publiée part, celles d'entre-temps sont sautées.
+    """
+    
+    def __init__(self, diffuseur: DiffuseurSpectateurs):
+        self.diffuseur = diffuseur
+        self.transport: Optional[asyncio.Transport] = None
+        self.vu = 0
+        self.en_pause = False
+    
+    def connection_made(self, transport: asyncio.Transport):
+        diffuseur = self.diffuseur
+        self.transport = transport
+        if len(diffuseur._spectateurs) >= diffuseur.spectateurs_max:
+            diffuseur.compteurs["refus"] += 1
+            transport.close()
+            return
+        diffuseur._spectateurs.add(self)
+        diffuseur.spectateurs = len(diffuseur._spectateurs)
+        diffuseur.compteurs["connexions"] += 1
+        transport.set_write_buffer_limits(high=0)
+        connexion = transport.get_extra_info("socket")
+        if connexion is not None:
+            connexion.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, TAMPON_NOYAU)
+        self.vu, image = diffuseur.derniere_image
+        transport.write(EFFACER_ECRAN + image)
+    
+    def envoyer(self):
+        """Envoie la dernière image si elle est nouvelle et si l'image précédente est partie"""
+        numero, image = self.diffuseur.derniere_image
+        compteurs = self.diffuseur.compteurs
+        # Les images remplacées avant d'avoir pu partir sont sautées
+        compteurs["sautees"] += max(0, numero - self.vu - 1)
+        self.vu = max(self.vu, numero - 1)
+        if self.en_pause or numero == self.vu:
+            return
+        compteurs["envoyees"] += 1
+        self.vu = numero
+        self.transport.write(image)
+    
+    def pause_writing(self):
+        self.en_pause = True
+    
+    def resume_writing(self):
+        self.en_pause = False
+        self.envoyer()
+    
+    def data_received(self, data: bytes):
+        """Les touches du spectateur sont ignorées"""
+    
+    def connection_lost(self, exc: Optional[Exception]):
+        diffuseur = self.diffuseur
+        diffuseur._spectateurs.discard(self)
+        diffuseur.spectateurs = len(diffuseur._spectateurs)
@@ -0,0 +1,300 @@
+"""
+Statistiques agrégées par joueur pour le Shooter Spatial
+
+Les agrégats sont mis à jour en O(1) à chaque partie enregistrée et stockés
+dans scores.json à côté des données du joueur (clé "agregats"). Aucune
+statistique ne nécessite de relire l'historique des parties.
+"""
+
+import math
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+# Les scores sont des multiples de 10 : seaux exacts jusqu'à SCORE_EXACT_MAX,
+# puis seaux logarithmiques (erreur relative ≤ 2 %) au-delà
+LARGEUR_SEAU = 10
+SCORE_EXACT_MAX = 10000
+NB_SEAUX_EXACTS = SCORE_EXACT_MAX // LARGEUR_SEAU
+RAISON_LOG = 1.02
+
+# Fenêtres glissantes (en jours)
+FENETRES_JOURS = (7, 30)
+PERCENTILES = (25, 50, 75, 90)
+
+
+def indice_seau(score: int) -> int:
+    """Retourne l'indice du seau d'histogramme contenant `score`"""
+    if score < SCORE_EXACT_MAX:
+        return max(0, int(score) // LARGEUR_SEAU)
+    return NB_SEAUX_EXACTS + int(math.log(score / SCORE_EXACT_MAX, RAISON_LOG))
+
+
+def valeur_seau(indice: int) -> int:
+    """Retourne la borne inférieure (score représentatif) d'un seau"""
+    if indice < NB_SEAUX_EXACTS:
+        return indice * LARGEUR_SEAU
+    return int(round(SCORE_EXACT_MAX * RAISON_LOG ** (indice - NB_SEAUX_EXACTS)))
+
+
+def jour_de(timestamp: float) -> int:
+    """Numéro du jour local (ordinal) d'un timestamp"""
+    return datetime.fromtimestamp(timestamp).toordinal()
+
+
+def nouveaux_agregats() -> dict:
+    """Retourne des agrégats vides (joueur sans partie)"""
+    return {
+        "nb": 0,
+        "somme": 0,
+        "somme_carres": 0,
+        "min": None,
+        "max": None,
+        "dernier_score": None,
+        "serie_actuelle": 0,
+        "meilleure_serie": 0,
+        "jours": {},
+        "histogramme": {},
+    }
+
+
+def ajouter_partie(agregats: dict, score: int, timestamp: float):
+    """
+    Met à jour les agrégats avec une nouvelle partie (O(1))
+    
+    Une série compte les parties consécutives dont le score est au moins
+    égal à celui de la partie précédente.
+    """
+    agregats["nb"] += 1
+    agregats["somme"] += score
+    agregats["somme_carres"] += score * score
+    if agregats["min"] is None or score < agregats["min"]:
+        agregats["min"] = score
+    if agregats["max"] is None or score > agregats["max"]:
+        agregats["max"] = score
+    
+    # Série de progression
+    precedent = agregats["dernier_score"]
+    if precedent is None or score >= precedent:
+        agregats["serie_actuelle"] += 1
+    else:
+        agregats["serie_actuelle"] = 1
+    agregats["meilleure_serie"] = max(agregats["meilleure_serie"], agregats["serie_actuelle"])
+    agregats["dernier_score"] = score
+    
+    # Seaux journaliers pour les moyennes glissantes (au plus max(FENETRES_JOURS) seaux)
+    jour = jour_de(timestamp)
+    jours = agregats["jours"]
+    cle = str(jour)
+    if cle not in jours:
+        horizon = jour - max(FENETRES_JOURS)
+        for ancien in [j for j in jours if int(j) <= horizon]:
+            del jours[ancien]
+        jours[cle] = [0, 0]
+    jours[cle][0] += 1
+    jours[cle][1] += score
+    
+    # Histogramme creux des scores (clés texte pour JSON)
+    seau = str(indice_seau(score))
+    agregats["histogramme"][seau] = agregats["histogramme"].get(seau, 0) + 1
+
+
+def quantile_histogramme(histogramme: Dict[str, int], q: float) -> Optional[int]:
+    """Retourne le score au quantile `q` (0..1) d'un histogramme de seaux"""
+    total = sum(histogramme.values())
+    if total == 0:
+        return None
+    
+    rang = q * total
+    cumul = 0
+    for indice in sorted(int(i) for i in histogramme):
+        cumul += histogramme[str(indice)]
+        if cumul >= rang:
+            return valeur_seau(indice)
+    return valeur_seau(max(int(i) for i in histogramme))
+
+
+def moyenne_glissante(agregats: dict, nb_jours: int, maintenant: Optional[float] = None) -> float:
+    """Score moyen des parties jouées sur les `nb_jours` derniers jours"""
+    if maintenant is None:
+        maintenant = datetime.now().timestamp()
+    debut = jour_de(maintenant) - nb_jours
+    
+    nb = somme = 0
+    for jour, (nb_jour, somme_jour) in agregats["jours"].items():
+        if int(jour) > debut:
+            nb += nb_jour
+            somme += somme_jour
+    return somme / nb if nb else 0
+
+
+def resumer_agregats(agregats: dict, maintenant: Optional[float] = None) -> dict:
+    """
+    Calcule les statistiques affichables à partir des agrégats
+    
+    Returns:
+        dict : min, max, écart-type, séries, moyennes glissantes et percentiles
+               ("ecart_type_estime", "percentiles_estimes" : True si la somme des
+               carrés ou l'histogramme ont été extrapolés lors d'une migration,
+               voir migrer_scores._migrer_v2_vers_v3 ; le minimum est alors
+               celui des seules parties détaillées)
+    """
+    nb = agregats["nb"]
+    ecart_type = 0.0
+    if nb > 0:
+        moyenne = agregats["somme"] / nb
+        variance = max(0.0, agregats["somme_carres"] / nb - moyenne * moyenne)
+        ecart_type = math.sqrt(variance)
+    
+    resume = {
+        "score_min": agregats["min"] or 0,
+        "score_max": agregats["max"] or 0,
+        "ecart_type": round(ecart_type, 1),
+        "ecart_type_estime": agregats.get("somme_carres_estimee", False),
+        "serie_actuelle": agregats["serie_actuelle"],
+        "meilleure_serie": agregats["meilleure_serie"],
+        "percentiles": {
+            p: quantile_histogramme(agregats["histogramme"], p / 100) or 0
+            for p in PERCENTILES
+        },
+        "percentiles_estimes": agregats.get("histogramme_estime", False),
+    }
+    for nb_jours in FENETRES_JOURS:
+        resume[f"moyenne_{nb_jours}_jours"] = round(
+            moyenne_glissante(agregats, nb_jours, maintenant), 1
+        )
+    return resume
+
+
+# ==============================================================================
+# DISTRIBUTION GLOBALE DES SCORES
+# ==============================================================================
+
+class ArbreFenwick:
+    """
+    Arbre de Fenwick (arbre binaire indexé) sur des compteurs entiers
+    
+    Mise à jour et somme préfixe en O(log n). L'arbre s'agrandit
+    automatiquement (doublement) quand un indice dépasse sa taille.
+    """
+    
+    def __init__(self, taille: int = 1024):
+        self.valeurs = [0] * taille
+        self.arbre = [0] * (taille + 1)
+        self.total = 0
+    
+    @classmethod
+    def depuis_valeurs(cls, valeurs: List[int]) -> 'ArbreFenwick':
+        """Construit l'arbre en O(n) à partir des compteurs de chaque indice"""
+        arbre = cls(max(1, len(valeurs)))
+        arbre._reconstruire(list(valeurs))
+        return arbre
+    
+    def _reconstruire(self, valeurs: List[int]):
+        """Reconstruit l'arbre en O(n)"""
+        self.valeurs = valeurs
+        self.arbre = [0] + valeurs
+        taille = len(valeurs)
+        for i in range(1, taille + 1):
+            parent = i + (i & -i)
+            if parent <= taille:
+                self.arbre[parent] += self.arbre[i]
+        self.total = sum(valeurs)
+    
+    def ajouter(self, indice: int, delta: int = 1):
+        """Ajoute `delta` au compteur de l'indice donné"""
+        if indice >= len(self.valeurs):
+            nouvelle_taille = len(self.valeurs)
+            while indice >= nouvelle_taille:
+                nouvelle_taille *= 2
+            self._reconstruire(self.valeurs + [0] * (nouvelle_taille - len(self.valeurs)))
+        
+        self.valeurs[indice] += delta
+        self.total += delta
+        i = indice + 1
+        while i < len(self.arbre):
+            self.arbre[i] += delta
+            i += i & -i
+    
+    def prefixe(self, indice: int) -> int:
+        """Somme des compteurs des indices 0..indice (inclus)"""
+        i = min(indice + 1, len(self.valeurs))
+        somme = 0
+        while i > 0:
+            somme += self.arbre[i]
+            i -= i & -i
+        return somme
+    
+    def rechercher(self, rang: int) -> Tuple[int, int]:
+        """
+        Retrouve l'indice qui contient le `rang`-ième élément (à partir de 0)
+        
+        Returns:
+            Tuple[int, int] : (indice, rang de l'élément dans cet indice)
+        """
+        position = 0
+        pas = 1 << (len(self.arbre) - 1).bit_length()
+        while pas:
+            suivant = position + pas
+            if suivant < len(self.arbre) and self.arbre[suivant] <= rang:
+                position = suivant
+                rang -= self.arbre[suivant]
+            pas >>= 1
+        return position, rang
+
+
+class DistributionScores:
+    """
+    Distribution de scores fusionnable, interrogeable en O(log n)
+    
+    Les scores sont regroupés avec les mêmes seaux que les histogrammes
+    par joueur (indice_seau) : exacts pour les multiples de 10 jusqu'à
+    SCORE_EXACT_MAX, à 2 % près au-delà.
+    """
+    
+    def __init__(self):
+        self.arbre = ArbreFenwick()
+    
+    @classmethod
+    def depuis_comptes(cls, comptes: Dict[int, int]) -> 'DistributionScores':
+        """Construit la distribution en O(n) depuis {indice_seau: nombre}"""
+        distribution = cls()
+        if comptes:
+            valeurs = [0] * (max(comptes) + 1)
+            for indice, nb in comptes.items():
+                valeurs[indice] += nb
+            distribution.arbre = ArbreFenwick.depuis_valeurs(valeurs)
+        return distribution
+    
+    @property
+    def total(self) -> int:
+        """Nombre de scores dans la distribution"""
+        return self.arbre.total
+    
+    def ajouter(self, score: int, nb: int = 1):
+        """Ajoute `nb` occurrences d'un score"""
+        self.arbre.ajouter(indice_seau(score), nb)
+    
+    def retirer(self, score: int, nb: int = 1):
+        """Retire `nb` occurrences d'un score"""
+        self.arbre.ajouter(indice_seau(score), -nb)
+    
+    def fusionner(self, histogramme: Dict[str, int]):
+        """Ajoute un histogramme de seaux (par exemple celui d'un joueur)"""
+        for indice, nb in histogramme.items():
+            self.arbre.ajouter(int(indice), nb)
+    
+    def nb_inferieurs(self, score: int) -> int:
+        """Nombre de scores strictement inférieurs à `score`"""
+        indice = indice_seau(score)
+        return self.arbre.prefixe(indice - 1) if indice > 0 else 0
+    
+    def nb_superieurs(self, score: int) -> int:
+        """Nombre de scores strictement supérieurs à `score`"""
+        return self.total - self.arbre.prefixe(indice_seau(score))
+    
+    def percentile(self, score: int) -> float:
+        """Pourcentage des scores strictement inférieurs à `score`"""
+        if self.total == 0:
+            return 0.0
+        return 100.0 * self.nb_inferieurs(score) / self.total